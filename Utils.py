@@ -1,218 +1,672 @@
-import requests
+import asyncio
 import random
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import openai
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+from cache import TTLCache
+from circuit_breaker import breakers
+from config import Config
+from demo_market import DemoMarket
+from http_client import provider_client, async_provider_client
+from llm_cache import completion_cache
+from metrics import demo_fallbacks, rate_limited, upstream_latency
+from indicators import IndicatorState, compute_indicators, label_signals, summarize, series_to_json
+from news_sentiment import NewsIngestor
+from ohlcv_store import ohlcv_store
+from portfolio_analytics import align_prices, compute_analytics
+from profile_store import profile_store
+from rate_limit import alpha_vantage_limiter, RateLimited, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from timeseries import PriceSeries
 
-def get_stock_data(symbol, api_key):
-    """Fetch stock data from Alpha Vantage API or generate simulated data"""
+# Shared quote cache keyed by (function, symbol)
+quote_cache = TTLCache(ttl=Config.QUOTE_CACHE_TTL, maxsize=Config.QUOTE_CACHE_SIZE)
+
+# Seeded simulated market behind demo mode and the demo fallbacks
+demo_market = DemoMarket(seed=Config.DEMO_MARKET_SEED, cache_size=Config.DEMO_MARKET_CACHE_SIZE)
+
+# Memoized watchlist signals keyed by (symbol, analysis_type)
+signal_cache = TTLCache(ttl=Config.SIGNAL_CACHE_TTL, maxsize=Config.QUOTE_CACHE_SIZE)
+
+# Running indicators per symbol as (last epoch day seen, IndicatorState), advanced bar by bar
+indicator_states = TTLCache(ttl=Config.SIGNAL_CACHE_TTL, maxsize=Config.QUOTE_CACHE_SIZE)
+_indicator_lock = threading.Lock()
+
+# Aligned price matrices and analytics per portfolio, validated by a fingerprint of the latest bars
+portfolio_cache = TTLCache(ttl=Config.SIGNAL_CACHE_TTL, maxsize=Config.PORTFOLIO_CACHE_SIZE)
+
+# Bounded pools for concurrent upstream fetches; background work waits on the
+# rate limiter in its own pool instead of ahead of interactive requests
+fetch_executor = ThreadPoolExecutor(max_workers=Config.FETCH_WORKERS, thread_name_prefix='fetch')
+background_executor = ThreadPoolExecutor(max_workers=Config.BACKGROUND_FETCH_WORKERS, thread_name_prefix='background-fetch')
+
+# One history refresh per symbol at a time
+_history_locks = defaultdict(threading.Lock)
+
+class EmptyResponse(Exception):
+    """The provider answered without the requested data"""
+
+def _alpha_vantage_breaker(url):
+    """Circuit breaker for the Alpha Vantage function a query URL calls"""
+    return breakers.get('alphavantage', parse_qs(urlsplit(url).query).get('function', ['unknown'])[0])
+
+def _alpha_vantage_query(url, priority=PRIORITY_NORMAL):
+    """Call Alpha Vantage within the shared rate limit and the function's circuit breaker"""
+    breaker = _alpha_vantage_breaker(url)
+    breaker.check()
+    if not alpha_vantage_limiter.acquire(priority):
+        breaker.release()
+        rate_limited.inc(provider='alphavantage', source='limiter')
+        raise RateLimited('Alpha Vantage rate limit reached')
+    
+    try:
+        data = provider_client.get_json('alphavantage', url)
+    except Exception:
+        breaker.record_failure()
+        raise
+    
+    # Quota exhaustion comes back as a 200 with a Note/Information message
+    if 'Note' in data or 'Information' in data:
+        breaker.release()
+        rate_limited.inc(provider='alphavantage', source='provider')
+        alpha_vantage_limiter.drain()
+        raise RateLimited(data.get('Note') or data.get('Information'))
+    
+    # So does a rejected request (unknown symbol, bad parameters or key); it is not a success
+    if 'Error Message' in data:
+        breaker.record_failure()
+        raise EmptyResponse(data['Error Message'])
+    
+    breaker.record_success()
+    return data
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+def _refresh_in_background(key, refresh):
+    """Run refresh() on the background pool unless a refresh for key is already running"""
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    
+    def run():
+        try:
+            refresh()
+        except Exception:
+            # The stale value keeps being served until a refresh succeeds
+            pass
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+    
+    background_executor.submit(run)
+
+# Markers a quote can carry when it isn't a fresh provider value
+QUOTE_FLAGS = ('stale', 'as_of', 'demo', 'rate_limited')
+
+def _as_of(stored_at):
+    return datetime.fromtimestamp(stored_at, timezone.utc).isoformat(timespec='seconds')
+
+def _revalidating_quote(key, fetch):
+    """Stale-while-revalidate: a quote that expired less than QUOTE_STALE_TTL ago is
+    returned marked stale while one background fetch(PRIORITY_BACKGROUND) refreshes it.
+    Returns None when the quote is fresh, missing or too old to serve.
+    """
+    entry = quote_cache.entry(key)
+    if entry is None:
+        return None
+    quote, stored_at = entry
+    if not quote_cache.ttl < time.time() - stored_at <= quote_cache.ttl + Config.QUOTE_STALE_TTL:
+        return None
+    _refresh_in_background(key, lambda: quote_cache.get_or_load(key, lambda: fetch(PRIORITY_BACKGROUND)))
+    return dict(quote, stale=True, as_of=_as_of(stored_at))
+
+def _cached_quote(key, fetch, priority):
+    """Serve key from the quote cache with stale-while-revalidate; fetch(priority) loads it"""
+    return _revalidating_quote(key, fetch) or quote_cache.get_or_load(key, lambda: fetch(priority))
+
+def _fallback_quote(key, demo_loader, **flags):
+    """The last known good quote marked stale with its as_of time, or demo data flagged as such"""
+    entry = quote_cache.entry(key)
+    if entry is None:
+        return dict(demo_loader(), demo=True, stale=True, **flags)
+    quote, stored_at = entry
+    return dict(quote, stale=True, as_of=_as_of(stored_at), **flags)
+
+def get_stock_data(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Fetch stock data from Alpha Vantage API or generate simulated data.
+
+    When the provider fails, is rate limited or its breaker is open, the last
+    known good quote is served marked stale; demo data only when there is none.
+    """
+    key = ('GLOBAL_QUOTE', symbol)
+    try:
+        return _cached_quote(key, lambda priority: _fetch_stock_data(symbol, api_key, priority), priority)
+    except RateLimited:
+        return _fallback_quote(key, lambda: _demo_stock_data(symbol), rate_limited=True)
+    except Exception as e:
+        demo_fallbacks.inc(call='get_stock_data', reason=type(e).__name__)
+        return _fallback_quote(key, lambda: _demo_stock_data(symbol))
+
+def _demo_stock_data(symbol):
+    """Simulated quote for demo mode"""
+    return demo_market.quote(symbol)
+
+def _fetch_stock_data(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Fetch a quote; raises instead of falling back so callers can serve the last good one"""
     if api_key == 'demo':
-        # Simulate data for demo
-        base_prices = {
-            'AAPL': 175, 'MSFT': 340, 'TSLA': 240, 'NVDA': 450, 
-            'GOOGL': 130, 'AMZN': 145, 'META': 300, 'NFLX': 420, 
-            'AMD': 110, 'INTC': 35, 'JPM': 150, 'JNJ': 160, 'V': 220,
-            'DIS': 90, 'NKE': 100, 'BA': 200, 'XOM': 105, 'WMT': 150
-        }
-        
-        price = (base_prices.get(symbol, 100) + (random.random() - 0.5) * 20)
-        change = (random.random() - 0.5) * 10
-        change_percent = (change / price) * 100
-        volume = random.randint(1000000, 10000000)
-        
-        # Calculate market cap (price * random shares outstanding)
-        market_cap = price * random.randint(100000000, 10000000000)
-        
-        # Calculate PE ratio
-        pe_ratio = round(random.uniform(10, 40), 2)
-        
-        # Calculate dividend yield
-        dividend_yield = round(random.uniform(0, 4), 2)
-        
-        # Calculate 52-week high/low
-        fifty_two_week_high = price * random.uniform(1.1, 1.5)
-        fifty_two_week_low = price * random.uniform(0.5, 0.9)
-        
+        return _demo_stock_data(symbol)
+    
+    url = f'{Config.ALPHA_VANTAGE_URL}?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}'
+    with upstream_latency.time(call='get_stock_data'):
+        data = _alpha_vantage_query(url, priority)
+    
+    quote = _parse_global_quote(symbol, data)
+    if quote is None:
+        raise EmptyResponse(f'No quote for {symbol}')
+    return quote
+
+def _parse_global_quote(symbol, data):
+    """Quote dict from a GLOBAL_QUOTE response, or None if it has no quote"""
+    if 'Global Quote' in data and data['Global Quote']:
+        quote = data['Global Quote']
         return {
             'symbol': symbol,
-            'price': round(price, 2),
-            'change': round(change, 2),
-            'change_percent': round(change_percent, 2),
-            'volume': volume,
-            'market_cap': market_cap,
-            'pe_ratio': pe_ratio,
-            'dividend_yield': dividend_yield,
-            'fifty_two_week_high': round(fifty_two_week_high, 2),
-            'fifty_two_week_low': round(fifty_two_week_low, 2)
+            'price': float(quote['05. price']),
+            'change': float(quote['09. change']),
+            'change_percent': float(quote['10. change percent'].rstrip('%')),
+            'volume': int(quote['06. volume'])
         }
-    
-    # Real API call
-    try:
-        url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}'
-        response = requests.get(url)
-        data = response.json()
-        
-        if 'Global Quote' in data and data['Global Quote']:
-            quote = data['Global Quote']
-            return {
-                'symbol': symbol,
-                'price': float(quote['05. price']),
-                'change': float(quote['09. change']),
-                'change_percent': float(quote['10. change percent'].rstrip('%')),
-                'volume': int(quote['06. volume'])
-            }
+    return None
+
+def _fetch_batch(fetcher, symbols, api_key, priority, cached=None):
+    """Run fetcher for several symbols concurrently on the fetch pool for priority.
+
+    Symbols cached(symbol) already has a fresh value for are answered without
+    touching the pool. Returns {'quotes': {symbol: data}, 'errors': {symbol: message}}
+    so one failing symbol doesn't fail the whole batch.
+    """
+    executor = background_executor if priority >= PRIORITY_BACKGROUND else fetch_executor
+    quotes = {}
+    futures = {}
+    for symbol in dict.fromkeys(symbols):
+        value = cached(symbol) if cached else None
+        if value is not None:
+            quotes[symbol] = value
         else:
-            # Fallback to demo if API fails
-            return get_stock_data(symbol, 'demo')
-    except:
-        return get_stock_data(symbol, 'demo')
+            futures[symbol] = executor.submit(fetcher, symbol, api_key, priority)
+    errors = {}
+
+    for symbol, future in futures.items():
+        try:
+            quotes[symbol] = future.result()
+        except Exception as e:
+            errors[symbol] = str(e)
+
+    return {
+        'quotes': quotes,
+        'errors': errors
+    }
+
+def get_stock_data_batch(symbols, api_key, priority=PRIORITY_NORMAL):
+    """Fetch quotes for several symbols concurrently"""
+    return _fetch_batch(get_stock_data, symbols, api_key, priority, lambda symbol: quote_cache.get(('GLOBAL_QUOTE', symbol)))
+
+def get_crypto_data(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Fetch cryptocurrency data, serving the last good quote when the provider is unavailable"""
+    key = ('CURRENCY_EXCHANGE_RATE', symbol)
+    try:
+        return _cached_quote(key, lambda priority: _fetch_crypto_data(symbol, api_key, priority), priority)
+    except RateLimited:
+        return _fallback_quote(key, lambda: _demo_crypto_data(symbol), rate_limited=True)
+    except Exception as e:
+        demo_fallbacks.inc(call='get_crypto_data', reason=type(e).__name__)
+        return _fallback_quote(key, lambda: _demo_crypto_data(symbol))
+
+def _demo_crypto_data(symbol):
+    """Simulated crypto quote for demo mode"""
+    return demo_market.crypto_quote(symbol)
 
-def get_crypto_data(symbol, api_key):
-    """Fetch cryptocurrency data"""
+def _fetch_crypto_data(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Fetch a crypto quote; raises instead of falling back so callers can serve the last good one"""
     if api_key == 'demo':
-        # Simulate crypto data
-        base_prices = {
-            'BTC': 50000, 'ETH': 3000, 'ADA': 1.2, 'DOGE': 0.2,
-            'XRP': 0.8, 'DOT': 20, 'SOL': 100, 'BNB': 400
-        }
-        
-        price = (base_prices.get(symbol, 100) + (random.random() - 0.5) * 20)
-        change = (random.random() - 0.5) * 10
-        change_percent = (change / price) * 100
-        volume = random.randint(1000000, 1000000000)
-        market_cap = price * random.randint(1000000, 1000000000)
-        
+        return _demo_crypto_data(symbol)
+    
+    url = f'{Config.ALPHA_VANTAGE_URL}?function=CURRENCY_EXCHANGE_RATE&from_currency={symbol}&to_currency=USD&apikey={api_key}'
+    with upstream_latency.time(call='get_crypto_data'):
+        data = _alpha_vantage_query(url, priority)
+    
+    quote = _parse_exchange_rate(symbol, data)
+    if quote is None:
+        raise EmptyResponse(f'No exchange rate for {symbol}')
+    return quote
+
+def _parse_exchange_rate(symbol, data):
+    """Quote dict from a CURRENCY_EXCHANGE_RATE response, or None if it has no rate"""
+    if 'Realtime Currency Exchange Rate' in data:
+        rate = data['Realtime Currency Exchange Rate']
         return {
             'symbol': symbol,
-            'price': round(price, 2),
-            'change': round(change, 2),
-            'change_percent': round(change_percent, 2),
-            'volume': volume,
-            'market_cap': market_cap
+            'price': float(rate['5. Exchange Rate']),
+            'change': float(rate['5. Exchange Rate']) - float(rate['5. Exchange Rate']) * 0.99,  # Simulated change
+            'change_percent': 1.0,  # Simulated change percent
+            'volume': random.randint(1000000, 1000000000),
+            'market_cap': float(rate['5. Exchange Rate']) * random.randint(1000000, 1000000000)
         }
+    return None
+
+def get_crypto_data_batch(symbols, api_key, priority=PRIORITY_NORMAL):
+    """Fetch cryptocurrency quotes for several symbols concurrently"""
+    return _fetch_batch(get_crypto_data, symbols, api_key, priority, lambda symbol: quote_cache.get(('CURRENCY_EXCHANGE_RATE', symbol)))
+
+# Async fetchers for the ASGI app (asgi.py). They share the quote cache, the
+# rate limiter and the response parsing with the sync fetchers above.
+_async_flights = {}
+
+async def _async_alpha_vantage_query(url, priority=PRIORITY_NORMAL):
+    """Async _alpha_vantage_query: waits for a token on the event loop instead of a thread"""
+    breaker = _alpha_vantage_breaker(url)
+    breaker.check()
+    if not await alpha_vantage_limiter.acquire_async(priority):
+        breaker.release()
+        rate_limited.inc(provider='alphavantage', source='limiter')
+        raise RateLimited('Alpha Vantage rate limit reached')
     
-    # Real API call for crypto
     try:
-        url = f'https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency={symbol}&to_currency=USD&apikey={api_key}'
-        response = requests.get(url)
-        data = response.json()
-        
-        if 'Realtime Currency Exchange Rate' in data:
-            rate = data['Realtime Currency Exchange Rate']
-            return {
-                'symbol': symbol,
-                'price': float(rate['5. Exchange Rate']),
-                'change': float(rate['5. Exchange Rate']) - float(rate['5. Exchange Rate']) * 0.99,  # Simulated change
-                'change_percent': 1.0,  # Simulated change percent
-                'volume': random.randint(1000000, 1000000000),
-                'market_cap': float(rate['5. Exchange Rate']) * random.randint(1000000, 1000000000)
-            }
-        else:
-            return get_crypto_data(symbol, 'demo')
-    except:
-        return get_crypto_data(symbol, 'demo')
+        data = await async_provider_client.get_json('alphavantage', url)
+    except Exception:
+        breaker.record_failure()
+        raise
+    
+    if 'Note' in data or 'Information' in data:
+        breaker.release()
+        rate_limited.inc(provider='alphavantage', source='provider')
+        alpha_vantage_limiter.drain()
+        raise RateLimited(data.get('Note') or data.get('Information'))
+    
+    # So does a rejected request (unknown symbol, bad parameters or key); it is not a success
+    if 'Error Message' in data:
+        breaker.record_failure()
+        raise EmptyResponse(data['Error Message'])
+    
+    breaker.record_success()
+    return data
+
+async def _async_cached(key, loader, fetch):
+    """Serve key from the quote cache, with one in-flight load per key across tasks.
 
-def get_historical_data(symbol, api_key, days=30):
-    """Get historical stock data for charting"""
+    Stale quotes are revalidated like _cached_quote, with the sync fetch(priority)
+    running on the fetch pool.
+    """
+    value = quote_cache.get(key) or _revalidating_quote(key, fetch)
+    if value is not None:
+        return value
+    
+    flight = _async_flights.get(key)
+    if flight is None:
+        async def load():
+            try:
+                value = await loader()
+                quote_cache.set(key, value)
+                return value
+            finally:
+                _async_flights.pop(key, None)
+        flight = _async_flights[key] = asyncio.ensure_future(load())
+    # Shield so one cancelled request doesn't cancel the load for everyone else
+    return await asyncio.shield(flight)
+
+async def get_stock_data_async(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Async get_stock_data"""
+    key = ('GLOBAL_QUOTE', symbol)
+    try:
+        return await _async_cached(key, lambda: _fetch_stock_data_async(symbol, api_key, priority),
+                                   lambda priority: _fetch_stock_data(symbol, api_key, priority))
+    except RateLimited:
+        return _fallback_quote(key, lambda: _demo_stock_data(symbol), rate_limited=True)
+    except Exception as e:
+        demo_fallbacks.inc(call='get_stock_data', reason=type(e).__name__)
+        return _fallback_quote(key, lambda: _demo_stock_data(symbol))
+
+async def _fetch_stock_data_async(symbol, api_key, priority=PRIORITY_NORMAL):
     if api_key == 'demo':
-        # Generate simulated historical data
-        base_price = {
-            'AAPL': 175, 'MSFT': 340, 'TSLA': 240, 'NVDA': 450, 
-            'GOOGL': 130, 'AMZN': 145, 'META': 300, 'NFLX': 420, 
-            'AMD': 110, 'INTC': 35, 'JPM': 150, 'JNJ': 160, 'V': 220,
-            'BTC': 50000, 'ETH': 3000, 'ADA': 1.2, 'DOGE': 0.2
-        }.get(symbol, 100)
-        
-        historical_data = []
-        current_date = datetime.now()
-        price = base_price
-        
-        for i in range(days, 0, -1):
-            date = current_date - timedelta(days=i)
-            price += (random.random() - 0.5) * 10
-            price = max(price, base_price * 0.7)  # Prevent unrealistic drops
-            
-            historical_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'price': round(price, 2),
-                'volume': random.randint(1000000, 10000000)
-            })
-        
-        return historical_data
+        return _demo_stock_data(symbol)
     
-    # Real API call for historical data
+    url = f'{Config.ALPHA_VANTAGE_URL}?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}'
+    started = time.monotonic()
     try:
-        url = f'https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={api_key}&outputsize=compact'
-        response = requests.get(url)
-        data = response.json()
-        
-        if 'Time Series (Daily)' in data:
-            time_series = data['Time Series (Daily)']
-            historical_data = []
-            
-            for date, values in list(time_series.items())[:days]:
-                historical_data.append({
-                    'date': date,
-                    'price': float(values['4. close']),
-                    'volume': int(values['5. volume'])
-                })
-            
-            return historical_data
+        data = await _async_alpha_vantage_query(url, priority)
+    finally:
+        upstream_latency.observe(time.monotonic() - started, call='get_stock_data')
+    
+    quote = _parse_global_quote(symbol, data)
+    if quote is None:
+        raise EmptyResponse(f'No quote for {symbol}')
+    return quote
+
+async def get_crypto_data_async(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Async get_crypto_data"""
+    key = ('CURRENCY_EXCHANGE_RATE', symbol)
+    try:
+        return await _async_cached(key, lambda: _fetch_crypto_data_async(symbol, api_key, priority),
+                                   lambda priority: _fetch_crypto_data(symbol, api_key, priority))
+    except RateLimited:
+        return _fallback_quote(key, lambda: _demo_crypto_data(symbol), rate_limited=True)
+    except Exception as e:
+        demo_fallbacks.inc(call='get_crypto_data', reason=type(e).__name__)
+        return _fallback_quote(key, lambda: _demo_crypto_data(symbol))
+
+async def _fetch_crypto_data_async(symbol, api_key, priority=PRIORITY_NORMAL):
+    if api_key == 'demo':
+        return _demo_crypto_data(symbol)
+    
+    url = f'{Config.ALPHA_VANTAGE_URL}?function=CURRENCY_EXCHANGE_RATE&from_currency={symbol}&to_currency=USD&apikey={api_key}'
+    started = time.monotonic()
+    try:
+        data = await _async_alpha_vantage_query(url, priority)
+    finally:
+        upstream_latency.observe(time.monotonic() - started, call='get_crypto_data')
+    
+    quote = _parse_exchange_rate(symbol, data)
+    if quote is None:
+        raise EmptyResponse(f'No exchange rate for {symbol}')
+    return quote
+
+async def _fetch_batch_async(fetcher, symbols, api_key, priority):
+    """Async _fetch_batch: every symbol is fetched concurrently on the event loop"""
+    symbols = list(dict.fromkeys(symbols))
+    results = await asyncio.gather(*(fetcher(symbol, api_key, priority) for symbol in symbols), return_exceptions=True)
+    quotes = {}
+    errors = {}
+    
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            errors[symbol] = str(result)
         else:
-            return get_historical_data(symbol, 'demo', days)
-    except:
-        return get_historical_data(symbol, 'demo', days)
+            quotes[symbol] = result
+    
+    return {
+        'quotes': quotes,
+        'errors': errors
+    }
+
+async def get_stock_data_batch_async(symbols, api_key, priority=PRIORITY_NORMAL):
+    """Async get_stock_data_batch"""
+    return await _fetch_batch_async(get_stock_data_async, symbols, api_key, priority)
+
+async def get_crypto_data_batch_async(symbols, api_key, priority=PRIORITY_NORMAL):
+    """Async get_crypto_data_batch"""
+    return await _fetch_batch_async(get_crypto_data_async, symbols, api_key, priority)
+
+def get_historical_data(symbol, api_key, days=30, priority=PRIORITY_NORMAL):
+    """Get daily price history as a PriceSeries"""
+    if api_key == 'demo':
+        return _demo_history(symbol, days)
+    
+    # Serve from the local OHLCV store, fetching only bars newer than the last stored date.
+    # Stored bars are served at once while a background refresh appends new ones.
+    if ohlcv_store.last_date(symbol) is not None:
+        if ohlcv_store.needs_refresh(symbol):
+            _refresh_in_background(('TIME_SERIES_DAILY', symbol), lambda: _refresh_history(symbol, api_key, PRIORITY_BACKGROUND))
+    else:
+        try:
+            _refresh_history(symbol, api_key, priority)
+        except RateLimited:
+            pass
+        except Exception as e:
+            demo_fallbacks.inc(call='get_historical_data', reason=type(e).__name__)
+    
+    rows = ohlcv_store.read(symbol, days)
+    if not rows:
+        # Simulated bars are flagged so every chart, indicator and signal built on them is too
+        demo_fallbacks.inc(call='get_historical_data', reason='no_history')
+        history = _demo_history(symbol, days)
+        return PriceSeries(history.dates, history.close, history.volume, demo=True)
+    
+    return PriceSeries.from_rows(rows)
+
+def _demo_history(symbol, days):
+    """Simulated daily history ending today, consistent with the demo quote"""
+    return demo_market.history(symbol, days)
+
+def _refresh_history(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Append any new daily bars for symbol to the OHLCV store"""
+    with _history_locks[symbol]:
+        if not ohlcv_store.needs_refresh(symbol):
+            return
+        
+        last_date = ohlcv_store.last_date(symbol)
+        # An empty store gets the configured backfill; compact covers the latest 100 bars
+        outputsize = Config.OHLCV_BACKFILL_OUTPUTSIZE if last_date is None else 'compact'
+        url = f'{Config.ALPHA_VANTAGE_URL}?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={api_key}&outputsize={outputsize}'
+        try:
+            with upstream_latency.time(call='get_historical_data'):
+                data = _alpha_vantage_query(url, priority)
+            if 'Time Series (Daily)' not in data:
+                raise EmptyResponse(f'No daily history for {symbol}')
+        except EmptyResponse:
+            # Remember the attempt so later requests don't ask again until the refresh interval passes
+            ohlcv_store.mark_fetched(symbol)
+            raise
+        
+        bars = []
+        for date, values in data['Time Series (Daily)'].items():
+            if last_date is None or date > last_date:
+                bars.append((
+                    date,
+                    float(values['1. open']),
+                    float(values['2. high']),
+                    float(values['3. low']),
+                    float(values['4. close']),
+                    int(values['5. volume'])
+                ))
+        ohlcv_store.append(symbol, bars)
 
 def analyze_stock_sentiment(symbol, api_key):
-    """Analyze stock sentiment from news"""
-    # In a real implementation, this would analyze news articles
-    # For demo, return simulated sentiment
-    sentiments = ['positive', 'neutral', 'negative']
-    weights = [0.6, 0.3, 0.1]  # More likely to be positive
+    """Analyze stock sentiment from the rolling news index"""
+    return news_ingestor.sentiment(symbol)
+
+def get_technical_indicators(historical_data, days=None):
+    """Compute indicator series and signals from a get_historical_data PriceSeries.
+
+    The full history is used for warm-up; only the last `days` points of each
+    series are returned.
+    """
+    closes = historical_data.close
+    series = compute_indicators(closes)
+    summary = summarize(closes, series)
+    window = slice(-days, None) if days else slice(None)
+    
+    return {
+        'dates': historical_data[window].date_strings(),
+        'series': series_to_json({name: values[window] for name, values in series.items()}),
+        'latest': summary['latest'],
+        'rsi': summary['rsi'],
+        'macd': summary['macd'],
+        'moving_avg': summary['moving_avg'],
+        'demo': historical_data.demo
+    }
+
+def get_latest_indicators(symbol, historical_data):
+    """Latest indicator values and signal labels, updated in O(1) per new bar.
+
+    The symbol's IndicatorState only absorbs the bars newer than the last one
+    it saw; it is reseeded from the whole history when that bar was revised
+    or is no longer in the series.
+    """
+    dates, closes = historical_data.dates, historical_data.close
+    with _indicator_lock:
+        entry = indicator_states.get(symbol)
+        state = None
+        if entry is not None:
+            last_day, state = entry
+            index = int(dates.searchsorted(last_day))
+            if index < len(dates) and dates[index] == last_day and closes[index] == state.close:
+                for close in closes[index + 1:]:
+                    state.update(close)
+            else:
+                state = None
+        if state is None:
+            state = IndicatorState.from_closes(closes)
+        if len(dates):
+            indicator_states.set(symbol, (int(dates[-1]), state))
+        return label_signals(state.snapshot(), state.close)
+
+# Different analysis types yield different confidence levels
+CONFIDENCE_RANGES = {
+    'quick': (60, 80),
+    'predictive': (70, 85),
+    'advanced': (80, 95),
+    'deep': (75, 90)
+}
+
+def compute_signal(technicals, analysis_type='deep'):
+    """Derive a BUY/HOLD/SELL decision and confidence from indicator signals"""
+    score = 0
+    if technicals['rsi'] < 30:
+        score += 1
+    elif technicals['rsi'] > 70:
+        score -= 1
+    for label in (technicals['macd'], technicals['moving_avg']):
+        if label == 'Bullish':
+            score += 1
+        elif label == 'Bearish':
+            score -= 1
+    
+    if score >= 1:
+        decision = 'BUY'
+    elif score <= -1:
+        decision = 'SELL'
+    else:
+        decision = 'HOLD'
     
-    sentiment = random.choices(sentiments, weights=weights, k=1)[0]
-    score = round(random.uniform(0.5, 0.9) if sentiment == 'positive' else 
-                 random.uniform(0.3, 0.6) if sentiment == 'neutral' else 
-                 random.uniform(0.1, 0.4), 2)
+    # Confidence grows with the number of agreeing indicators
+    low, high = CONFIDENCE_RANGES.get(analysis_type, CONFIDENCE_RANGES['deep'])
+    confidence = round(low + (high - low) * abs(score) / 3)
     
     return {
-        'sentiment': sentiment,
-        'score': score
+        'decision': decision,
+        'confidence': confidence,
+        'rsi': technicals['rsi'],
+        'macd': technicals['macd'],
+        'moving_avg': technicals['moving_avg']
     }
 
-def generate_ai_recommendation(symbol, api_key, analysis_type='deep'):
-    """Generate AI recommendation for a stock using OpenAI"""
-    # This would normally call OpenAI API
-    # For demo, return simulated analysis
+def get_signal(symbol, api_key, priority=PRIORITY_NORMAL, analysis_type='quick'):
+    """Lightweight quote + indicator signal, memoized until the quote or history changes"""
+    stock_data = get_stock_data(symbol, api_key, priority)
+    historical_data = get_historical_data(symbol, api_key, Config.INDICATOR_LOOKBACK_DAYS, priority)
+    fingerprint = (stock_data['price'], historical_data.last_date, len(historical_data))
     
-    # Different analysis types yield different confidence levels
-    if analysis_type == 'quick':
-        confidence_range = (60, 80)
-    elif analysis_type == 'predictive':
-        confidence_range = (70, 85)
-    elif analysis_type == 'advanced':
-        confidence_range = (80, 95)
-    else:  # deep analysis
-        confidence_range = (75, 90)
+    key = (symbol, analysis_type)
+    memo = signal_cache.get(key)
+    if memo is not None and memo[0] == fingerprint:
+        analysis = memo[1]
+    else:
+        analysis = compute_signal(get_latest_indicators(symbol, historical_data), analysis_type)
+        signal_cache.set(key, (fingerprint, analysis))
     
-    # Base decisions with weights
-    decisions = ['BUY', 'HOLD', 'SELL']
-    weights = [0.6, 0.3, 0.1]  # More likely to recommend BUY
+    return {
+        'stock': stock_data,
+        'analysis': analysis,
+        'history_demo': historical_data.demo
+    }
+
+def get_signals_batch(symbols, api_key, analysis_type='quick', priority=PRIORITY_NORMAL):
+    """Compute lightweight signals for several symbols concurrently"""
+    result = _fetch_batch(partial(get_signal, analysis_type=analysis_type), symbols, api_key, priority)
+    return {
+        'signals': result['quotes'],
+        'errors': result['errors']
+    }
+
+def get_portfolio_analytics(portfolio, api_key, days=None, priority=PRIORITY_NORMAL):
+    """Risk and return analytics for a {symbol: {'shares', 'avg_price'}} portfolio.
+
+    The aligned price matrix is memoized per set of symbols and rebuilt only
+    when a new bar arrives; the analytics are memoized per holdings on top of it.
+    """
+    days = days or Config.PORTFOLIO_LOOKBACK_DAYS
+    benchmark = Config.PORTFOLIO_BENCHMARK
+    symbols = sorted(portfolio)
+    
+    fetch_history = lambda symbol, api_key, priority: get_historical_data(symbol, api_key, days, priority)
+    batch = _fetch_batch(fetch_history, symbols + [benchmark], api_key, priority)
+    histories = {symbol: series for symbol, series in batch['quotes'].items() if len(series)}
+    errors = batch['errors']
+    for symbol in symbols:
+        if symbol not in histories:
+            errors.setdefault(symbol, 'no price history')
+    
+    held = [symbol for symbol in symbols if symbol in histories]
+    if not held:
+        return {'analytics': None, 'benchmark': benchmark, 'errors': errors}
+    columns = held + ([benchmark] if benchmark in histories and benchmark not in held else [])
+    fingerprint = tuple((symbol, histories[symbol].last_date, histories[symbol].last_close, len(histories[symbol]))
+                        for symbol in columns)
     
-    decision = random.choices(decisions, weights=weights, k=1)[0]
-    confidence = random.randint(*confidence_range)
+    matrix_key = ('matrix', tuple(columns), days)
+    memo = portfolio_cache.get(matrix_key)
+    if memo is not None and memo[0] == fingerprint:
+        dates, prices = memo[1]
+    else:
+        dates, prices = align_prices(histories, columns)
+        portfolio_cache.set(matrix_key, (fingerprint, (dates, prices)))
     
-    # Generate realistic target price based on decision
-    current_price = get_stock_data(symbol, api_key)['price']
+    holdings = tuple((symbol, portfolio[symbol]['shares']) for symbol in held)
+    analytics_key = ('analytics', holdings, days)
+    memo = portfolio_cache.get(analytics_key)
+    if memo is not None and memo[0] == fingerprint:
+        analytics = memo[1]
+    else:
+        benchmark_prices = prices[:, columns.index(benchmark)] if benchmark in columns else None
+        analytics = compute_analytics(dates, held, prices[:, :len(held)], [shares for _, shares in holdings],
+                                      benchmark_prices, Config.PORTFOLIO_VAR_CONFIDENCE)
+        portfolio_cache.set(analytics_key, (fingerprint, analytics))
+    
+    return {
+        'analytics': analytics,
+        'benchmark': benchmark if benchmark in columns else None,
+        'demo_history': [symbol for symbol in columns if histories[symbol].demo],
+        'errors': errors
+    }
+
+def generate_ai_recommendation(symbol, api_key, analysis_type='deep', current_price=None, historical_data=None):
+    """Generate AI recommendation for a stock using OpenAI
+
+    Pass current_price and historical_data when they have already been
+    fetched to avoid looking them up again.
+    """
+    # Technical indicators from price history drive the decision
+    if historical_data is None:
+        historical_data = get_historical_data(symbol, api_key, Config.INDICATOR_LOOKBACK_DAYS)
+    technicals = get_technical_indicators(historical_data)
+    rsi = technicals['rsi']
+    macd = technicals['macd']
+    moving_avg = technicals['moving_avg']
+    
+    signal = compute_signal(technicals, analysis_type)
+    decision = signal['decision']
+    confidence = signal['confidence']
+    
+    # Target price scales with confidence so identical inputs give an identical (cacheable) prompt
+    if current_price is None:
+        current_price = get_stock_data(symbol, api_key)['price']
+    move = 0.05 + 0.20 * max(confidence - 50, 0) / 50
     
     if decision == 'BUY':
-        target_price = round(current_price * random.uniform(1.05, 1.25), 2)
+        target_price = round(current_price * (1 + move), 2)
         reasoning = f"{symbol} shows strong fundamentals with growth potential. Technical indicators suggest upward momentum."
     elif decision == 'SELL':
-        target_price = round(current_price * random.uniform(0.75, 0.95), 2)
+        target_price = round(current_price * (1 - move), 2)
         reasoning = f"{symbol} appears overvalued with weakening technical indicators. Consider taking profits."
     else:  # HOLD
-        target_price = round(current_price * random.uniform(0.98, 1.05), 2)
+        target_price = round(current_price * 1.015, 2)
         reasoning = f"{symbol} is fairly valued at current levels. Maintain position while monitoring market conditions."
     
     # Different reasoning based on analysis type
@@ -221,32 +675,27 @@ def generate_ai_recommendation(symbol, api_key, analysis_type='deep'):
     elif analysis_type == 'predictive':
         reasoning += " Predictive models indicate this trend will continue in the near term."
     
-    # Add some technical indicators
-    rsi = random.randint(30, 70)
-    macd = random.choice(['Bullish', 'Bearish', 'Neutral'])
-    moving_avg = random.choice(['Bullish', 'Bearish', 'Neutral'])
-    
     # Try to use OpenAI for more detailed analysis if API key is available
     if api_key:
         try:
             prompt = f"Provide a detailed analysis of {symbol} stock. Current price: ${current_price}. "
             prompt += f"Recommendation: {decision} with {confidence}% confidence. Target price: ${target_price}. "
+            prompt += f"Technicals: RSI {rsi}, MACD {macd}, moving average {moving_avg}. "
             prompt += "Provide a brief reasoning (2-3 sentences) for this recommendation."
             
-            response = openai.ChatCompletion.create(
+            reasoning = completion_cache.complete(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a financial analyst providing stock recommendations."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=100,
-                temperature=0.7
+                temperature=0.7,
+                request_timeout=Config.OPENAI_TIMEOUT
             )
-            
-            reasoning = response.choices[0].message.content.strip()
-        except:
+        except Exception as e:
             # If OpenAI fails, use the simulated reasoning
-            pass
+            demo_fallbacks.inc(call='openai', reason=type(e).__name__)
     
     return {
         'decision': decision,
@@ -255,83 +704,127 @@ def generate_ai_recommendation(symbol, api_key, analysis_type='deep'):
         'reasoning': reasoning,
         'rsi': rsi,
         'macd': macd,
-        'moving_avg': moving_avg
+        'moving_avg': moving_avg,
+        'indicators': technicals['latest']
     }
 
-def get_company_info(symbol, api_key):
+def get_company_info(symbol, api_key, priority=PRIORITY_NORMAL):
     """Get company information"""
     if api_key == 'demo':
-        # Simulated company info
-        companies = {
-            'AAPL': {'name': 'Apple Inc.', 'sector': 'Technology', 'industry': 'Consumer Electronics', 'description': 'Apple Inc. designs, manufactures, and markets smartphones, personal computers, tablets, wearables, and accessories worldwide.'},
-            'MSFT': {'name': 'Microsoft Corporation', 'sector': 'Technology', 'industry': 'Software', 'description': 'Microsoft Corporation develops, licenses, and supports software, services, devices, and solutions worldwide.'},
-            'TSLA': {'name': 'Tesla, Inc.', 'sector': 'Consumer Cyclical', 'industry': 'Auto Manufacturers', 'description': 'Tesla, Inc. designs, develops, manufactures, leases, and sells electric vehicles, energy generation and storage systems.'},
-            'NVDA': {'name': 'NVIDIA Corporation', 'sector': 'Technology', 'industry': 'Semiconductors', 'description': 'NVIDIA Corporation provides graphics, compute, and networking solutions worldwide.'},
-            'GOOGL': {'name': 'Alphabet Inc.', 'sector': 'Communication Services', 'industry': 'Internet Content', 'description': 'Alphabet Inc. provides online advertising services, cloud computing, software, and hardware.'},
-            'AMZN': {'name': 'Amazon.com, Inc.', 'sector': 'Consumer Cyclical', 'industry': 'Internet Retail', 'description': 'Amazon.com, Inc. engages in the retail sale of consumer products and subscriptions through online and physical stores.'},
-            'META': {'name': 'Meta Platforms, Inc.', 'sector': 'Communication Services', 'industry': 'Internet Content', 'description': 'Meta Platforms, Inc. develops products that enable people to connect and share with friends and family through mobile devices, PCs, and VR headsets.'},
-            'JPM': {'name': 'JPMorgan Chase & Co.', 'sector': 'Financial Services', 'industry': 'Banks', 'description': 'JPMorgan Chase & Co. provides financial and investment banking services worldwide.'},
-            'JNJ': {'name': 'Johnson & Johnson', 'sector': 'Healthcare', 'industry': 'Drug Manufacturers', 'description': 'Johnson & Johnson researches, develops, manufactures, and sells healthcare products worldwide.'},
-            'V': {'name': 'Visa Inc.', 'sector': 'Financial Services', 'industry': 'Credit Services', 'description': 'Visa Inc. operates a payments technology company worldwide.'},
-            'BTC': {'name': 'Bitcoin', 'sector': 'Cryptocurrency', 'industry': 'Digital Currency', 'description': 'Bitcoin is a decentralized digital currency that enables instant payments to anyone, anywhere in the world.'},
-            'ETH': {'name': 'Ethereum', 'sector': 'Cryptocurrency', 'industry': 'Digital Currency', 'description': 'Ethereum is a decentralized, open-source blockchain with smart contract functionality.'}
-        }
-        
-        return companies.get(symbol, {
-            'name': f'{symbol} Corporation',
-            'sector': 'Various',
-            'industry': 'Various',
-            'description': 'Company information not available.'
-        })
+        return _demo_company_info(symbol)
+    
+    # Profiles change rarely: serve the stored copy and refresh stale ones in the background
+    profile, fresh = profile_store.get(symbol)
+    if profile is not None:
+        if not fresh:
+            _refresh_in_background(('OVERVIEW', symbol), lambda: _fetch_company_info(symbol, api_key, PRIORITY_BACKGROUND))
+        return profile
     
     # Real API call for company overview
     try:
-        url = f'https://www.alphavantage.co/query?function=OVERVIEW&symbol={symbol}&apikey={api_key}'
-        response = requests.get(url)
-        data = response.json()
+        profile = _fetch_company_info(symbol, api_key, priority)
+        if profile is None:
+            demo_fallbacks.inc(call='get_company_info', reason='empty_response')
+            return dict(_demo_company_info(symbol), demo=True)
+        return profile
+    except RateLimited:
+        return dict(_demo_company_info(symbol), demo=True, rate_limited=True)
+    except Exception as e:
+        demo_fallbacks.inc(call='get_company_info', reason=type(e).__name__)
+        return dict(_demo_company_info(symbol), demo=True)
+
+def _demo_company_info(symbol):
+    """Simulated company profile for demo mode"""
+    companies = {
+        'AAPL': {'name': 'Apple Inc.', 'sector': 'Technology', 'industry': 'Consumer Electronics', 'description': 'Apple Inc. designs, manufactures, and markets smartphones, personal computers, tablets, wearables, and accessories worldwide.'},
+        'MSFT': {'name': 'Microsoft Corporation', 'sector': 'Technology', 'industry': 'Software', 'description': 'Microsoft Corporation develops, licenses, and supports software, services, devices, and solutions worldwide.'},
+        'TSLA': {'name': 'Tesla, Inc.', 'sector': 'Consumer Cyclical', 'industry': 'Auto Manufacturers', 'description': 'Tesla, Inc. designs, develops, manufactures, leases, and sells electric vehicles, energy generation and storage systems.'},
+        'NVDA': {'name': 'NVIDIA Corporation', 'sector': 'Technology', 'industry': 'Semiconductors', 'description': 'NVIDIA Corporation provides graphics, compute, and networking solutions worldwide.'},
+        'GOOGL': {'name': 'Alphabet Inc.', 'sector': 'Communication Services', 'industry': 'Internet Content', 'description': 'Alphabet Inc. provides online advertising services, cloud computing, software, and hardware.'},
+        'AMZN': {'name': 'Amazon.com, Inc.', 'sector': 'Consumer Cyclical', 'industry': 'Internet Retail', 'description': 'Amazon.com, Inc. engages in the retail sale of consumer products and subscriptions through online and physical stores.'},
+        'META': {'name': 'Meta Platforms, Inc.', 'sector': 'Communication Services', 'industry': 'Internet Content', 'description': 'Meta Platforms, Inc. develops products that enable people to connect and share with friends and family through mobile devices, PCs, and VR headsets.'},
+        'JPM': {'name': 'JPMorgan Chase & Co.', 'sector': 'Financial Services', 'industry': 'Banks', 'description': 'JPMorgan Chase & Co. provides financial and investment banking services worldwide.'},
+        'JNJ': {'name': 'Johnson & Johnson', 'sector': 'Healthcare', 'industry': 'Drug Manufacturers', 'description': 'Johnson & Johnson researches, develops, manufactures, and sells healthcare products worldwide.'},
+        'V': {'name': 'Visa Inc.', 'sector': 'Financial Services', 'industry': 'Credit Services', 'description': 'Visa Inc. operates a payments technology company worldwide.'},
+        'BTC': {'name': 'Bitcoin', 'sector': 'Cryptocurrency', 'industry': 'Digital Currency', 'description': 'Bitcoin is a decentralized digital currency that enables instant payments to anyone, anywhere in the world.'},
+        'ETH': {'name': 'Ethereum', 'sector': 'Cryptocurrency', 'industry': 'Digital Currency', 'description': 'Ethereum is a decentralized, open-source blockchain with smart contract functionality.'}
+    }
+    
+    return companies.get(symbol, {
+        'name': f'{symbol} Corporation',
+        'sector': 'Various',
+        'industry': 'Various',
+        'description': 'Company information not available.'
+    })
+
+def _fetch_company_info(symbol, api_key, priority=PRIORITY_NORMAL):
+    """Fetch the OVERVIEW profile into the profile store; None if the response has no profile"""
+    url = f'{Config.ALPHA_VANTAGE_URL}?function=OVERVIEW&symbol={symbol}&apikey={api_key}'
+    with upstream_latency.time(call='get_company_info'):
+        data = _alpha_vantage_query(url, priority)
+    
+    if data and 'Name' in data:
+        profile = {
+            'name': data.get('Name', ''),
+            'sector': data.get('Sector', ''),
+            'industry': data.get('Industry', ''),
+            'description': data.get('Description', '')[:200] + '...' if data.get('Description') else ''
+        }
+        profile_store.put(symbol, profile)
+        return profile
+    return None
+
+def preload_profiles(symbols, api_key, force=False, progress=None):
+    """Warm the profile store for a symbol universe at background priority.
+
+    Requests are paced by the shared rate limiter; a symbol refused by the
+    limiter or the provider is retried after RATE_LIMIT_MAX_WAIT seconds.
+    Demo mode serves simulated profiles, so every symbol is skipped.
+    """
+    result = {'loaded': 0, 'skipped': 0, 'failed': 0}
+    if api_key == 'demo':
+        result['skipped'] = len(symbols)
+        return result
+    
+    for symbol in symbols:
+        if not force and profile_store.is_fresh(symbol):
+            result['skipped'] += 1
+            continue
         
-        if data and 'Name' in data:
-            return {
-                'name': data.get('Name', ''),
-                'sector': data.get('Sector', ''),
-                'industry': data.get('Industry', ''),
-                'description': data.get('Description', '')[:200] + '...' if data.get('Description') else ''
-            }
-        else:
-            return get_company_info(symbol, 'demo')
-    except:
-        return get_company_info(symbol, 'demo')
+        loaded = False
+        for attempt in range(Config.PROFILE_PRELOAD_ATTEMPTS):
+            try:
+                loaded = _fetch_company_info(symbol, api_key, PRIORITY_BACKGROUND) is not None
+                break
+            except RateLimited:
+                time.sleep(Config.RATE_LIMIT_MAX_WAIT)
+            except Exception:
+                break
+        
+        result['loaded' if loaded else 'failed'] += 1
+        if progress is not None:
+            progress(symbol, loaded)
+    
+    return result
 
 def get_live_market_data(alpha_vantage_key, finnhub_key):
     """Get live market data including indices"""
     # Simulate market data
-    indices = {
-        'SPY': {'name': 'S&P 500', 'price': 4500 + (random.random() - 0.5) * 100, 'change': (random.random() - 0.5) * 2},
-        'QQQ': {'name': 'NASDAQ 100', 'price': 370 + (random.random() - 0.5) * 10, 'change': (random.random() - 0.5) * 2},
-        'DIA': {'name': 'Dow Jones', 'price': 35000 + (random.random() - 0.5) * 500, 'change': (random.random() - 0.5) * 2},
-        'IWM': {'name': 'Russell 2000', 'price': 190 + (random.random() - 0.5) * 10, 'change': (random.random() - 0.5) * 2},
-        'VIX': {'name': 'Volatility Index', 'price': 18 + (random.random() - 0.5) * 5, 'change': (random.random() - 0.5) * 2}
-    }
-    
-    # Calculate change percent
-    for key in indices:
-        indices[key]['change_percent'] = (indices[key]['change'] / indices[key]['price']) * 100
+    index_names = {'SPY': 'S&P 500', 'QQQ': 'NASDAQ 100', 'DIA': 'Dow Jones', 'IWM': 'Russell 2000', 'VIX': 'Volatility Index'}
+    indices = {}
+    for key, name in index_names.items():
+        quote = demo_market.quote(key)
+        indices[key] = {'name': name, 'price': quote['price'], 'change': quote['change'], 'change_percent': quote['change_percent']}
     
-    # Get popular stocks
+    # Get popular stocks and cryptocurrencies concurrently
     popular_stocks = ['AAPL', 'MSFT', 'TSLA', 'NVDA', 'GOOGL', 'AMZN', 'META', 'JPM', 'JNJ', 'V']
-    stocks_data = []
-    
-    for symbol in popular_stocks:
-        stock_data = get_stock_data(symbol, alpha_vantage_key)
-        stocks_data.append(stock_data)
-    
-    # Get popular cryptocurrencies
     popular_crypto = ['BTC', 'ETH', 'ADA', 'DOGE']
-    crypto_data = []
     
-    for symbol in popular_crypto:
-        crypto = get_crypto_data(symbol, alpha_vantage_key)
-        crypto_data.append(crypto)
+    stocks = get_stock_data_batch(popular_stocks, alpha_vantage_key, PRIORITY_BACKGROUND)['quotes']
+    cryptos = get_crypto_data_batch(popular_crypto, alpha_vantage_key, PRIORITY_BACKGROUND)['quotes']
+    
+    stocks_data = [stocks[symbol] for symbol in popular_stocks if symbol in stocks]
+    crypto_data = [cryptos[symbol] for symbol in popular_crypto if symbol in cryptos]
     
     return {
         'indices': indices,
@@ -339,6 +832,120 @@ def get_live_market_data(alpha_vantage_key, finnhub_key):
         'crypto': crypto_data
     }
 
+def get_news_headlines(news_api_key):
+    """Get business headlines from NewsAPI, or simulated ones in demo mode"""
+    # Try to get real news if API key is available
+    if news_api_key and news_api_key != 'news_demo_key':
+        url = f'{Config.NEWS_API_URL}/top-headlines?category=business&country=us&pageSize=100&apiKey={news_api_key}'
+        # Failures propagate so the news ingestor keeps its last good headlines
+        breaker = breakers.get('newsapi', 'top-headlines')
+        breaker.check()
+        try:
+            with upstream_latency.time(call='newsapi'):
+                data = provider_client.get('newsapi', url).json()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        
+        if data.get('articles'):
+            articles = []
+            for article in data['articles']:
+                articles.append({
+                    'title': article.get('title', 'No title'),
+                    'source': article.get('source', {}).get('name', 'Unknown'),
+                    'time': article.get('publishedAt', ''),
+                    'url': article.get('url', '#'),
+                    'image': article.get('urlToImage', ''),
+                    'description': article.get('description', 'No description available')
+                })
+            return articles
+    
+    # Fallback to simulated news
+    symbols = ['AAPL', 'MSFT', 'TSLA', 'NVDA', 'GOOGL', 'AMZN', 'META', 'JPM', 'JNJ', 'V']
+    companies = ['Apple', 'Microsoft', 'Tesla', 'NVIDIA', 'Google', 'Amazon', 'Meta', 'JPMorgan', 'Johnson & Johnson', 'Visa']
+    
+    news_items = []
+    for i in range(10):
+        company_idx = random.randint(0, len(symbols)-1)
+        sentiment = random.choice(['positive', 'neutral', 'negative'])
+        
+        if sentiment == 'positive':
+            titles = [
+                f"{companies[company_idx]} Reports Strong Quarterly Earnings",
+                f"{companies[company_idx]} Stock Soars on New Product Launch",
+                f"Analysts Upgrade {companies[company_idx]} to Buy Rating",
+                f"{companies[company_idx]} Announces Breakthrough Innovation"
+            ]
+        elif sentiment == 'negative':
+            titles = [
+                f"{companies[company_idx]} Faces Regulatory Challenges",
+                f"{companies[company_idx]} Stock Dips on Market Concerns",
+                f"Analysts Express Caution on {companies[company_idx]} Future",
+                f"{companies[company_idx]} Misses Revenue Expectations"
+            ]
+        else:
+            titles = [
+                f"{companies[company_idx]} Holds Steady in Volatile Market",
+                f"{companies[company_idx]} Announces New Partnership",
+                f"Market Watchers Neutral on {companies[company_idx]} Prospects",
+                f"{companies[company_idx]} CEO Speaks at Industry Conference"
+            ]
+        
+        news_items.append({
+            'title': random.choice(titles),
+            'source': random.choice(['Bloomberg', 'Reuters', 'CNBC', 'Wall Street Journal']),
+            'time': (datetime.now() - timedelta(hours=random.randint(1, 12))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'url': '#',
+            'image': '',
+            'description': 'This is a sample news description for demonstration purposes.'
+        })
+    
+    return news_items
+
+def _clamp_score(value):
+    return max(0.0, min(100.0, value))
+
+def get_market_sentiment(market_data, api_key, news_items):
+    """Aggregate a 0-100 bearish-to-bullish market score from data we already fetch"""
+    components = {}
+    
+    # Broad index moves: +/-2% average change maps to the ends of the scale, a rising VIX pulls it down
+    indices = market_data.get('indices', {})
+    changes = [indices[symbol]['change_percent'] for symbol in ('SPY', 'QQQ', 'DIA', 'IWM') if symbol in indices]
+    if changes:
+        score = 50 + 25 * sum(changes) / len(changes)
+        if 'VIX' in indices:
+            score -= 2.5 * indices['VIX']['change_percent']
+        components['indices'] = round(_clamp_score(score), 1)
+    
+    # Per-symbol news sentiment for the popular stocks on the overview
+    symbols = [stock['symbol'] for stock in market_data.get('stocks', [])]
+    if symbols:
+        scores = [analyze_stock_sentiment(symbol, api_key)['score'] for symbol in symbols]
+        components['stocks'] = round(_clamp_score(100 * sum(scores) / len(scores)), 1)
+    
+    # Headline tone from the lexicon-scored news feed
+    labels = [item['sentiment'] for item in news_items if item.get('sentiment')]
+    if labels:
+        balance = (labels.count('positive') - labels.count('negative')) / len(labels)
+        components['news'] = round(50 + 50 * balance, 1)
+    
+    weights = {'indices': 0.4, 'stocks': 0.3, 'news': 0.3}
+    total = sum(weights[name] for name in components)
+    score = round(sum(weights[name] * value for name, value in components.items()) / total) if total else 50
+    
+    return {
+        'score': score,
+        'label': 'Bullish' if score > 70 else 'Neutral' if score > 40 else 'Bearish',
+        'components': components,
+        'updated_at': datetime.now().isoformat()
+    }
+
+# Headlines are pulled on a schedule, deduplicated and scored into a per-symbol index.
+# app.py starts it with the NewsAPI key it uses everywhere else.
+news_ingestor = NewsIngestor(interval=Config.NEWS_INGEST_INTERVAL, window=Config.NEWS_SENTIMENT_WINDOW)
+
 def get_earnings_calendar(api_key):
     """Get earnings calendar data"""
     # Simulate earnings data
@@ -0,0 +1,134 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+ALERT_TYPES = ('price_above', 'price_below')
+
+
+class AlertIndex:
+    """Per-symbol sorted threshold lists so one quote finds every crossed alert by bisection"""
+
+    def __init__(self):
+        self._above = {}  # symbol -> sorted [(target_price, alert_id, uid)]
+        self._below = {}
+        self._lock = threading.Lock()
+
+    def add(self, uid, alert):
+        if alert.get('alert_type') not in ALERT_TYPES or alert.get('triggered'):
+            return
+        book = self._above if alert['alert_type'] == 'price_above' else self._below
+        with self._lock:
+            insort(book.setdefault(alert['symbol'], []), (alert['target_price'], alert['id'], uid))
+
+    def crossed(self, symbol, price):
+        """Remove and return (alert_id, uid) for every alert the price crosses"""
+        with self._lock:
+            triggered = []
+            above = self._above.get(symbol)
+            if above:
+                # price_above fires for every target <= price
+                cut = bisect_right(above, (price, float('inf')))
+                triggered += above[:cut]
+                del above[:cut]
+            below = self._below.get(symbol)
+            if below:
+                # price_below fires for every target >= price
+                cut = bisect_left(below, (price, float('-inf')))
+                triggered += below[cut:]
+                del below[cut:]
+            return [(alert_id, uid) for _, alert_id, uid in triggered]
+
+    def symbols(self):
+        with self._lock:
+            return sorted({symbol for symbol, entries in self._above.items() if entries} |
+                          {symbol for symbol, entries in self._below.items() if entries})
+
+    def __len__(self):
+        with self._lock:
+            return sum(map(len, self._above.values())) + sum(map(len, self._below.values()))
+
+
+class AlertEngine:
+    """Evaluates price alerts off the request path.
+
+    Every quote stored in the quote cache is evaluated as it is stored, and
+    reads in between return that same already-evaluated price, so an alert
+    on a requested symbol fires as soon as the crossing price is fetched.
+    A new alert is checked against the cached quote when it is added. A
+    background thread refreshes quotes for alert symbols nobody else is
+    requesting and picks up alerts created by other processes, so those
+    fire at most interval seconds plus one upstream fetch late.
+    """
+
+    def __init__(self, store, fetch_quotes, interval=30, cached_quote=None):
+        self.store = store
+        self.fetch_quotes = fetch_quotes
+        self.cached_quote = cached_quote
+        self.interval = interval
+        self.index = AlertIndex()
+        self.triggered = 0
+        self.evaluations = 0
+        self._last_id = 0
+        self._load_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def load(self):
+        """Index active alerts created since the last load"""
+        with self._load_lock:
+            for uid, alert in self.store.get_active_alerts(self._last_id):
+                self.index.add(uid, alert)
+                self._last_id = max(self._last_id, alert['id'])
+
+    def add_alert(self, uid, alert):
+        alert = self.store.add_alert(uid, alert)
+        self.load()
+        # A target the current price has already crossed fires now, not on the next quote
+        quote = self.cached_quote(alert['symbol']) if self.cached_quote else None
+        if quote:
+            self.on_quote(alert['symbol'], quote)
+        return alert
+
+    def on_quote(self, symbol, quote):
+        price = quote.get('price')
+        # Don't fire on placeholder quotes served while rate limited or simulated after a failure
+        if price is None or quote.get('rate_limited') or quote.get('demo'):
+            return
+        self.evaluations += 1
+        triggered_at = datetime.now().isoformat()
+        for alert_id, uid in self.index.crossed(symbol, price):
+            if self.store.trigger_alert(uid, alert_id, triggered_at, price):
+                self.triggered += 1
+
+    def on_cache_update(self, key, value):
+        """Quote cache listener"""
+        if key[0] == 'GLOBAL_QUOTE':
+            self.on_quote(key[1], value)
+
+    def start(self):
+        if self._thread is None:
+            self.load()
+            self._thread = threading.Thread(target=self._run, name='alert-engine', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.load()
+                symbols = self.index.symbols()
+                if symbols:
+                    for symbol, quote in self.fetch_quotes(symbols).items():
+                        self.on_quote(symbol, quote)
+            except Exception:
+                pass
+
+    def stats(self):
+        return {
+            'active_alerts': len(self.index),
+            'symbols': len(self.index.symbols()),
+            'evaluations': self.evaluations,
+            'triggered': self.triggered
+        }
@@ -1,12 +1,30 @@
 import os
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, g, render_template, request, jsonify, session
 from dotenv import load_dotenv
-import requests
 import json
-import random
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from datetime import datetime, timedelta
+from functools import partial
+import click
 import openai
-from Utils import get_stock_data, analyze_stock_sentiment, generate_ai_recommendation, get_historical_data, get_company_info, get_live_market_data, get_crypto_data, get_earnings_calendar
+from alerts import AlertEngine
+from circuit_breaker import breakers
+from config import Config
+from http_client import provider_client
+from llm_cache import completion_cache
+from profile_store import profile_store, read_universe
+import metrics
+import responses
+from responses import cache_for, choose_encoding, seconds_until_refresh
+from rate_limit import alpha_vantage_limiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from session_store import create_session_store
+from snapshots import SnapshotRefresher
+from streaming import QuoteHub
+from Utils import get_stock_data, get_stock_data_batch, analyze_stock_sentiment, generate_ai_recommendation, get_historical_data, get_company_info, get_live_market_data, get_crypto_data, get_earnings_calendar, get_market_sentiment, get_news_headlines, get_technical_indicators, get_signals_batch, get_portfolio_analytics, news_ingestor, QUOTE_FLAGS, demo_market, portfolio_cache, preload_profiles, quote_cache, signal_cache
 
 load_dotenv()
 
@@ -15,28 +33,198 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=1)
 
 # API Keys
-ALPHA_VANTAGE_KEY = os.getenv('ALPHA_VANTAGE_KEY', 'CHVDL5H219M0TC52')
+ALPHA_VANTAGE_KEY = os.getenv('ALPHA_VANTAGE_KEY', 'demo')
 NEWS_API_KEY = os.getenv('NEWS_API_KEY', 'dc517623172a43488715b3bf39110bf6')
 OPENAI_KEY = os.getenv('OPENAI_KEY', '')
 FINNHUB_KEY = os.getenv('FINNHUB_KEY', '')
 
-# Configure OpenAI
+# Configure OpenAI to share the pooled keep-alive session
 openai.api_key = OPENAI_KEY
+openai.api_base = Config.OPENAI_API_BASE
+openai.requestssession = provider_client.session(openai.api_base)
+
+# Bounded pool for the independent stages of /api/analyze
+analyze_executor = ThreadPoolExecutor(max_workers=Config.ANALYZE_WORKERS, thread_name_prefix='analyze')
+
+# Server-side quote pollers shared by every /api/stream client
+quote_hub = QuoteHub(lambda symbol: get_stock_data(symbol, ALPHA_VANTAGE_KEY), interval=Config.STREAM_POLL_INTERVAL)
+
+# Per-user state lives server-side; the cookie only carries the user id
+session_store = create_session_store(Config.SESSION_TYPE, Config.SESSION_DB_PATH)
+
+# Price alerts are evaluated in the background from quote updates
+alert_engine = AlertEngine(session_store, lambda symbols: get_stock_data_batch(symbols, ALPHA_VANTAGE_KEY, PRIORITY_BACKGROUND)['quotes'], interval=Config.ALERT_EVAL_INTERVAL,
+                           cached_quote=lambda symbol: quote_cache.get(('GLOBAL_QUOTE', symbol)))
+quote_cache.add_listener(alert_engine.on_cache_update)
+
+# Market overview is rebuilt in the background and served pre-serialized
+market_overview_snapshot = SnapshotRefresher('market_overview', lambda: get_live_market_data(ALPHA_VANTAGE_KEY, FINNHUB_KEY), interval=Config.MARKET_OVERVIEW_INTERVAL)
+
+def build_market_sentiment():
+    """One aggregate sentiment score per interval, reusing the current market overview"""
+    overview = market_overview_snapshot.current
+    market_data = overview.data if overview is not None else get_live_market_data(ALPHA_VANTAGE_KEY, FINNHUB_KEY)
+    return get_market_sentiment(market_data, ALPHA_VANTAGE_KEY, news_ingestor.latest(Config.NEWS_SENTIMENT_HEADLINES))
+
+# Sentiment is computed once per interval and pushed to every /api/stream client
+market_sentiment_snapshot = SnapshotRefresher('market_sentiment', build_market_sentiment, interval=Config.MARKET_SENTIMENT_INTERVAL,
+                                              on_refresh=lambda data: quote_hub.broadcast('sentiment', data))
+
+_background_started = False
+_background_lock = threading.Lock()
+
+def start_background_workers():
+    """Start background refreshers once per process, on the first request"""
+    global _background_started
+    if _background_started:
+        return
+    with _background_lock:
+        if not _background_started:
+            news_ingestor.start(partial(get_news_headlines, NEWS_API_KEY))
+            market_overview_snapshot.start()
+            market_sentiment_snapshot.start()
+            alert_engine.start()
+            if Config.PROFILE_UNIVERSE_FILE:
+                symbols = read_universe(Config.PROFILE_UNIVERSE_FILE)
+                threading.Thread(target=preload_profiles, args=(symbols, ALPHA_VANTAGE_KEY), name='profile-preload', daemon=True).start()
+            _background_started = True
+
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+def _stage_result(future, started, name, unavailable):
+    """Wait for one analysis stage, recording a timeout or failure instead of raising"""
+    try:
+        return future.result(timeout=max(started + Config.ANALYZE_STAGE_TIMEOUT - time.monotonic(), 0))
+    except TimeoutError:
+        unavailable[name] = 'timeout'
+        metrics.stage_failures.inc(stage=name, reason='timeout')
+    except Exception as e:
+        unavailable[name] = str(e) or 'error'
+        metrics.stage_failures.inc(stage=name, reason='error')
+    return None
+
+def component_metrics():
+    """Prometheus lines for stats the caches, HTTP client and rate limiter already keep"""
+    caches = {'quotes': quote_cache.stats(), 'signals': signal_cache.stats(), 'portfolios': portfolio_cache.stats(),
+              'completions': completion_cache.stats()}
+    lines = []
+    for field in ('hits', 'misses', 'stale', 'coalesced', 'evictions'):
+        lines += metrics.render_samples(f'stocksense_cache_{field}_total', 'counter', f'Cache {field}',
+                                        [({'cache': name}, stats[field]) for name, stats in caches.items()])
+    lines += metrics.render_samples('stocksense_cache_size', 'gauge', 'Cache entries',
+                                    [({'cache': name}, stats['size']) for name, stats in caches.items()])
+    
+    providers = provider_client.stats()['providers']
+    lines += ['# HELP stocksense_provider_http_duration_seconds Upstream HTTP latency by provider',
+              '# TYPE stocksense_provider_http_duration_seconds histogram']
+    for provider, stats in providers.items():
+        if stats['latency']:
+            lines += metrics.render_histogram('stocksense_provider_http_duration_seconds', {'provider': provider}, stats['latency'])
+    lines += metrics.render_samples('stocksense_provider_http_errors_total', 'counter', 'Upstream HTTP errors and timeouts',
+                                    [({'provider': provider}, stats['errors']) for provider, stats in providers.items()])
+    lines += metrics.render_samples('stocksense_provider_http_retries_total', 'counter', 'Upstream HTTP retries',
+                                    [({'provider': provider}, stats['retries']) for provider, stats in providers.items()])
+    
+    limiter = alpha_vantage_limiter.stats()
+    lines += metrics.render_samples('stocksense_rate_limiter_tokens_total', 'counter', 'Rate limiter decisions',
+                                    [({'provider': 'alphavantage', 'result': 'granted'}, limiter['granted']),
+                                     ({'provider': 'alphavantage', 'result': 'rejected'}, limiter['rejected'])])
+    lines += metrics.render_samples('stocksense_rate_limiter_queue_depth', 'gauge', 'Callers waiting for a token',
+                                    [({'provider': 'alphavantage'}, limiter['queue_depth'])])
+    
+    circuits = breakers.stats()
+    lines += metrics.render_samples('stocksense_circuit_open', 'gauge', 'Circuit breakers currently open or half-open',
+                                    [({'breaker': name}, int(stats['state'] != 'closed')) for name, stats in circuits.items()])
+    lines += metrics.render_samples('stocksense_circuit_short_circuited_total', 'counter', 'Calls skipped by an open breaker',
+                                    [({'breaker': name}, stats['short_circuited']) for name, stats in circuits.items()])
+    return lines
+
+metrics.registry.add_collector(component_metrics)
+
+def analysis_response(stock_data, analysis, history, company_info, news_sentiment, unavailable, history_format='records'):
+    """Assemble the /api/analyze payload; charts only need the last CHART_DAYS of history"""
+    return {
+        'stock': stock_data,
+        'analysis': analysis,
+        'historical_data': history[-Config.CHART_DAYS:].to_json(history_format) if history else None,
+        'indicators': get_technical_indicators(history, Config.CHART_DAYS)['series'] if history else None,
+        'history_demo': history.demo if history else False,
+        'company_info': company_info,
+        'news_sentiment': news_sentiment,
+        'partial': bool(unavailable),
+        'unavailable': unavailable
+    }
 
-# Initialize session data
 @app.before_request
 def before_request():
-    if 'watchlist' not in session:
-        session['watchlist'] = ['AAPL', 'MSFT', 'NVDA', 'TSLA', 'GOOGL', 'AMZN', 'META', 'JPM', 'JNJ', 'V']
-    if 'portfolio' not in session:
-        session['portfolio'] = {
-            'AAPL': {'shares': 10, 'avg_price': 150.25},
-            'MSFT': {'shares': 5, 'avg_price': 280.50},
-            'NVDA': {'shares': 8, 'avg_price': 420.75},
-            'V': {'shares': 15, 'avg_price': 210.30}
-        }
-    if 'price_alerts' not in session:
-        session['price_alerts'] = []
+    g.request_started = time.monotonic()
+    g.profiler = metrics.profiler.start()
+    start_background_workers()
+
+def current_uid():
+    """The caller's user id, creating the user and the session cookie on first use.
+
+    Only routes that touch per-user state call this, so cookieless requests
+    to public, metrics and static routes store nothing and set no cookie.
+    Legacy cookie-serialized state is migrated into the store here.
+    """
+    if 'uid' in g:
+        return g.uid
+    
+    if 'uid' not in session:
+        session['uid'] = uuid.uuid4().hex
+    g.uid = session['uid']
+    
+    if any(key in session for key in ('watchlist', 'portfolio', 'price_alerts')):
+        session_store.import_session(
+            g.uid,
+            watchlist=session.pop('watchlist', None),
+            portfolio=session.pop('portfolio', None),
+            alerts=session.pop('price_alerts', None)
+        )
+    if 'theme' in session:
+        session_store.set_pref(current_uid(), 'theme', session.pop('theme'))
+    
+    session_store.ensure_user(current_uid())
+    return g.uid
+
+@app.after_request
+def record_request_metrics(response):
+    if g.get('profiler') is not None:
+        metrics.profiler.stop(g.pop('profiler'))
+    if 'request_started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe_request(route, request.method, response.status_code, time.monotonic() - g.request_started)
+    return response
+
+# Registered after the metrics hook so it runs first and 304s are recorded as such
+@app.after_request
+def finalize_response(response):
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    return responses.finalize(response, response.get_data(), request)
+
+def snapshot_response(snapshot):
+    """Serve a pre-serialized snapshot, compressed once per snapshot rather than per request"""
+    encoding = choose_encoding(request.accept_encodings) if len(snapshot.body) >= Config.COMPRESS_MIN_BYTES else None
+    response = Response(snapshot.encoded(encoding), mimetype='application/json')
+    if encoding:
+        response.content_encoding = encoding
+    response.set_etag(snapshot.etag)
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/profile')
+def profile_report():
+    if not metrics.profiler.enabled:
+        return jsonify({'error': 'Profiling is disabled (set PROFILE_SAMPLE_RATE)'}), 404
+    return Response(metrics.profiler.report(), mimetype='text/plain')
 
 @app.route('/')
 def landing():
@@ -55,6 +243,61 @@ def get_stock(symbol):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/quotes')
+def get_quotes():
+    try:
+        symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+        
+        if not symbols:
+            return jsonify({'error': 'No symbols provided'}), 400
+        if len(symbols) > Config.MAX_BATCH_SYMBOLS:
+            return jsonify({'error': f'Too many symbols (max {Config.MAX_BATCH_SYMBOLS})'}), 400
+        
+        return jsonify(get_stock_data_batch(symbols, ALPHA_VANTAGE_KEY))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/stream')
+def stream_quotes():
+    # Clients without symbols still receive broadcast events such as market sentiment
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    
+    if len(symbols) > Config.MAX_BATCH_SYMBOLS:
+        return jsonify({'error': f'Too many symbols (max {Config.MAX_BATCH_SYMBOLS})'}), 400
+    
+    subscription = quote_hub.subscribe(symbols)
+    
+    def events():
+        try:
+            yield f'retry: {Config.STREAM_RETRY_MS}\n\n'
+            while True:
+                try:
+                    event, data = subscription.get(timeout=Config.STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield sse_event(event, data)
+        finally:
+            quote_hub.unsubscribe(subscription)
+    
+    return Response(events(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+@app.route('/api/stream/stats')
+def stream_stats():
+    return jsonify(quote_hub.stats())
+
+@app.route('/api/snapshots/stats')
+def snapshot_stats():
+    return jsonify({'market_overview': market_overview_snapshot.stats(), 'market_sentiment': market_sentiment_snapshot.stats()})
+
+@app.route('/api/news/stats')
+def news_stats():
+    return jsonify(news_ingestor.stats())
+
+@app.route('/api/alerts/stats')
+def alert_stats():
+    return jsonify(alert_engine.stats())
+
 @app.route('/api/crypto/<symbol>')
 def get_crypto(symbol):
     try:
@@ -63,112 +306,120 @@ def get_crypto(symbol):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/stats')
+def cache_stats():
+    return jsonify({'quotes': quote_cache.stats(), 'signals': signal_cache.stats(), 'portfolios': portfolio_cache.stats(),
+                    'completions': completion_cache.stats(), 'profiles': profile_store.stats(), 'demo_market': demo_market.stats()})
+
+@app.route('/api/providers/stats')
+def provider_stats():
+    stats = provider_client.stats()
+    stats['rate_limits'] = {'alphavantage': alpha_vantage_limiter.stats()}
+    stats['breakers'] = breakers.stats()
+    return jsonify(stats)
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     try:
         data = request.get_json()
         symbol = data.get('symbol', '')
         analysis_type = data.get('analysis_type', 'deep')
+        history_format = data.get('history_format', 'records')
         
         if not symbol:
             return jsonify({'error': 'No symbol provided'}), 400
             
-        # Get stock data
-        stock_data = get_stock_data(symbol, ALPHA_VANTAGE_KEY)
+        # Independent stages run concurrently under one shared deadline
+        started = time.monotonic()
+        stock_future = analyze_executor.submit(get_stock_data, symbol, ALPHA_VANTAGE_KEY, PRIORITY_INTERACTIVE)
+        historical_future = analyze_executor.submit(get_historical_data, symbol, ALPHA_VANTAGE_KEY, Config.INDICATOR_LOOKBACK_DAYS, PRIORITY_INTERACTIVE)
+        company_future = analyze_executor.submit(get_company_info, symbol, ALPHA_VANTAGE_KEY, PRIORITY_INTERACTIVE)
+        sentiment_future = analyze_executor.submit(analyze_stock_sentiment, symbol, NEWS_API_KEY)
+        unavailable = {}
         
-        # Get historical data for chart
-        historical_data = get_historical_data(symbol, ALPHA_VANTAGE_KEY)
+        # The recommendation reuses the quote and history instead of fetching them again
+        stock_data = _stage_result(stock_future, started, 'stock', unavailable)
+        history = _stage_result(historical_future, started, 'historical_data', unavailable)
+        analysis = None
+        if stock_data and history:
+            analysis_future = analyze_executor.submit(generate_ai_recommendation, symbol, OPENAI_KEY, analysis_type, stock_data['price'], history)
+            analysis = _stage_result(analysis_future, started, 'analysis', unavailable)
+        else:
+            unavailable['analysis'] = 'stock data unavailable'
+        
+        company_info = _stage_result(company_future, started, 'company_info', unavailable)
+        news_sentiment = _stage_result(sentiment_future, started, 'news_sentiment', unavailable)
+        
+        return jsonify(analysis_response(stock_data, analysis, history, company_info, news_sentiment, unavailable, history_format))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        data = request.get_json()
+        symbols = [s.strip().upper() for s in data.get('symbols', []) if s.strip()]
+        analysis_type = data.get('analysis_type', 'quick')
         
-        # Get AI analysis
-        analysis = generate_ai_recommendation(symbol, OPENAI_KEY, analysis_type)
+        if not symbols:
+            return jsonify({'error': 'No symbols provided'}), 400
+        if len(symbols) > Config.MAX_BATCH_SYMBOLS:
+            return jsonify({'error': f'Too many symbols (max {Config.MAX_BATCH_SYMBOLS})'}), 400
         
-        # Get company info
-        company_info = get_company_info(symbol, ALPHA_VANTAGE_KEY)
+        return jsonify(get_signals_batch(symbols, ALPHA_VANTAGE_KEY, analysis_type))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/history/<symbol>')
+def get_history(symbol):
+    """Daily history, columnar by default; ?max_points= downsamples it for charts"""
+    try:
+        days = min(max(request.args.get('days', Config.CHART_DAYS, type=int), 1), Config.HISTORY_MAX_DAYS)
+        history_format = request.args.get('format', 'columnar')
+        max_points = request.args.get('max_points', type=int)
         
-        # Get news sentiment
-        news_sentiment = analyze_stock_sentiment(symbol, NEWS_API_KEY)
+        if history_format not in ('columnar', 'records'):
+            return jsonify({'error': 'Invalid format'}), 400
         
-        return jsonify({
-            'stock': stock_data,
-            'analysis': analysis,
-            'historical_data': historical_data,
-            'company_info': company_info,
-            'news_sentiment': news_sentiment
-        })
+        history = get_historical_data(symbol.upper(), ALPHA_VANTAGE_KEY, days)
+        return jsonify({'symbol': symbol.upper(), 'history': history.to_json(history_format, max_points), 'demo': history.demo})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/market/overview')
-def market_overview():
+@app.route('/api/indicators/<symbol>')
+def get_indicators(symbol):
     try:
-        data = get_live_market_data(ALPHA_VANTAGE_KEY, FINNHUB_KEY)
-        return jsonify(data)
+        days = min(max(request.args.get('days', Config.CHART_DAYS, type=int), 1), 365)
+        historical_data = get_historical_data(symbol.upper(), ALPHA_VANTAGE_KEY, days + Config.INDICATOR_LOOKBACK_DAYS)
+        indicators = get_technical_indicators(historical_data, days)
+        indicators['symbol'] = symbol.upper()
+        return jsonify(indicators)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/market/overview')
+@cache_for(lambda: seconds_until_refresh(market_overview_snapshot.current.built_at, market_overview_snapshot.interval))
+def market_overview():
+    snapshot = market_overview_snapshot.current
+    if snapshot is None:
+        return jsonify({'error': 'Market overview is warming up'}), 503, {'Retry-After': '5'}
+    
+    return snapshot_response(snapshot)
+
+@app.route('/api/market/sentiment')
+@cache_for(lambda: seconds_until_refresh(market_sentiment_snapshot.current.built_at, market_sentiment_snapshot.interval))
+def market_sentiment():
+    snapshot = market_sentiment_snapshot.current
+    if snapshot is None:
+        return jsonify({'error': 'Market sentiment is warming up'}), 503, {'Retry-After': '5'}
+    
+    return snapshot_response(snapshot)
+
 @app.route('/api/news')
+@cache_for(lambda: seconds_until_refresh(news_ingestor.refreshed_at, news_ingestor.interval))
 def get_news():
     try:
-        # Try to get real news if API key is available
-        if NEWS_API_KEY and NEWS_API_KEY != 'news_demo_key':
-            url = f'https://newsapi.org/v2/top-headlines?category=business&country=us&apiKey={NEWS_API_KEY}'
-            response = requests.get(url)
-            data = response.json()
-            
-            if data.get('articles'):
-                articles = []
-                for article in data['articles'][:10]:
-                    articles.append({
-                        'title': article.get('title', 'No title'),
-                        'source': article.get('source', {}).get('name', 'Unknown'),
-                        'time': article.get('publishedAt', ''),
-                        'url': article.get('url', '#'),
-                        'image': article.get('urlToImage', ''),
-                        'description': article.get('description', 'No description available')
-                    })
-                return jsonify(articles)
-        
-        # Fallback to simulated news
-        symbols = ['AAPL', 'MSFT', 'TSLA', 'NVDA', 'GOOGL', 'AMZN', 'META', 'JPM', 'JNJ', 'V']
-        companies = ['Apple', 'Microsoft', 'Tesla', 'NVIDIA', 'Google', 'Amazon', 'Meta', 'JPMorgan', 'Johnson & Johnson', 'Visa']
-        
-        news_items = []
-        for i in range(10):
-            company_idx = random.randint(0, len(symbols)-1)
-            sentiment = random.choice(['positive', 'neutral', 'negative'])
-            
-            if sentiment == 'positive':
-                titles = [
-                    f"{companies[company_idx]} Reports Strong Quarterly Earnings",
-                    f"{companies[company_idx]} Stock Soars on New Product Launch",
-                    f"Analysts Upgrade {companies[company_idx]} to Buy Rating",
-                    f"{companies[company_idx]} Announces Breakthrough Innovation"
-                ]
-            elif sentiment == 'negative':
-                titles = [
-                    f"{companies[company_idx]} Faces Regulatory Challenges",
-                    f"{companies[company_idx]} Stock Dips on Market Concerns",
-                    f"Analysts Express Caution on {companies[company_idx]} Future",
-                    f"{companies[company_idx]} Misses Revenue Expectations"
-                ]
-            else:
-                titles = [
-                    f"{companies[company_idx]} Holds Steady in Volatile Market",
-                    f"{companies[company_idx]} Announces New Partnership",
-                    f"Market Watchers Neutral on {companies[company_idx]} Prospects",
-                    f"{companies[company_idx]} CEO Speaks at Industry Conference"
-                ]
-            
-            news_items.append({
-                'title': random.choice(titles),
-                'source': random.choice(['Bloomberg', 'Reuters', 'CNBC', 'Wall Street Journal']),
-                'time': (datetime.now() - timedelta(hours=random.randint(1, 12))).strftime('%Y-%m-%dT%H:%M:%SZ'),
-                'url': '#',
-                'image': '',
-                'description': 'This is a sample news description for demonstration purposes.'
-            })
-        
-        return jsonify(news_items)
+        return jsonify(news_ingestor.latest(10))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -182,7 +433,7 @@ def get_earnings():
 
 @app.route('/api/watchlist')
 def get_watchlist():
-    return jsonify(session.get('watchlist', []))
+    return jsonify(session_store.get_watchlist(current_uid()))
 
 @app.route('/api/watchlist/add', methods=['POST'])
 def add_to_watchlist():
@@ -193,10 +444,8 @@ def add_to_watchlist():
         if not symbol:
             return jsonify({'error': 'No symbol provided'}), 400
         
-        watchlist = session.get('watchlist', [])
-        if symbol not in watchlist and len(watchlist) < 20:
-            watchlist.append(symbol)
-            session['watchlist'] = watchlist
+        session_store.add_to_watchlist(current_uid(), symbol, 20)
+        watchlist = session_store.get_watchlist(current_uid())
         
         return jsonify({'success': True, 'watchlist': watchlist})
     except Exception as e:
@@ -205,10 +454,8 @@ def add_to_watchlist():
 @app.route('/api/watchlist/remove/<symbol>')
 def remove_from_watchlist(symbol):
     try:
-        watchlist = session.get('watchlist', [])
-        if symbol in watchlist:
-            watchlist.remove(symbol)
-            session['watchlist'] = watchlist
+        session_store.remove_from_watchlist(current_uid(), symbol)
+        watchlist = session_store.get_watchlist(current_uid())
         
         return jsonify({'success': True, 'watchlist': watchlist})
     except Exception as e:
@@ -217,12 +464,13 @@ def remove_from_watchlist(symbol):
 @app.route('/api/portfolio')
 def get_portfolio():
     try:
-        portfolio = session.get('portfolio', {})
+        portfolio = session_store.get_portfolio(current_uid())
         portfolio_value = 0
         portfolio_data = []
+        quotes = get_stock_data_batch(list(portfolio), ALPHA_VANTAGE_KEY)['quotes']
         
         for symbol, holdings in portfolio.items():
-            stock_data = get_stock_data(symbol, ALPHA_VANTAGE_KEY)
+            stock_data = quotes.get(symbol, {})
             current_price = stock_data.get('price', 0)
             value = current_price * holdings['shares']
             cost = holdings['avg_price'] * holdings['shares']
@@ -231,7 +479,7 @@ def get_portfolio():
             
             portfolio_value += value
             
-            portfolio_data.append({
+            holding = {
                 'symbol': symbol,
                 'shares': holdings['shares'],
                 'avg_price': holdings['avg_price'],
@@ -239,7 +487,12 @@ def get_portfolio():
                 'value': value,
                 'gain_loss': gain_loss,
                 'gain_loss_percent': gain_loss_percent
-            })
+            }
+            # Keep the quote's markers so a stale or simulated price isn't shown as live
+            for flag in QUOTE_FLAGS:
+                if flag in stock_data:
+                    holding[flag] = stock_data[flag]
+            portfolio_data.append(holding)
         
         # Calculate overall portfolio performance
         total_cost = sum([h['avg_price'] * h['shares'] for h in portfolio.values()])
@@ -255,6 +508,19 @@ def get_portfolio():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/portfolio/analytics')
+def portfolio_analytics():
+    try:
+        portfolio = session_store.get_portfolio(current_uid())
+        if not portfolio:
+            return jsonify({'error': 'Portfolio is empty'}), 400
+        
+        # ?days= can shorten the lookback window, not extend it
+        days = min(max(request.args.get('days', Config.PORTFOLIO_LOOKBACK_DAYS, type=int), 2), Config.PORTFOLIO_LOOKBACK_DAYS)
+        return jsonify(get_portfolio_analytics(portfolio, ALPHA_VANTAGE_KEY, days))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/portfolio/add', methods=['POST'])
 def add_to_portfolio():
     try:
@@ -266,21 +532,17 @@ def add_to_portfolio():
         if not symbol or shares <= 0 or avg_price <= 0:
             return jsonify({'error': 'Invalid data provided'}), 400
         
-        portfolio = session.get('portfolio', {})
+        portfolio = session_store.get_portfolio(current_uid())
         if symbol in portfolio:
             # Update existing holding
             total_shares = portfolio[symbol]['shares'] + shares
             total_cost = (portfolio[symbol]['shares'] * portfolio[symbol]['avg_price']) + (shares * avg_price)
-            portfolio[symbol]['avg_price'] = total_cost / total_shares
-            portfolio[symbol]['shares'] = total_shares
+            session_store.set_holding(current_uid(), symbol, total_shares, total_cost / total_shares)
         else:
             # Add new holding
-            portfolio[symbol] = {
-                'shares': shares,
-                'avg_price': avg_price
-            }
+            session_store.set_holding(current_uid(), symbol, shares, avg_price)
         
-        session['portfolio'] = portfolio
+        portfolio = session_store.get_portfolio(current_uid())
         
         return jsonify({'success': True, 'portfolio': portfolio})
     except Exception as e:
@@ -289,10 +551,8 @@ def add_to_portfolio():
 @app.route('/api/portfolio/remove/<symbol>')
 def remove_from_portfolio(symbol):
     try:
-        portfolio = session.get('portfolio', {})
-        if symbol in portfolio:
-            del portfolio[symbol]
-            session['portfolio'] = portfolio
+        session_store.remove_holding(current_uid(), symbol)
+        portfolio = session_store.get_portfolio(current_uid())
         
         return jsonify({'success': True, 'portfolio': portfolio})
     except Exception as e:
@@ -310,8 +570,7 @@ def handle_alerts():
             if not symbol or target_price <= 0:
                 return jsonify({'error': 'Invalid data provided'}), 400
             
-            alerts = session.get('price_alerts', [])
-            alerts.append({
+            alert_engine.add_alert(current_uid(), {
                 'symbol': symbol,
                 'target_price': target_price,
                 'alert_type': alert_type,
@@ -319,30 +578,69 @@ def handle_alerts():
                 'triggered': False
             })
             
-            session['price_alerts'] = alerts
+            alerts = session_store.get_alerts(current_uid())
             return jsonify({'success': True, 'alerts': alerts})
         else:
-            # Check and trigger alerts
-            alerts = session.get('price_alerts', [])
-            triggered_alerts = []
+            # Alerts are evaluated by the background engine; report new triggers once
+            alerts = session_store.get_alerts(current_uid())
+            triggered_alerts = [alert for alert in alerts if alert['triggered'] and not alert['notified']]
             
-            for alert in alerts:
-                if not alert['triggered']:
-                    stock_data = get_stock_data(alert['symbol'], ALPHA_VANTAGE_KEY)
-                    current_price = stock_data.get('price', 0)
-                    
-                    if (alert['alert_type'] == 'price_above' and current_price >= alert['target_price']) or \
-                       (alert['alert_type'] == 'price_below' and current_price <= alert['target_price']):
-                        alert['triggered'] = True
-                        alert['triggered_at'] = datetime.now().isoformat()
-                        alert['triggered_price'] = current_price
-                        triggered_alerts.append(alert)
+            if triggered_alerts:
+                session_store.acknowledge_alerts(current_uid(), [alert['id'] for alert in triggered_alerts])
             
-            session['price_alerts'] = alerts
             return jsonify({'alerts': alerts, 'triggered_alerts': triggered_alerts})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+CHAT_PARAMS = {
+    'model': 'gpt-3.5-turbo',
+    'max_tokens': 150,
+    'temperature': 0.7,
+    'request_timeout': Config.OPENAI_TIMEOUT
+}
+CHAT_ERROR_RESPONSE = "I'm currently experiencing technical difficulties. Please try again later."
+
+def chat_messages(message):
+    return [
+        {"role": "system", "content": "You are a financial AI assistant specializing in stock market analysis, portfolio management, and investment strategies. Provide concise, helpful advice."},
+        {"role": "user", "content": message}
+    ]
+
+def fallback_chat_response(message):
+    """Canned reply used when no OpenAI key is configured"""
+    responses = {
+        'hello': "Hello! I'm your AI trading assistant. How can I help you today?",
+        'how are you': "I'm functioning optimally, ready to analyze the markets for you!",
+        'what stocks should i buy': "Based on current market conditions, I recommend looking into technology stocks like AAPL and MSFT, which show strong fundamentals.",
+        'is now a good time to invest': "Market timing is challenging. Consider dollar-cost averaging and focusing on long-term trends rather than short-term fluctuations.",
+        'what is your analysis of the market': "Current market indicators suggest moderate volatility with growth potential in technology and healthcare sectors.",
+        'how should i diversify my portfolio': "A well-diversified portfolio typically includes stocks from different sectors, bonds, and possibly some commodities or real estate.",
+        'default': "I'm designed to provide stock market analysis and investment insights. Could you please ask a more specific question about trading or investments?"
+    }
+    
+    message_lower = message.lower()
+    response = responses['default']
+    
+    for key in responses:
+        if key in message_lower:
+            response = responses[key]
+            break
+    
+    return response
+
+def stream_chat_events(message):
+    """SSE events for a streamed chat reply: 'delta' events as text arrives, then 'done' with the full reply"""
+    parts = []
+    try:
+        deltas = completion_cache.stream(chat_messages(message), **CHAT_PARAMS) if OPENAI_KEY else [fallback_chat_response(message)]
+        for text in deltas:
+            parts.append(text)
+            yield sse_event('delta', {'text': text})
+    except Exception:
+        yield sse_event('error', {'response': CHAT_ERROR_RESPONSE})
+        return
+    yield sse_event('done', {'response': ''.join(parts).strip()})
+
 @app.route('/api/chat', methods=['POST'])
 def chat_with_ai():
     try:
@@ -352,45 +650,20 @@ def chat_with_ai():
         if not message:
             return jsonify({'error': 'No message provided'}), 400
         
+        # Streaming clients get tokens as they are generated
+        if data.get('stream'):
+            return Response(stream_chat_events(message), mimetype='text/event-stream', headers=SSE_HEADERS)
+        
         # Use OpenAI API for chat
         if OPENAI_KEY:
             try:
-                response = openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a financial AI assistant specializing in stock market analysis, portfolio management, and investment strategies. Provide concise, helpful advice."},
-                        {"role": "user", "content": message}
-                    ],
-                    max_tokens=150,
-                    temperature=0.7
-                )
-                
-                ai_response = response.choices[0].message.content.strip()
+                ai_response = completion_cache.complete(chat_messages(message), **CHAT_PARAMS)
                 return jsonify({'response': ai_response})
             except Exception as e:
                 # Fallback if OpenAI API fails
-                return jsonify({'response': "I'm currently experiencing technical difficulties. Please try again later."})
-        
-        # Fallback responses if no OpenAI key
-        responses = {
-            'hello': "Hello! I'm your AI trading assistant. How can I help you today?",
-            'how are you': "I'm functioning optimally, ready to analyze the markets for you!",
-            'what stocks should i buy': "Based on current market conditions, I recommend looking into technology stocks like AAPL and MSFT, which show strong fundamentals.",
-            'is now a good time to invest': "Market timing is challenging. Consider dollar-cost averaging and focusing on long-term trends rather than short-term fluctuations.",
-            'what is your analysis of the market': "Current market indicators suggest moderate volatility with growth potential in technology and healthcare sectors.",
-            'how should i diversify my portfolio': "A well-diversified portfolio typically includes stocks from different sectors, bonds, and possibly some commodities or real estate.",
-            'default': "I'm designed to provide stock market analysis and investment insights. Could you please ask a more specific question about trading or investments?"
-        }
-        
-        message_lower = message.lower()
-        response = responses['default']
+                return jsonify({'response': CHAT_ERROR_RESPONSE})
         
-        for key in responses:
-            if key in message_lower:
-                response = responses[key]
-                break
-        
-        return jsonify({'response': response})
+        return jsonify({'response': fallback_chat_response(message)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -401,12 +674,26 @@ def set_theme():
         theme = data.get('theme', 'dark')
         
         if theme in ['dark', 'light']:
-            session['theme'] = theme
+            session_store.set_pref(current_uid(), 'theme', theme)
             return jsonify({'success': True, 'theme': theme})
         else:
             return jsonify({'error': 'Invalid theme'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.cli.command('preload-profiles')
+@click.argument('universe_file')
+@click.option('--force', is_flag=True, help='Refetch profiles that are still fresh')
+def preload_profiles_command(universe_file, force):
+    """Warm the company profile store, e.g. from cron: flask --app app preload-profiles sp500.txt"""
+    if ALPHA_VANTAGE_KEY == 'demo':
+        click.echo('Demo mode serves simulated profiles; nothing to preload')
+        return
+    symbols = read_universe(universe_file)
+    click.echo(f'Preloading {len(symbols)} profiles')
+    result = preload_profiles(symbols, ALPHA_VANTAGE_KEY, force=force,
+                              progress=lambda symbol, loaded: click.echo(f"{symbol}: {'ok' if loaded else 'failed'}"))
+    click.echo(f"Loaded {result['loaded']}, skipped {result['skipped']} fresh, failed {result['failed']}")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
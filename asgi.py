@@ -0,0 +1,264 @@
+"""ASGI entry point.
+
+Routes that spend most of their time waiting on upstream APIs (quotes,
+analysis, chat, the price stream) are served by async Quart handlers, so one
+process can hold hundreds of requests in flight. Every other route is passed
+through to the Flask app, and `python app.py` still runs the plain sync server.
+
+    pip install quart httpx
+    hypercorn asgi:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import queue
+import time
+from functools import partial
+
+try:
+    from hypercorn.middleware import AsyncioWSGIMiddleware
+    from quart import Quart, Response, g, jsonify, request
+    from quart.wrappers.response import DataBody
+except ImportError as e:
+    raise ImportError('Async serving requires quart and httpx: pip install quart httpx') from e
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+
+import app as flask_app
+import metrics
+import responses
+from app import (ALPHA_VANTAGE_KEY, NEWS_API_KEY, OPENAI_KEY, CHAT_ERROR_RESPONSE, CHAT_PARAMS, SSE_HEADERS, analysis_response,
+                 analyze_executor, chat_messages, fallback_chat_response, quote_hub, sse_event, start_background_workers)
+from config import Config
+from http_client import async_provider_client
+from llm_cache import completion_cache
+from rate_limit import PRIORITY_INTERACTIVE
+from Utils import (analyze_stock_sentiment, generate_ai_recommendation, get_company_info, get_crypto_data_async,
+                   get_historical_data, get_stock_data_async, get_stock_data_batch_async)
+
+# How often an idle /api/stream connection checks its queue
+STREAM_POLL_SECONDS = 0.25
+
+async_app = Quart(__name__)
+
+
+@async_app.before_serving
+async def startup():
+    start_background_workers()
+
+
+@async_app.after_serving
+async def shutdown():
+    await async_provider_client.aclose()
+
+
+@async_app.before_request
+async def start_timer():
+    g.request_started = time.monotonic()
+
+
+@async_app.after_request
+async def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe_request(route, request.method, response.status_code, time.monotonic() - g.request_started)
+    return response
+
+
+# Registered after the metrics hook so it runs first and 304s are recorded as such
+@async_app.after_request
+async def finalize_response(response):
+    if not isinstance(response.response, DataBody):
+        return response
+    return responses.finalize(response, await response.get_data(), request)
+
+
+def _in_pool(func, *args):
+    """Run a sync stage on the shared analyze pool without blocking the event loop"""
+    return asyncio.get_running_loop().run_in_executor(analyze_executor, partial(func, *args))
+
+
+async def _stage_result(awaitable, started, name, unavailable):
+    """Async _stage_result: await one analysis stage within the shared stage deadline"""
+    try:
+        return await asyncio.wait_for(awaitable, max(started + Config.ANALYZE_STAGE_TIMEOUT - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        unavailable[name] = 'timeout'
+        metrics.stage_failures.inc(stage=name, reason='timeout')
+    except Exception as e:
+        unavailable[name] = str(e) or 'error'
+        metrics.stage_failures.inc(stage=name, reason='error')
+    return None
+
+
+@async_app.route('/api/stock/<symbol>')
+async def get_stock(symbol):
+    try:
+        return jsonify(await get_stock_data_async(symbol, ALPHA_VANTAGE_KEY))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@async_app.route('/api/quotes')
+async def get_quotes():
+    try:
+        symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+
+        if not symbols:
+            return jsonify({'error': 'No symbols provided'}), 400
+        if len(symbols) > Config.MAX_BATCH_SYMBOLS:
+            return jsonify({'error': f'Too many symbols (max {Config.MAX_BATCH_SYMBOLS})'}), 400
+
+        return jsonify(await get_stock_data_batch_async(symbols, ALPHA_VANTAGE_KEY))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@async_app.route('/api/crypto/<symbol>')
+async def get_crypto(symbol):
+    try:
+        return jsonify(await get_crypto_data_async(symbol, ALPHA_VANTAGE_KEY))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@async_app.route('/api/analyze', methods=['POST'])
+async def analyze():
+    try:
+        data = await request.get_json()
+        symbol = data.get('symbol', '')
+        analysis_type = data.get('analysis_type', 'deep')
+        history_format = data.get('history_format', 'records')
+
+        if not symbol:
+            return jsonify({'error': 'No symbol provided'}), 400
+
+        # The quote is fetched natively; stages without async fetchers run on the analyze pool
+        started = time.monotonic()
+        stock_task = asyncio.ensure_future(get_stock_data_async(symbol, ALPHA_VANTAGE_KEY, PRIORITY_INTERACTIVE))
+        historical_task = _in_pool(get_historical_data, symbol, ALPHA_VANTAGE_KEY, Config.INDICATOR_LOOKBACK_DAYS, PRIORITY_INTERACTIVE)
+        company_task = _in_pool(get_company_info, symbol, ALPHA_VANTAGE_KEY, PRIORITY_INTERACTIVE)
+        sentiment_task = _in_pool(analyze_stock_sentiment, symbol, NEWS_API_KEY)
+        unavailable = {}
+
+        stock_data = await _stage_result(stock_task, started, 'stock', unavailable)
+        history = await _stage_result(historical_task, started, 'historical_data', unavailable)
+        analysis = None
+        if stock_data and history:
+            analysis_task = _in_pool(generate_ai_recommendation, symbol, OPENAI_KEY, analysis_type, stock_data['price'], history)
+            analysis = await _stage_result(analysis_task, started, 'analysis', unavailable)
+        else:
+            unavailable['analysis'] = 'stock data unavailable'
+
+        company_info = await _stage_result(company_task, started, 'company_info', unavailable)
+        news_sentiment = await _stage_result(sentiment_task, started, 'news_sentiment', unavailable)
+
+        return jsonify(analysis_response(stock_data, analysis, history, company_info, news_sentiment, unavailable, history_format))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+async def stream_chat_events(message):
+    """Async app.stream_chat_events"""
+    parts = []
+    try:
+        if OPENAI_KEY:
+            async for text in completion_cache.stream_async(chat_messages(message), **CHAT_PARAMS):
+                parts.append(text)
+                yield sse_event('delta', {'text': text}).encode()
+        else:
+            parts.append(fallback_chat_response(message))
+            yield sse_event('delta', {'text': parts[0]}).encode()
+    except Exception:
+        yield sse_event('error', {'response': CHAT_ERROR_RESPONSE}).encode()
+        return
+    yield sse_event('done', {'response': ''.join(parts).strip()}).encode()
+
+
+@async_app.route('/api/chat', methods=['POST'])
+async def chat_with_ai():
+    try:
+        data = await request.get_json()
+        message = data.get('message', '')
+
+        if not message:
+            return jsonify({'error': 'No message provided'}), 400
+
+        if data.get('stream'):
+            response = Response(stream_chat_events(message), mimetype='text/event-stream', headers=SSE_HEADERS)
+            response.timeout = None
+            return response
+
+        if OPENAI_KEY:
+            try:
+                return jsonify({'response': await completion_cache.complete_async(chat_messages(message), **CHAT_PARAMS)})
+            except Exception:
+                return jsonify({'response': CHAT_ERROR_RESPONSE})
+
+        return jsonify({'response': fallback_chat_response(message)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@async_app.route('/api/stream')
+async def stream_quotes():
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+
+    if len(symbols) > Config.MAX_BATCH_SYMBOLS:
+        return jsonify({'error': f'Too many symbols (max {Config.MAX_BATCH_SYMBOLS})'}), 400
+
+    subscription = quote_hub.subscribe(symbols)
+
+    async def events():
+        try:
+            yield f'retry: {Config.STREAM_RETRY_MS}\n\n'.encode()
+            idle = 0.0
+            while True:
+                try:
+                    event, data = subscription.get_nowait()
+                except queue.Empty:
+                    # Poll instead of blocking a thread per connected client
+                    await asyncio.sleep(STREAM_POLL_SECONDS)
+                    idle += STREAM_POLL_SECONDS
+                    if idle >= Config.STREAM_HEARTBEAT:
+                        idle = 0.0
+                        yield b': keep-alive\n\n'
+                    continue
+                idle = 0.0
+                yield sse_event(event, data).encode()
+        finally:
+            quote_hub.unsubscribe(subscription)
+
+    response = Response(events(), mimetype='text/event-stream', headers=SSE_HEADERS)
+    response.timeout = None
+    return response
+
+
+class RouteDispatcher:
+    """Send requests for async routes to Quart and everything else to the Flask app"""
+
+    def __init__(self, async_app, wsgi_app):
+        self.async_app = async_app
+        self.wsgi_app = AsyncioWSGIMiddleware(wsgi_app)
+        self.routes = async_app.url_map.bind('')
+
+    def is_async(self, scope):
+        try:
+            self.routes.match(scope['path'], method=scope['method'])
+        except (NotFound, MethodNotAllowed):
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and not self.is_async(scope):
+            await self.wsgi_app(scope, receive, send)
+        else:
+            # Lifespan events go to Quart so before_serving/after_serving run
+            await self.async_app(scope, receive, send)
+
+
+app = RouteDispatcher(async_app, flask_app.app)
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+
+    config = HypercornConfig()
+    config.bind = ['0.0.0.0:5000']
+    asyncio.run(serve(app, config))
@@ -0,0 +1,250 @@
+"""Local stand-in for Alpha Vantage, NewsAPI and the OpenAI chat API.
+
+Responses follow the shapes the app parses, with prices from the seeded
+demo market simulator (demo_market.py), plus configurable latency, error rate and rate-limit notes so the
+full I/O path (pool, retries, rate limiter, caches) can be measured offline.
+
+    python bench/fake_upstream.py --port 8765 --latency 120 --jitter 40 --error-rate 0.02
+
+Point the app at it with:
+
+    ALPHA_VANTAGE_URL=http://127.0.0.1:8765/query
+    NEWS_API_URL=http://127.0.0.1:8765/v2
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from demo_market import DemoMarket
+from timeseries import to_iso_dates
+
+HEADLINES = [
+    '{name} Reports Strong Quarterly Earnings',
+    '{name} Stock Soars on New Product Launch',
+    'Analysts Upgrade {name} to Buy Rating',
+    '{name} Faces Regulatory Challenges',
+    '{name} Stock Dips on Market Concerns',
+    '{name} Misses Revenue Expectations',
+    '{name} Holds Steady in Volatile Market',
+    '{name} Announces New Partnership'
+]
+COMPANIES = ['Apple', 'Microsoft', 'Tesla', 'NVIDIA', 'Google', 'Amazon', 'Meta', 'JPMorgan', 'Visa', 'Netflix']
+
+
+def global_quote(market, symbol):
+    quote = market.quote(symbol)
+    return {'Global Quote': {
+        '01. symbol': symbol,
+        '05. price': f"{quote['price']:.4f}",
+        '06. volume': str(quote['volume']),
+        '09. change': f"{quote['change']:.4f}",
+        '10. change percent': f"{quote['change_percent']:.4f}%"
+    }}
+
+
+def daily_series(market, symbol, outputsize):
+    """Weekday bars from the simulated path, newest first"""
+    series = market.history(symbol, 140 if outputsize == 'compact' else 1400)
+    # Epoch day 0 (1970-01-01) was a Thursday
+    weekdays = np.flatnonzero((series.dates + 3) % 7 < 5)[::-1]
+    bars = {}
+    for day, close, volume in zip(to_iso_dates(series.dates[weekdays]), series.close[weekdays].tolist(), series.volume[weekdays].tolist()):
+        bars[day] = {
+            '1. open': f'{close * 0.995:.4f}',
+            '2. high': f'{close * 1.01:.4f}',
+            '3. low': f'{close * 0.99:.4f}',
+            '4. close': f'{close:.4f}',
+            '5. volume': str(volume)
+        }
+    return {'Meta Data': {'2. Symbol': symbol}, 'Time Series (Daily)': bars}
+
+
+def overview(symbol):
+    return {
+        'Symbol': symbol,
+        'Name': f'{symbol} Holdings Inc.',
+        'Sector': 'Technology',
+        'Industry': 'Software',
+        'Description': f'{symbol} Holdings Inc. is a synthetic company served by the benchmark upstream.'
+    }
+
+
+def exchange_rate(market, symbol):
+    return {'Realtime Currency Exchange Rate': {
+        '1. From_Currency Code': symbol,
+        '3. To_Currency Code': 'USD',
+        '5. Exchange Rate': f"{market.crypto_quote(symbol)['price']:.4f}"
+    }}
+
+
+def headlines(count=40):
+    articles = []
+    for i in range(count):
+        title = random.choice(HEADLINES).format(name=random.choice(COMPANIES))
+        articles.append({
+            'source': {'name': random.choice(['Bloomberg', 'Reuters', 'CNBC'])},
+            'title': title,
+            'description': f'{title}. Synthetic article for load testing.',
+            'url': f'https://news.example/{random.getrandbits(48):x}',
+            'urlToImage': '',
+            'publishedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        })
+    return {'status': 'ok', 'totalResults': count, 'articles': articles}
+
+
+def chat_completion(request):
+    prompt = request.get('messages', [{}])[-1].get('content', '')
+    return {
+        'id': f'chatcmpl-{random.getrandbits(64):x}',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'gpt-3.5-turbo'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': f'Synthetic analysis ({len(prompt)} prompt characters): momentum and valuation are balanced.'},
+            'finish_reason': 'stop'
+        }],
+        'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': 20, 'total_tokens': len(prompt) // 4 + 20}
+    }
+
+
+def chat_completion_chunks(request):
+    """The chat completion as stream=True chunks, one per word"""
+    completion = chat_completion(request)
+    words = completion['choices'][0]['message']['content'].split(' ')
+    for i, word in enumerate(words):
+        yield {
+            'id': completion['id'],
+            'object': 'chat.completion.chunk',
+            'created': completion['created'],
+            'model': completion['model'],
+            'choices': [{'index': 0, 'delta': {'content': word if i == 0 else ' ' + word}, 'finish_reason': None}]
+        }
+
+
+class FakeUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.1, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, seed=42):
+        super().__init__(address, Handler)
+        self.market = DemoMarket(seed=seed, cache_size=4096)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests = 0
+        self._lock = threading.Lock()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay_and_maybe_fail(self):
+        server = self.server
+        with server._lock:
+            server.requests += 1
+        time.sleep(max(random.gauss(server.latency, server.jitter), 0))
+        if random.random() < server.error_rate:
+            self._send(random.choice([500, 502, 503]), {'error': 'injected failure'})
+            return True
+        return False
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, chunks):
+        """Server-sent events in the OpenAI streaming format, paced by the configured latency"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for chunk in chunks:
+            time.sleep(max(random.gauss(self.server.latency, self.server.jitter), 0) / 10)
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.close_connection = True
+
+    def do_GET(self):
+        if self._delay_and_maybe_fail():
+            return
+        url = urlsplit(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+        if url.path == '/query':
+            if random.random() < self.server.rate_limit_rate:
+                return self._send(200, {'Note': 'Thank you for using Alpha Vantage! Our standard API rate limit is 5 requests per minute.'})
+            function = params.get('function')
+            symbol = params.get('symbol') or params.get('from_currency', 'IBM')
+            if function == 'GLOBAL_QUOTE':
+                return self._send(200, global_quote(self.server.market, symbol))
+            if function == 'TIME_SERIES_DAILY':
+                return self._send(200, daily_series(self.server.market, symbol, params.get('outputsize', 'compact')))
+            if function == 'OVERVIEW':
+                return self._send(200, overview(symbol))
+            if function == 'CURRENCY_EXCHANGE_RATE':
+                return self._send(200, exchange_rate(self.server.market, symbol))
+            return self._send(200, {'Error Message': f'Unknown function {function}'})
+        if url.path == '/v2/top-headlines':
+            return self._send(200, headlines())
+        self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self._delay_and_maybe_fail():
+            return
+        if urlsplit(self.path).path == '/v1/chat/completions':
+            if request.get('stream'):
+                return self._send_stream(chat_completion_chunks(request))
+            return self._send(200, chat_completion(request))
+        self._send(404, {'error': 'not found'})
+
+
+def start(port=0, **options):
+    """Start the fake upstream on a background thread and return the server"""
+    server = FakeUpstream(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, name='fake-upstream', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=100, help='mean response latency in ms')
+    parser.add_argument('--jitter', type=float, default=30, help='latency standard deviation in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 5xx')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of Alpha Vantage calls answered with a rate-limit Note')
+    parser.add_argument('--seed', type=int, default=42, help='seed of the simulated market')
+    args = parser.parse_args()
+
+    server = FakeUpstream(('127.0.0.1', args.port), latency=args.latency / 1000, jitter=args.jitter / 1000,
+                          error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    print(f'Fake upstream listening on http://127.0.0.1:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Drive the main API routes at fixed concurrency and report latency percentiles.
+
+By default this starts bench/fake_upstream.py and the Flask app in-process,
+with the app pointed at the fake upstream, so the whole I/O path is
+exercised without network access or API quota:
+
+    python bench/loadtest.py --concurrency 16 --requests 200
+    python bench/loadtest.py --scenarios analyze,overview --latency 250 --error-rate 0.05
+    python bench/loadtest.py --scenarios quotes,analyze --symbols 5000
+
+Use --url to load-test an already running server (e.g. `hypercorn asgi:app`).
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_upstream
+from demo_market import synthetic_symbols
+
+SYMBOLS = ['AAPL', 'MSFT', 'TSLA', 'NVDA', 'GOOGL', 'AMZN', 'META', 'JPM', 'JNJ', 'V']
+
+
+def setup_user(http, base):
+    """Give the session's user a small portfolio and a price alert"""
+    for symbol, shares, avg_price in (('AAPL', 10, 150), ('MSFT', 5, 300), ('NVDA', 3, 400)):
+        http.post(f'{base}/api/portfolio/add', json={'symbol': symbol, 'shares': shares, 'avg_price': avg_price})
+    http.post(f'{base}/api/alerts', json={'symbol': 'AAPL', 'target_price': 10000, 'alert_type': 'price_above'})
+
+
+SCENARIOS = {
+    'analyze': lambda http, base: http.post(f'{base}/api/analyze', json={'symbol': random.choice(SYMBOLS), 'analysis_type': 'quick'}),
+    'quotes': lambda http, base: http.get(f'{base}/api/quotes', params={'symbols': ','.join(random.sample(SYMBOLS, min(20, len(SYMBOLS))))}),
+    'portfolio': lambda http, base: http.get(f'{base}/api/portfolio'),
+    'overview': lambda http, base: http.get(f'{base}/api/market/overview'),
+    'alerts': lambda http, base: http.get(f'{base}/api/alerts')
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_scenario(name, base, concurrency, total):
+    """Issue `total` requests from `concurrency` workers, each with its own session"""
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        http = getattr(local, 'http', None)
+        if http is None:
+            http = local.http = requests.Session()
+            setup_user(http, base)
+        started = time.perf_counter()
+        try:
+            response = SCENARIOS[name](http, base)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'scenario': name,
+        'requests': total,
+        'errors': errors,
+        'concurrency': concurrency,
+        'rps': round(total / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1)
+    }
+
+
+def start_local_app(args):
+    """Start the fake upstream and the Flask app in this process; returns the app's base URL"""
+    upstream = fake_upstream.start(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                                   error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    upstream_url = f'http://127.0.0.1:{upstream.server_address[1]}'
+
+    # Configuration is read at import time, so set it before importing the app
+    os.environ.update({
+        'ALPHA_VANTAGE_KEY': 'bench',
+        'NEWS_API_KEY': 'bench',
+        'OPENAI_KEY': 'bench',
+        'ALPHA_VANTAGE_URL': f'{upstream_url}/query',
+        'NEWS_API_URL': f'{upstream_url}/v2',
+        'OPENAI_API_BASE': f'{upstream_url}/v1',
+        'ALPHA_VANTAGE_CALLS_PER_MINUTE': str(args.calls_per_minute),
+        'ALPHA_VANTAGE_BURST': str(max(int(args.calls_per_minute / 60), 1)),
+        'DATA_DIR': os.environ.get('DATA_DIR') or tempfile.mkdtemp(prefix='stocksense-bench-')
+    })
+
+    from werkzeug.serving import make_server
+    import app as flask_app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-app', daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def wait_ready(base, timeout=30):
+    """Wait for the market overview snapshot so the overview scenario doesn't measure 503s"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{base}/api/market/overview').status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f'{base} did not become ready within {timeout}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='load-test a running server instead of starting one')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--latency', type=float, default=100, help='fake upstream mean latency in ms')
+    parser.add_argument('--jitter', type=float, default=30, help='fake upstream latency standard deviation in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--calls-per-minute', type=float, default=60000, help='Alpha Vantage quota given to the app')
+    parser.add_argument('--symbols', type=int, default=len(SYMBOLS),
+                        help='symbol universe size; synthetic tickers from the demo market are added past the defaults')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+    SYMBOLS.extend(synthetic_symbols(max(args.symbols - len(SYMBOLS), 0)))
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+
+    base = args.url.rstrip('/') if args.url else start_local_app(args)
+    wait_ready(base)
+
+    results = [run_scenario(name, base, args.concurrency, args.requests) for name in scenarios]
+
+    print(f"{'scenario':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(f"{result['scenario']:<12}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10}"
+              f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """A single in-progress load that concurrent callers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL and single-flight loading"""
+
+    def __init__(self, ttl=60, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        """Return a fresh cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def entry(self, key):
+        """Return (value, stored_at) for the last stored value even if expired, or None; doesn't touch stats"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def add_listener(self, listener):
+        """Call listener(key, value) whenever a new value is stored"""
+        self._listeners.append(listener)
+
+    def _notify(self, key, value):
+        for listener in self._listeners:
+            try:
+                listener(key, value)
+            except Exception:
+                pass
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+        self._notify(key, value)
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() at most once per miss.
+
+        Callers that arrive while a load for the same key is running wait for
+        that load instead of starting their own.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[1] <= self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                self.stale += 1
+            else:
+                self.misses += 1
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                leader = True
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._store(key, flight.value)
+            self._notify(key, flight.value)
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'inflight': len(self._inflight)
+            }
@@ -0,0 +1,108 @@
+import threading
+import time
+
+from config import Config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one provider function.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail fast for `cooldown` seconds. Then a single trial call is let through
+    (half-open): success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, name, failure_threshold=5, cooldown=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.short_circuited = 0
+        self.trips = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def check(self):
+        """Raise CircuitOpen unless a call may go upstream now"""
+        if not self.allow():
+            raise CircuitOpen(f'{self.name} is unavailable (circuit open)')
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self):
+        """End a call that neither succeeded nor failed (e.g. rate limited) without changing state"""
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'trips': self.trips,
+                'short_circuited': self.short_circuited,
+                'retry_in': round(max(self.opened_at + self.cooldown - time.monotonic(), 0), 1) if self.state == OPEN else 0
+            }
+
+
+class BreakerRegistry:
+    """One breaker per (provider, function), created on first use"""
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider, function):
+        name = f'{provider}:{function}'
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, self.failure_threshold, self.cooldown)
+            return breaker
+
+    def stats(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+breakers = BreakerRegistry(failure_threshold=Config.BREAKER_FAILURE_THRESHOLD, cooldown=Config.BREAKER_COOLDOWN)
@@ -10,5 +10,102 @@ class Config:
     OPENAI_KEY = os.getenv('OPENAI_KEY', '')
     
     # Additional configuration
-    SESSION_TYPE = 'filesystem'
     MAX_WATCHLIST_ITEMS = 15
+    DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+    # Server-side session store: 'sqlite' (default) or 'memory'
+    SESSION_TYPE = os.getenv('SESSION_TYPE', 'sqlite')
+    SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', os.path.join(DATA_DIR, 'sessions.db'))
+
+    # Quote cache
+    QUOTE_CACHE_TTL = int(os.getenv('QUOTE_CACHE_TTL', 60))
+    QUOTE_CACHE_SIZE = int(os.getenv('QUOTE_CACHE_SIZE', 1024))
+    SIGNAL_CACHE_TTL = int(os.getenv('SIGNAL_CACHE_TTL', 86400))
+
+    # Expired quotes younger than this are served stale while revalidating in the background
+    QUOTE_STALE_TTL = int(os.getenv('QUOTE_STALE_TTL', 300))
+
+    # Per provider/function circuit breakers
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', 30))
+
+    # Response compression (brotli is used when the optional brotli package is installed)
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+
+    # Concurrent upstream fetches
+    FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', 8))
+    # Background refreshes get their own pool so they never hold workers interactive batches need
+    BACKGROUND_FETCH_WORKERS = int(os.getenv('BACKGROUND_FETCH_WORKERS', 4))
+    MAX_BATCH_SYMBOLS = int(os.getenv('MAX_BATCH_SYMBOLS', 50))
+
+    # /api/stream server-sent events
+    STREAM_POLL_INTERVAL = float(os.getenv('STREAM_POLL_INTERVAL', 15))
+    STREAM_HEARTBEAT = float(os.getenv('STREAM_HEARTBEAT', 20))
+    STREAM_RETRY_MS = 5000
+
+    # Background snapshot refreshers
+    MARKET_OVERVIEW_INTERVAL = float(os.getenv('MARKET_OVERVIEW_INTERVAL', 60))
+    MARKET_SENTIMENT_INTERVAL = float(os.getenv('MARKET_SENTIMENT_INTERVAL', 60))
+    NEWS_INGEST_INTERVAL = float(os.getenv('NEWS_INGEST_INTERVAL', 600))
+    NEWS_SENTIMENT_WINDOW = int(os.getenv('NEWS_SENTIMENT_WINDOW', 20))
+    NEWS_SENTIMENT_HEADLINES = 50
+    # Alerts on symbols nobody is requesting are re-quoted this often, which bounds their latency
+    ALERT_EVAL_INTERVAL = float(os.getenv('ALERT_EVAL_INTERVAL', 30))
+
+    # /api/analyze fan-out
+    ANALYZE_WORKERS = int(os.getenv('ANALYZE_WORKERS', 16))
+    ANALYZE_STAGE_TIMEOUT = float(os.getenv('ANALYZE_STAGE_TIMEOUT', 8))
+    CHART_DAYS = 30
+    HISTORY_MAX_DAYS = int(os.getenv('HISTORY_MAX_DAYS', 5000))
+    INDICATOR_LOOKBACK_DAYS = int(os.getenv('INDICATOR_LOOKBACK_DAYS', 100))
+
+    # Upstream base URLs (point these at bench/fake_upstream.py for load tests)
+    ALPHA_VANTAGE_URL = os.getenv('ALPHA_VANTAGE_URL', 'https://www.alphavantage.co/query')
+    NEWS_API_URL = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2')
+    OPENAI_API_BASE = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
+
+    # Upstream HTTP client
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+    HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', 0.5))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 20))
+
+    # OpenAI completion cache (memory LRU backed by SQLite)
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 3600))
+    LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', 512))
+    LLM_CACHE_DISK_SIZE = int(os.getenv('LLM_CACHE_DISK_SIZE', 10000))
+    LLM_CACHE_DB_PATH = os.getenv('LLM_CACHE_DB_PATH', os.path.join(DATA_DIR, 'completions.db'))
+
+    # Alpha Vantage rate limiting (set RATE_LIMIT_STATE_PATH to share the quota across processes)
+    ALPHA_VANTAGE_CALLS_PER_MINUTE = float(os.getenv('ALPHA_VANTAGE_CALLS_PER_MINUTE', 5))
+    ALPHA_VANTAGE_BURST = int(os.getenv('ALPHA_VANTAGE_BURST', 5))
+    RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 10))
+    RATE_LIMIT_STATE_PATH = os.getenv('RATE_LIMIT_STATE_PATH', '')
+
+    # Company profiles (OVERVIEW) kept for days; PROFILE_UNIVERSE_FILE is preloaded at startup
+    PROFILE_DB_PATH = os.getenv('PROFILE_DB_PATH', os.path.join(DATA_DIR, 'profiles.db'))
+    PROFILE_TTL = int(os.getenv('PROFILE_TTL', 7 * 86400))
+    PROFILE_UNIVERSE_FILE = os.getenv('PROFILE_UNIVERSE_FILE', '')
+    PROFILE_PRELOAD_ATTEMPTS = 5
+
+    # Fraction of requests profiled with cProfile (0 disables the profiler)
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+
+    # Local daily OHLCV store ('full' backfill requires a premium Alpha Vantage key)
+    OHLCV_DB_PATH = os.getenv('OHLCV_DB_PATH', os.path.join(DATA_DIR, 'ohlcv.db'))
+    OHLCV_REFRESH_SECONDS = int(os.getenv('OHLCV_REFRESH_SECONDS', 3600))
+    OHLCV_BACKFILL_OUTPUTSIZE = os.getenv('OHLCV_BACKFILL_OUTPUTSIZE', 'compact')
+
+    # Portfolio analytics over an aligned daily price matrix
+    PORTFOLIO_LOOKBACK_DAYS = int(os.getenv('PORTFOLIO_LOOKBACK_DAYS', 252))
+    PORTFOLIO_BENCHMARK = os.getenv('PORTFOLIO_BENCHMARK', 'SPY')
+    PORTFOLIO_VAR_CONFIDENCE = float(os.getenv('PORTFOLIO_VAR_CONFIDENCE', 0.95))
+    PORTFOLIO_CACHE_SIZE = int(os.getenv('PORTFOLIO_CACHE_SIZE', 256))
+
+    # Simulated market used in demo mode and as a fallback (same seed, same prices)
+    DEMO_MARKET_SEED = int(os.getenv('DEMO_MARKET_SEED', 42))
+    DEMO_MARKET_CACHE_SIZE = int(os.getenv('DEMO_MARKET_CACHE_SIZE', 256))
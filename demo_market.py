@@ -0,0 +1,151 @@
+import zlib
+from datetime import date
+
+import numpy as np
+
+from cache import TTLCache
+from indicators import TRADING_DAYS
+from timeseries import PriceSeries, to_epoch_days
+
+# The simulated market trades at the base prices on REFERENCE_DAY; paths walk
+# forward from it to today and backward from it to START_DAY
+REFERENCE_DAY = int(to_epoch_days(['2025-01-02'])[0])
+# First simulated day; covers HISTORY_MAX_DAYS of history
+START_DAY = int(to_epoch_days(['2010-01-01'])[0])
+
+BASE_PRICES = {
+    'AAPL': 175, 'MSFT': 340, 'TSLA': 240, 'NVDA': 450,
+    'GOOGL': 130, 'AMZN': 145, 'META': 300, 'NFLX': 420,
+    'AMD': 110, 'INTC': 35, 'JPM': 150, 'JNJ': 160, 'V': 220,
+    'DIS': 90, 'NKE': 100, 'BA': 200, 'XOM': 105, 'WMT': 150,
+    'BTC': 50000, 'ETH': 3000, 'ADA': 1.2, 'DOGE': 0.2,
+    'XRP': 0.8, 'DOT': 20, 'SOL': 100, 'BNB': 400,
+    # Index levels shown in the market overview
+    'SPY': 4500, 'QQQ': 370, 'DIA': 35000, 'IWM': 190, 'VIX': 18
+}
+CRYPTO = {'BTC', 'ETH', 'ADA', 'DOGE', 'XRP', 'DOT', 'SOL', 'BNB'}
+
+
+def today():
+    return int(to_epoch_days([date.today().isoformat()])[0])
+
+
+def synthetic_symbols(count):
+    """Stable made-up tickers for load tests over large universes"""
+    return [f'D{index:05d}' for index in range(count)]
+
+
+def _between(fraction, low, high):
+    return float(low + (high - low) * fraction)
+
+
+def _digits(profile):
+    """Sub-dollar coins keep four decimals"""
+    return 2 if profile['base'] >= 1 else 4
+
+
+class DemoMarket:
+    """Seeded geometric-Brownian-motion market for demo mode and load tests.
+
+    A symbol's daily closes are a pure function of (seed, symbol), so its
+    quote, the last bar of its history and any date range agree across
+    endpoints, requests and processes. The recent path is one vectorized
+    draw from REFERENCE_DAY to today; older history is only generated when
+    asked for. Recently used paths are kept in memory.
+    """
+
+    def __init__(self, seed=0, cache_size=256):
+        self.seed = seed
+        self._paths = TTLCache(ttl=86400, maxsize=cache_size)
+
+    def _rng(self, symbol, stream):
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode('utf-8')), stream])
+
+    def profile(self, symbol):
+        """Per-symbol constants: base price, annual volatility, typical volume, shares, EPS and dividend"""
+        u = self._rng(symbol, 0).random(6)
+        crypto = symbol in CRYPTO
+        base = BASE_PRICES.get(symbol) or round(float(10 ** _between(u[0], 1, 2.7)), 2)
+        return {
+            'base': base,
+            'crypto': crypto,
+            'volatility': _between(u[1], 0.45, 0.75) if crypto else _between(u[1], 0.15, 0.4),
+            'volume': 10 ** (_between(u[2], 6, 9) if crypto else _between(u[2], 6, 7)),
+            'shares': 10 ** (_between(u[3], 6, 9) if crypto else _between(u[3], 8, 10)),
+            'eps': base / _between(u[4], 10, 40),
+            'dividend': base * _between(u[5], 0, 0.04)
+        }
+
+    def _walk(self, symbol, profile, stream, days):
+        """Daily log returns and volumes; rows are drawn in order, so a longer walk extends a shorter one"""
+        draws = self._rng(symbol, stream).standard_normal((days, 2))
+        sigma = profile['volatility'] / np.sqrt(TRADING_DAYS)
+        log_returns = sigma * draws[:, 0] - 0.5 * sigma ** 2
+        # Volume rises with the size of the move
+        volume = profile['volume'] * np.exp(0.25 * draws[:, 1]) * (1 + np.abs(draws[:, 0]))
+        return log_returns, volume.astype(np.int64)
+
+    def _series(self, profile, first_day, log_path, volume):
+        close = np.round(profile['base'] * np.exp(log_path), _digits(profile))
+        return PriceSeries(np.arange(first_day, first_day + len(close)), close, volume)
+
+    def _recent(self, symbol, last_day):
+        """Profile and path from REFERENCE_DAY (at the base price) to last_day"""
+        profile = self.profile(symbol)
+        log_returns, volume = self._walk(symbol, profile, 1, last_day - REFERENCE_DAY + 1)
+        log_returns[0] = 0.0
+        return profile, self._series(profile, REFERENCE_DAY, np.cumsum(log_returns), volume)
+
+    def _earlier(self, symbol):
+        """Path from START_DAY to the day before REFERENCE_DAY, walked backwards from the base price"""
+        profile = self.profile(symbol)
+        log_returns, volume = self._walk(symbol, profile, 2, REFERENCE_DAY - START_DAY)
+        return self._series(profile, START_DAY, -np.cumsum(log_returns)[::-1], volume[::-1])
+
+    def _path(self, symbol):
+        last_day = today()
+        return self._paths.get_or_load((symbol, last_day), lambda: self._recent(symbol, last_day))
+
+    def history(self, symbol, days=30):
+        """Daily history ending today; its last close is the quote price"""
+        recent = self._path(symbol)[1]
+        if days <= len(recent):
+            return recent[-days:]
+        # Doesn't depend on the date, so it is cached under its own key
+        earlier = self._paths.get_or_load((symbol, None), lambda: self._earlier(symbol))
+        return PriceSeries(np.concatenate([earlier.dates, recent.dates]), np.concatenate([earlier.close, recent.close]),
+                           np.concatenate([earlier.volume, recent.volume]))[-days:]
+
+    def _quote(self, symbol):
+        profile = self._path(symbol)[0]
+        year = self.history(symbol, 365)
+        price, previous = float(year.close[-1]), float(year.close[-2])
+        return profile, year, {
+            'symbol': symbol,
+            'price': price,
+            'change': round(price - previous, _digits(profile)),
+            'change_percent': round((price - previous) / previous * 100, 2),
+            'volume': int(year.volume[-1]),
+            'market_cap': round(price * profile['shares'], 2)
+        }
+
+    def quote(self, symbol):
+        """Stock quote in the get_stock_data shape"""
+        profile, year, quote = self._quote(symbol)
+        quote.update({
+            'pe_ratio': round(quote['price'] / profile['eps'], 2),
+            'dividend_yield': round(profile['dividend'] / quote['price'] * 100, 2),
+            'fifty_two_week_high': round(float(year.close.max()), 2),
+            'fifty_two_week_low': round(float(year.close.min()), 2)
+        })
+        return quote
+
+    def crypto_quote(self, symbol):
+        """Crypto quote in the get_crypto_data shape"""
+        return self._quote(symbol)[2]
+
+    def quotes(self, symbols):
+        return {symbol: self.quote(symbol) for symbol in symbols}
+
+    def stats(self):
+        return dict(self._paths.stats(), seed=self.seed)
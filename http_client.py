@@ -0,0 +1,225 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+try:
+    import httpx
+except ImportError:  # only needed by the async (ASGI) serving mode
+    httpx = None
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed bucket bounds (seconds)"""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+            else:
+                self.counts[-1] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            buckets = {}
+            running = 0
+            for bound, count in zip(self.BUCKETS + ('+Inf',), self.counts):
+                running += count
+                buckets[str(bound)] = running
+            return {
+                'buckets': buckets,
+                'count': self.count,
+                'sum': round(self.total, 6)
+            }
+
+
+class ProviderClient:
+    """Shared HTTP client: one pooled keep-alive session per upstream host,
+    explicit timeouts, jittered retries and per-provider latency histograms"""
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, max_retries=2, backoff=0.5, pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._histograms = {}
+        self._errors = {}
+        self._retries = {}
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        """Return the pooled session for the host of url"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def histogram(self, provider):
+        with self._lock:
+            histogram = self._histograms.get(provider)
+            if histogram is None:
+                histogram = self._histograms[provider] = LatencyHistogram()
+            return histogram
+
+    def _count(self, counter, provider):
+        with self._lock:
+            counter[provider] = counter.get(provider, 0) + 1
+
+    def _delay(self, attempt, response=None):
+        """Exponential backoff with full jitter, honouring Retry-After when given"""
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return min(float(response.headers['Retry-After']), self.backoff * 2 ** self.max_retries)
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    def get(self, provider, url, params=None, **kwargs):
+        """GET url, retrying connection errors, timeouts and RETRY_STATUSES"""
+        session = self.session(url)
+        kwargs.setdefault('timeout', self.timeout)
+        histogram = self.histogram(provider)
+
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                response = session.get(url, params=params, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                histogram.observe(time.monotonic() - started)
+                self._count(self._errors, provider)
+                if attempt == self.max_retries:
+                    raise
+                self._count(self._retries, provider)
+                time.sleep(self._delay(attempt))
+                continue
+
+            histogram.observe(time.monotonic() - started)
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._count(self._retries, provider)
+                time.sleep(self._delay(attempt, response))
+                continue
+            if response.status_code >= 400:
+                self._count(self._errors, provider)
+            return response
+
+    def get_json(self, provider, url, params=None, **kwargs):
+        response = self.get(provider, url, params=params, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self):
+        with self._lock:
+            providers = set(self._histograms) | set(self._errors)
+            histograms = dict(self._histograms)
+            errors = dict(self._errors)
+            retries = dict(self._retries)
+            hosts = list(self._sessions)
+
+        return {
+            'hosts': hosts,
+            'providers': {
+                provider: {
+                    'latency': histograms[provider].snapshot() if provider in histograms else None,
+                    'errors': errors.get(provider, 0),
+                    'retries': retries.get(provider, 0)
+                }
+                for provider in sorted(providers)
+            }
+        }
+
+
+class AsyncProviderClient:
+    """httpx-based counterpart of ProviderClient for the ASGI app.
+
+    Uses the same timeouts and retry policy, and records latency, errors and
+    retries into the sync client's stats so /api/providers/stats covers both.
+    """
+
+    def __init__(self, sync_client):
+        self.sync_client = sync_client
+        self._client = None
+
+    def client(self):
+        if httpx is None:
+            raise ImportError('Async serving requires httpx: pip install httpx')
+        if self._client is None:
+            connect, read = self.sync_client.timeout
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_keepalive_connections=self.sync_client.pool_size)
+            )
+        return self._client
+
+    async def get(self, provider, url, params=None, **kwargs):
+        """GET url, retrying connection errors, timeouts and RETRY_STATUSES"""
+        client = self.client()
+        sync_client = self.sync_client
+        histogram = sync_client.histogram(provider)
+
+        for attempt in range(sync_client.max_retries + 1):
+            started = time.monotonic()
+            try:
+                response = await client.get(url, params=params, **kwargs)
+            except httpx.TransportError:
+                histogram.observe(time.monotonic() - started)
+                sync_client._count(sync_client._errors, provider)
+                if attempt == sync_client.max_retries:
+                    raise
+                sync_client._count(sync_client._retries, provider)
+                await asyncio.sleep(sync_client._delay(attempt))
+                continue
+
+            histogram.observe(time.monotonic() - started)
+            if response.status_code in RETRY_STATUSES and attempt < sync_client.max_retries:
+                sync_client._count(sync_client._retries, provider)
+                await asyncio.sleep(sync_client._delay(attempt, response))
+                continue
+            if response.status_code >= 400:
+                sync_client._count(sync_client._errors, provider)
+            return response
+
+    async def get_json(self, provider, url, params=None, **kwargs):
+        response = await self.get(provider, url, params=params, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+provider_client = ProviderClient(
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.HTTP_READ_TIMEOUT,
+    max_retries=Config.HTTP_MAX_RETRIES,
+    backoff=Config.HTTP_BACKOFF,
+    pool_size=Config.HTTP_POOL_SIZE
+)
+
+async_provider_client = AsyncProviderClient(provider_client)
@@ -0,0 +1,292 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# EMA is evaluated in closed form over fixed-size blocks so decay**-n never overflows
+_EMA_BLOCK = 128
+TRADING_DAYS = 252
+
+
+def sma(values, window):
+    """Simple moving average; the first window-1 points are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    sums = np.cumsum(np.insert(values, 0, 0.0))
+    out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def ema(values, span=None, alpha=None):
+    """Exponential moving average seeded with the first value (no warm-up NaNs)"""
+    values = np.asarray(values, dtype=np.float64)
+    alpha = alpha if alpha is not None else 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    out = np.empty(len(values))
+    if not len(values):
+        return out
+    if decay == 0:
+        out[:] = values
+        return out
+
+    prev = values[0]
+    for start in range(0, len(values), _EMA_BLOCK):
+        block = values[start:start + _EMA_BLOCK]
+        steps = np.arange(len(block))
+        # y_k = decay^(k+1) * prev + alpha * sum_j decay^(k-j) * x_j
+        out[start:start + len(block)] = (decay ** (steps + 1)) * prev + \
+            alpha * (decay ** steps) * np.cumsum(block * decay ** -steps)
+        prev = out[start + len(block) - 1]
+    out[0] = values[0]
+    return out
+
+
+def rolling_std(values, window):
+    """Rolling population standard deviation; the first window-1 points are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    mean = sma(values, window)[window - 1:]
+    sums_sq = np.cumsum(np.insert(values ** 2, 0, 0.0))
+    mean_sq = (sums_sq[window:] - sums_sq[:-window]) / window
+    out[window - 1:] = np.sqrt(np.maximum(mean_sq - mean ** 2, 0.0))
+    return out
+
+
+def _wilder_averages(closes, period):
+    deltas = np.diff(np.asarray(closes, dtype=np.float64))
+    gains = np.maximum(deltas, 0.0)
+    losses = np.maximum(-deltas, 0.0)
+    return ema(gains, alpha=1.0 / period), ema(losses, alpha=1.0 / period)
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        rsi = 100.0 - 100.0 / (1.0 + rs)
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    return rsi
+
+
+def rsi(closes, period=14):
+    """Wilder's RSI aligned with closes (first point is NaN)"""
+    closes = np.asarray(closes, dtype=np.float64)
+    out = np.full(len(closes), np.nan)
+    if len(closes) < 2:
+        return out
+    avg_gain, avg_loss = _wilder_averages(closes, period)
+    out[1:] = _rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+
+def macd(closes, fast=12, slow=26, signal=9):
+    """Return (macd line, signal line, histogram)"""
+    line = ema(closes, fast) - ema(closes, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(closes, window=20, width=2.0):
+    """Return (middle, upper, lower) bands"""
+    middle = sma(closes, window)
+    deviation = rolling_std(closes, window)
+    return middle, middle + width * deviation, middle - width * deviation
+
+
+def volatility(closes, window=20):
+    """Rolling annualized volatility of daily log returns, aligned with closes"""
+    closes = np.asarray(closes, dtype=np.float64)
+    out = np.full(len(closes), np.nan)
+    if len(closes) < 2:
+        return out
+    returns = np.diff(np.log(closes))
+    out[1:] = rolling_std(returns, window) * math.sqrt(TRADING_DAYS)
+    return out
+
+
+def compute_indicators(closes):
+    """Compute every indicator series for a chronological array of closes"""
+    closes = np.asarray(closes, dtype=np.float64)
+    macd_line, signal_line, histogram = macd(closes)
+    middle, upper, lower = bollinger(closes)
+    return {
+        'sma_20': sma(closes, 20),
+        'sma_50': sma(closes, 50),
+        'ema_12': ema(closes, 12),
+        'ema_26': ema(closes, 26),
+        'rsi': rsi(closes),
+        'macd': macd_line,
+        'macd_signal': signal_line,
+        'macd_histogram': histogram,
+        'bollinger_middle': middle,
+        'bollinger_upper': upper,
+        'bollinger_lower': lower,
+        'volatility': volatility(closes)
+    }
+
+
+def _latest(series):
+    value = series[-1] if len(series) else np.nan
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def summarize(closes, indicators):
+    """Latest values plus the Bullish/Bearish/Neutral labels used by recommendations"""
+    latest = {name: _latest(series) for name, series in indicators.items()}
+    price = float(closes[-1]) if len(closes) else None
+    return label_signals(latest, price)
+
+
+def label_signals(latest, price):
+    """Bullish/Bearish/Neutral labels for one set of latest indicator values"""
+    histogram = latest['macd_histogram']
+    if histogram is None or price is None or abs(histogram) < price * 0.0005:
+        macd_signal = 'Neutral'
+    else:
+        macd_signal = 'Bullish' if histogram > 0 else 'Bearish'
+
+    average = latest['sma_20'] if latest['sma_20'] is not None else latest['ema_12']
+    if average is None or price is None or abs(price - average) < average * 0.005:
+        moving_avg_signal = 'Neutral'
+    else:
+        moving_avg_signal = 'Bullish' if price > average else 'Bearish'
+
+    return {
+        'latest': latest,
+        'rsi': int(round(latest['rsi'])) if latest['rsi'] is not None else 50,
+        'macd': macd_signal,
+        'moving_avg': moving_avg_signal
+    }
+
+
+def series_to_json(indicators):
+    """Convert indicator arrays to JSON-safe lists (NaN becomes None)"""
+    return {
+        name: [None if np.isnan(value) else round(float(value), 4) for value in series]
+        for name, series in indicators.items()
+    }
+
+
+class IndicatorState:
+    """Running indicator state that absorbs one new close in O(1).
+
+    snapshot() gives the same values as the last point of compute_indicators
+    over every close the state has seen.
+    """
+
+    __slots__ = ('close', 'ema_12', 'ema_26', 'macd_signal', 'avg_gain', 'avg_loss',
+                 'window', 'sum_20', 'sum_sq_20', 'sum_50', 'returns', 'returns_sum', 'returns_sum_sq')
+
+    def __init__(self):
+        self.close = None
+        self.ema_12 = self.ema_26 = self.macd_signal = None
+        self.avg_gain = self.avg_loss = None
+        self.window = deque(maxlen=50)
+        self.sum_20 = self.sum_sq_20 = self.sum_50 = 0.0
+        self.returns = deque(maxlen=20)
+        self.returns_sum = self.returns_sum_sq = 0.0
+
+    @classmethod
+    def from_closes(cls, closes):
+        """Seed the state from history using the vectorized routines"""
+        closes = np.asarray(closes, dtype=np.float64)
+        state = cls()
+        if not len(closes):
+            return state
+        state.close = float(closes[-1])
+        fast, slow = ema(closes, 12), ema(closes, 26)
+        state.ema_12, state.ema_26 = float(fast[-1]), float(slow[-1])
+        state.macd_signal = float(ema(fast - slow, 9)[-1])
+        if len(closes) > 1:
+            avg_gain, avg_loss = _wilder_averages(closes, 14)
+            state.avg_gain, state.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+        for value in closes[-50:]:
+            state._push_close(float(value))
+        for value in np.diff(np.log(closes[-21:])):
+            state._push_return(float(value))
+        return state
+
+    def _push_close(self, value):
+        window = self.window
+        if len(window) >= 20:
+            old = window[-20]
+            self.sum_20 -= old
+            self.sum_sq_20 -= old * old
+        if len(window) == window.maxlen:
+            self.sum_50 -= window[0]
+        window.append(value)
+        self.sum_20 += value
+        self.sum_sq_20 += value * value
+        self.sum_50 += value
+
+    def _push_return(self, value):
+        if len(self.returns) == self.returns.maxlen:
+            old = self.returns[0]
+            self.returns_sum -= old
+            self.returns_sum_sq -= old * old
+        self.returns.append(value)
+        self.returns_sum += value
+        self.returns_sum_sq += value * value
+
+    def update(self, close):
+        """Append one close and return the latest indicator values"""
+        close = float(close)
+        if self.close is None:
+            self.ema_12 = self.ema_26 = close
+            self.macd_signal = 0.0
+        else:
+            delta = close - self.close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            if self.avg_gain is None:
+                # Wilder averages are seeded with the first change, like ema()
+                self.avg_gain, self.avg_loss = gain, loss
+            else:
+                self.avg_gain += (gain - self.avg_gain) / 14
+                self.avg_loss += (loss - self.avg_loss) / 14
+            self.ema_12 += (close - self.ema_12) * 2 / 13
+            self.ema_26 += (close - self.ema_26) * 2 / 27
+            self.macd_signal += (self.ema_12 - self.ema_26 - self.macd_signal) * 2 / 10
+            self._push_return(math.log(close / self.close))
+        self.close = close
+        self._push_close(close)
+        return self.snapshot()
+
+    def snapshot(self):
+        """Latest values keyed like compute_indicators, rounded like summarize; None until warmed up"""
+        count = len(self.window)
+        sma_20 = sma_50 = std_20 = macd_line = histogram = vol = rsi_value = None
+        if count >= 20:
+            sma_20 = self.sum_20 / 20
+            std_20 = math.sqrt(max(self.sum_sq_20 / 20 - sma_20 ** 2, 0.0))
+        if count == self.window.maxlen:
+            sma_50 = self.sum_50 / 50
+        if self.ema_12 is not None:
+            macd_line = self.ema_12 - self.ema_26
+            histogram = macd_line - self.macd_signal
+        n = len(self.returns)
+        if n == self.returns.maxlen:
+            vol = math.sqrt(max(self.returns_sum_sq / n - (self.returns_sum / n) ** 2, 0.0)) * math.sqrt(TRADING_DAYS)
+        if self.avg_gain is not None:
+            if self.avg_loss == 0:
+                rsi_value = 50.0 if self.avg_gain == 0 else 100.0
+            else:
+                rsi_value = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+        values = {
+            'sma_20': sma_20,
+            'sma_50': sma_50,
+            'ema_12': self.ema_12,
+            'ema_26': self.ema_26,
+            'rsi': rsi_value,
+            'macd': macd_line,
+            'macd_signal': self.macd_signal,
+            'macd_histogram': histogram,
+            'bollinger_middle': sma_20,
+            'bollinger_upper': sma_20 + 2.0 * std_20 if sma_20 is not None else None,
+            'bollinger_lower': sma_20 - 2.0 * std_20 if sma_20 is not None else None,
+            'volatility': vol
+        }
+        return {name: None if value is None else round(value, 4) for name, value in values.items()}
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import openai
+
+from cache import TTLCache
+from config import Config
+from metrics import upstream_latency
+
+# Per-call transport options that don't change the completion
+_TRANSPORT_PARAMS = ('request_timeout', 'timeout', 'stream')
+
+
+def normalize_messages(messages):
+    """Collapse whitespace so trivially different prompts share a cache entry"""
+    return [
+        {'role': message['role'], 'content': re.sub(r'\s+', ' ', message['content']).strip()}
+        for message in messages
+    ]
+
+
+def completion_key(model, messages, **params):
+    """Content-addressed key for (model, normalized prompt, sampling params)"""
+    params = {name: value for name, value in params.items() if name not in _TRANSPORT_PARAMS}
+    payload = json.dumps([model, normalize_messages(messages), params], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """Chat completion cache: in-memory LRU in front of a SQLite tier.
+
+    Identical prompts in flight at the same time share one upstream call,
+    and completions survive restarts until their TTL runs out.
+    """
+
+    def __init__(self, path, ttl=3600, maxsize=512, disk_maxsize=10000):
+        self.path = path
+        self.ttl = ttl
+        self.disk_maxsize = disk_maxsize
+        self.memory = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.disk_hits = 0
+        self.upstream_calls = 0
+        self._async_flights = {}
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT NOT NULL,
+                created REAL NOT NULL
+            )''')
+            conn.execute('CREATE INDEX IF NOT EXISTS completions_created ON completions (created)')
+            conn.execute('DELETE FROM completions WHERE created < ?', (time.time() - ttl,))
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def _disk_get(self, key):
+        row = self._conn().execute('SELECT content FROM completions WHERE key = ? AND created >= ?',
+                                   (key, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def _disk_set(self, key, model, content):
+        with self._conn() as conn:
+            conn.execute('INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)', (key, model, content, time.time()))
+            # Keep the newest disk_maxsize rows
+            conn.execute('''DELETE FROM completions WHERE key IN (
+                SELECT key FROM completions ORDER BY created DESC LIMIT -1 OFFSET ?
+            )''', (self.disk_maxsize,))
+
+    def _lookup(self, key):
+        """Cached completion text from memory or disk, or None"""
+        content = self.memory.get(key)
+        if content is None:
+            content = self._disk_get(key)
+            if content is not None:
+                self.disk_hits += 1
+                self.memory.set(key, content)
+        return content
+
+    def _store(self, key, model, content):
+        self._disk_set(key, model, content)
+        self.memory.set(key, content)
+
+    def complete(self, messages, model='gpt-3.5-turbo', **params):
+        """Return the completion text for messages, calling OpenAI only on a miss"""
+        key = completion_key(model, messages, **params)
+
+        def load():
+            content = self._disk_get(key)
+            if content is not None:
+                self.disk_hits += 1
+                return content
+            self.upstream_calls += 1
+            with upstream_latency.time(call='openai'):
+                response = openai.ChatCompletion.create(model=model, messages=messages, **params)
+            content = response.choices[0].message.content.strip()
+            self._disk_set(key, model, content)
+            return content
+
+        return self.memory.get_or_load(key, load)
+
+    async def complete_async(self, messages, model='gpt-3.5-turbo', **params):
+        """Async complete(): identical prompts in flight on the event loop share one call"""
+        key = completion_key(model, messages, **params)
+        content = self.memory.get(key)
+        if content is not None:
+            return content
+
+        flight = self._async_flights.get(key)
+        if flight is None:
+            async def load():
+                try:
+                    content = self._disk_get(key)
+                    if content is not None:
+                        self.disk_hits += 1
+                    else:
+                        self.upstream_calls += 1
+                        started = time.monotonic()
+                        try:
+                            response = await openai.ChatCompletion.acreate(model=model, messages=messages, **params)
+                        finally:
+                            upstream_latency.observe(time.monotonic() - started, call='openai')
+                        content = response.choices[0].message.content.strip()
+                        self._disk_set(key, model, content)
+                    self.memory.set(key, content)
+                    return content
+                finally:
+                    self._async_flights.pop(key, None)
+            flight = self._async_flights[key] = asyncio.ensure_future(load())
+        return await asyncio.shield(flight)
+
+    def stream(self, messages, model='gpt-3.5-turbo', **params):
+        """Yield completion text as OpenAI generates it; a cached completion is yielded whole.
+
+        The full text is cached when the stream finishes, so a repeated prompt
+        is answered from the cache. A stream that fails part way is not cached.
+        """
+        key = completion_key(model, messages, **params)
+        content = self._lookup(key)
+        if content is not None:
+            yield content
+            return
+
+        self.upstream_calls += 1
+        parts = []
+        with upstream_latency.time(call='openai'):
+            for chunk in openai.ChatCompletion.create(model=model, messages=messages, stream=True, **params):
+                text = chunk.choices[0].delta.get('content')
+                if text:
+                    parts.append(text)
+                    yield text
+        self._store(key, model, ''.join(parts).strip())
+
+    async def stream_async(self, messages, model='gpt-3.5-turbo', **params):
+        """Async stream()"""
+        key = completion_key(model, messages, **params)
+        content = self._lookup(key)
+        if content is not None:
+            yield content
+            return
+
+        self.upstream_calls += 1
+        parts = []
+        started = time.monotonic()
+        try:
+            async for chunk in await openai.ChatCompletion.acreate(model=model, messages=messages, stream=True, **params):
+                text = chunk.choices[0].delta.get('content')
+                if text:
+                    parts.append(text)
+                    yield text
+        finally:
+            upstream_latency.observe(time.monotonic() - started, call='openai')
+        self._store(key, model, ''.join(parts).strip())
+
+    def stats(self):
+        row = self._conn().execute('SELECT COUNT(*) FROM completions').fetchone()
+        return dict(self.memory.stats(), disk_size=row[0], disk_hits=self.disk_hits, upstream_calls=self.upstream_calls)
+
+
+completion_cache = CompletionCache(Config.LLM_CACHE_DB_PATH, ttl=Config.LLM_CACHE_TTL,
+                                   maxsize=Config.LLM_CACHE_SIZE, disk_maxsize=Config.LLM_CACHE_DISK_SIZE)
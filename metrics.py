@@ -0,0 +1,194 @@
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+from http_client import LatencyHistogram
+
+
+def _label_text(labels):
+    labels = dict(sorted(labels.items()))
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic counter with one value per label set"""
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_label_text(dict(key))} {value}')
+        return lines
+
+
+class Histogram:
+    """Latency histogram (seconds) with one LatencyHistogram per label set"""
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        for key, histogram in histograms:
+            lines += render_histogram(self.name, dict(key), histogram.snapshot())
+        return lines
+
+
+def render_samples(name, kind, help, samples):
+    """Exposition lines for a metric given as [(labels, value)]"""
+    lines = [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+    lines += [f'{name}{_label_text(labels)} {value}' for labels, value in samples]
+    return lines
+
+
+def observe_request(route, method, status, seconds):
+    request_latency.observe(seconds, route=route, method=method)
+    requests_total.inc(route=route, method=method, status=status)
+
+
+def render_histogram(name, labels, snapshot):
+    """Prometheus bucket/sum/count lines from a LatencyHistogram snapshot"""
+    lines = [f'{name}_bucket{_label_text(dict(labels, le=bound))} {count}' for bound, count in snapshot['buckets'].items()]
+    lines.append(f'{name}_sum{_label_text(labels)} {snapshot["sum"]}')
+    lines.append(f'{name}_count{_label_text(labels)} {snapshot["count"]}')
+    return lines
+
+
+class MetricsRegistry:
+    """Owns the app's metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help)
+            return metric
+
+    def counter(self, name, help):
+        return self._get(Counter, name, help)
+
+    def histogram(self, name, help):
+        return self._get(Histogram, name, help)
+
+    def add_collector(self, collect):
+        """Register collect() -> list of exposition lines, called on every scrape.
+
+        Used for components that already keep their own stats (caches, the
+        HTTP client, the rate limiter).
+        """
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines += metric.render()
+        for collect in self._collectors:
+            try:
+                lines += collect()
+            except Exception:
+                pass
+        return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """Profiles a random sample of requests with cProfile and aggregates the stats.
+
+    Disabled when sample_rate is 0. Only one request is profiled at a time.
+    """
+
+    def __init__(self, sample_rate=0.0):
+        self.sample_rate = sample_rate
+        self.samples = 0
+        self._stats = None
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def start(self):
+        """Return a running profiler for this request, or None if it isn't sampled"""
+        if not self.enabled or random.random() >= self.sample_rate or not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler):
+        profiler.disable()
+        self._busy.release()
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self.samples += 1
+
+    def report(self, limit=40):
+        with self._lock:
+            if self._stats is None:
+                return 'No samples collected\n'
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats('cumulative').print_stats(limit)
+            return f'{self.samples} sampled requests\n' + out.getvalue()
+
+
+registry = MetricsRegistry()
+
+request_latency = registry.histogram('stocksense_http_request_duration_seconds', 'Latency of API requests by route')
+requests_total = registry.counter('stocksense_http_requests_total', 'API requests by route and status')
+upstream_latency = registry.histogram('stocksense_upstream_call_duration_seconds', 'Latency of upstream calls by function')
+demo_fallbacks = registry.counter('stocksense_demo_fallbacks_total', 'Upstream failures answered with the last good or simulated data')
+rate_limited = registry.counter('stocksense_rate_limited_total', 'Upstream calls refused by the local limiter or the provider')
+stage_failures = registry.counter('stocksense_analyze_stage_failures_total', 'Analysis stages that timed out or failed')
+
+profiler = SamplingProfiler(Config.PROFILE_SAMPLE_RATE)
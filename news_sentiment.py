@@ -0,0 +1,207 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Small finance-news lexicon; weights are in [-1, 1]
+LEXICON = {
+    # positive
+    'beat': 0.6, 'beats': 0.6, 'boost': 0.5, 'boosts': 0.5, 'breakthrough': 0.7, 'bullish': 0.7,
+    'climb': 0.5, 'climbs': 0.5, 'gain': 0.5, 'gains': 0.5, 'growth': 0.5, 'high': 0.3,
+    'improve': 0.4, 'improves': 0.4, 'innovation': 0.4, 'jump': 0.6, 'jumps': 0.6, 'outperform': 0.6,
+    'partnership': 0.3, 'profit': 0.5, 'profits': 0.5, 'rally': 0.6, 'rallies': 0.6, 'record': 0.4,
+    'rebound': 0.5, 'rise': 0.4, 'rises': 0.4, 'soar': 0.8, 'soars': 0.8, 'strong': 0.5,
+    'surge': 0.7, 'surges': 0.7, 'upgrade': 0.7, 'upgrades': 0.7, 'win': 0.4, 'wins': 0.4,
+    # negative
+    'bearish': -0.7, 'caution': -0.4, 'concern': -0.5, 'concerns': -0.5, 'cut': -0.4, 'cuts': -0.4,
+    'decline': -0.5, 'declines': -0.5, 'dip': -0.4, 'dips': -0.4, 'downgrade': -0.7, 'downgrades': -0.7,
+    'drop': -0.5, 'drops': -0.5, 'fall': -0.5, 'falls': -0.5, 'fraud': -0.9, 'investigation': -0.6,
+    'lawsuit': -0.6, 'layoffs': -0.6, 'loss': -0.6, 'losses': -0.6, 'miss': -0.6, 'misses': -0.6,
+    'plunge': -0.8, 'plunges': -0.8, 'recall': -0.5, 'regulatory': -0.3, 'slump': -0.7, 'slumps': -0.7,
+    'tumble': -0.7, 'tumbles': -0.7, 'warning': -0.5, 'weak': -0.5, 'challenges': -0.4
+}
+NEGATIONS = {'not', 'no', 'never', "isn't", "doesn't", "didn't", 'without'}
+
+# Company names and tickers recognised in headlines
+SYMBOL_ALIASES = {
+    'apple': 'AAPL', 'microsoft': 'MSFT', 'tesla': 'TSLA', 'nvidia': 'NVDA', 'google': 'GOOGL',
+    'alphabet': 'GOOGL', 'amazon': 'AMZN', 'meta': 'META', 'facebook': 'META', 'jpmorgan': 'JPM',
+    'johnson & johnson': 'JNJ', 'visa': 'V', 'netflix': 'NFLX', 'ibm': 'IBM', 'intel': 'INTC', 'amd': 'AMD'
+}
+_ALIAS_PATTERN = re.compile(r'\b(' + '|'.join(re.escape(name) for name in sorted(SYMBOL_ALIASES, key=len, reverse=True)) + r')\b')
+_TICKER_PATTERN = re.compile(r'(?:\$|\()([A-Z]{1,5})\)?')
+_TOKEN_PATTERN = re.compile(r"[a-z']+")
+
+
+def score_text(text):
+    """Lexicon score in [-1, 1]; a negation flips the next sentiment word"""
+    total = 0.0
+    hits = 0
+    negate = False
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in NEGATIONS:
+            negate = True
+            continue
+        weight = LEXICON.get(token)
+        if weight is not None:
+            total += -weight if negate else weight
+            hits += 1
+        negate = False
+    return max(-1.0, min(1.0, total / hits)) if hits else 0.0
+
+
+def score_batch(texts):
+    return [score_text(text) for text in texts]
+
+
+def extract_symbols(text):
+    """Tickers mentioned by company name, $TICKER or (TICKER)"""
+    symbols = {SYMBOL_ALIASES[name] for name in _ALIAS_PATTERN.findall(text.lower())}
+    symbols.update(_TICKER_PATTERN.findall(text))
+    return symbols
+
+
+def label(score):
+    """Map a [0, 1] score to the positive/neutral/negative labels used across the app"""
+    if score >= 0.55:
+        return 'positive'
+    if score <= 0.45:
+        return 'negative'
+    return 'neutral'
+
+
+def article_key(article):
+    """Dedupe key: the URL when there is a real one, otherwise the normalized title"""
+    url = article.get('url') or ''
+    basis = url if url not in ('', '#') else ' '.join(article.get('title', '').lower().split())
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+
+class RollingSentiment:
+    """Mean of the last `window` headline scores for one symbol, updated in O(1)"""
+
+    __slots__ = ('scores', 'total', 'updated_at')
+
+    def __init__(self, window):
+        self.scores = deque(maxlen=window)
+        self.total = 0.0
+        self.updated_at = None
+
+    def add(self, score):
+        if len(self.scores) == self.scores.maxlen:
+            self.total -= self.scores[0]
+        self.scores.append(score)
+        self.total += score
+        self.updated_at = time.time()
+
+    def mean(self):
+        return self.total / len(self.scores) if self.scores else 0.0
+
+
+class NewsIngestor:
+    """Pulls headlines on a schedule, scores new ones and maintains per-symbol sentiment"""
+
+    def __init__(self, fetch=None, interval=600, window=20, max_articles=200, max_seen=5000):
+        self.fetch = fetch
+        self.interval = interval
+        self.window = window
+        self.articles = deque(maxlen=max_articles)  # newest first
+        self.ingested = 0
+        self.duplicates = 0
+        self.refreshes = 0
+        self.refreshed_at = None
+        self.failures = 0
+        self.last_error = None
+        self._max_seen = max_seen
+        self._seen = OrderedDict()
+        self._index = {}  # symbol -> RollingSentiment
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def ingest(self, articles):
+        """Score and index articles not seen before; returns how many were new"""
+        fresh = []
+        with self._lock:
+            for article in articles:
+                key = article_key(article)
+                if key in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen[key] = True
+                if len(self._seen) > self._max_seen:
+                    self._seen.popitem(last=False)
+                fresh.append(article)
+
+        if not fresh:
+            return 0
+
+        scores = score_batch([f"{article.get('title', '')}. {article.get('description') or ''}" for article in fresh])
+        with self._lock:
+            scored = []
+            for article, score in zip(fresh, scores):
+                symbols = extract_symbols(f"{article.get('title', '')} {article.get('description') or ''}")
+                scored.append(dict(article, score=round((score + 1) / 2, 2), sentiment=label((score + 1) / 2), symbols=sorted(symbols)))
+                for symbol in symbols:
+                    self._index.setdefault(symbol, RollingSentiment(self.window)).add(score)
+            # Batches arrive newest first; prepend the batch keeping that order
+            self.articles.extendleft(reversed(scored))
+            self.ingested += len(fresh)
+        return len(fresh)
+
+    def refresh(self):
+        with self._refresh_lock:
+            try:
+                self.ingest(self.fetch())
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                return False
+            self.refreshes += 1
+            self.refreshed_at = time.time()
+            return True
+
+    def sentiment(self, symbol):
+        """O(1) lookup of a symbol's rolling news sentiment; neutral until headlines mention it"""
+        entry = self._index.get(symbol.upper())
+        if entry is None or not entry.scores:
+            return {'sentiment': 'neutral', 'score': 0.5, 'articles': 0}
+        score = round((entry.mean() + 1) / 2, 2)
+        return {'sentiment': label(score), 'score': score, 'articles': len(entry.scores)}
+
+    def latest(self, limit=10):
+        """Most recent articles; empty until the background thread's first refresh"""
+        with self._lock:
+            return list(self.articles)[:limit]
+
+    def start(self, fetch=None):
+        """Start the refresh thread; fetch() returns a newest-first list of headlines"""
+        with self._lock:
+            if fetch is not None:
+                self.fetch = fetch
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='news-ingestor', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'interval': self.interval,
+                'articles': len(self.articles),
+                'symbols': len(self._index),
+                'ingested': self.ingested,
+                'duplicates': self.duplicates,
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'last_error': self.last_error
+            }
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from config import Config
+
+
+def latest_trading_day(today=None):
+    """Most recent weekday on or before today (exchange holidays are not tracked)"""
+    day = today or date.today()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+class OHLCVStore:
+    """Daily OHLCV bars persisted in SQLite, one row per (symbol, date)"""
+
+    def __init__(self, path, refresh_seconds=3600):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL NOT NULL,
+                volume INTEGER,
+                PRIMARY KEY (symbol, date)
+            ) WITHOUT ROWID''')
+            conn.execute('CREATE TABLE IF NOT EXISTS symbols (symbol TEXT PRIMARY KEY, last_fetched REAL)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def last_date(self, symbol):
+        row = self._conn().execute('SELECT MAX(date) FROM bars WHERE symbol = ?', (symbol,)).fetchone()
+        return row[0]
+
+    def needs_refresh(self, symbol):
+        """True when bars newer than the last stored date may exist upstream.
+
+        A symbol the provider returned no bars for is not asked again until
+        refresh_seconds have passed.
+        """
+        last = self.last_date(symbol)
+        if last is not None and last >= latest_trading_day():
+            return False
+        row = self._conn().execute('SELECT last_fetched FROM symbols WHERE symbol = ?', (symbol,)).fetchone()
+        return row is None or time.time() - row[0] > self.refresh_seconds
+
+    def mark_fetched(self, symbol):
+        """Record a fetch attempt that returned no bars"""
+        with self._conn() as conn:
+            conn.execute('INSERT OR REPLACE INTO symbols VALUES (?, ?)', (symbol, time.time()))
+
+    def append(self, symbol, bars):
+        """Store bars given as (date, open, high, low, close, volume) tuples"""
+        with self._conn() as conn:
+            conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             [(symbol,) + tuple(bar) for bar in bars])
+            conn.execute('INSERT OR REPLACE INTO symbols VALUES (?, ?)', (symbol, time.time()))
+
+    def read(self, symbol, days):
+        """Return the latest `days` bars as (date, close, volume), oldest first"""
+        rows = self._conn().execute(
+            'SELECT date, close, volume FROM bars WHERE symbol = ? ORDER BY date DESC LIMIT ?',
+            (symbol, days)
+        ).fetchall()
+        rows.reverse()
+        return rows
+
+
+ohlcv_store = OHLCVStore(Config.OHLCV_DB_PATH, refresh_seconds=Config.OHLCV_REFRESH_SECONDS)
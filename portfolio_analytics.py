@@ -0,0 +1,90 @@
+import numpy as np
+
+from indicators import TRADING_DAYS
+from timeseries import to_iso_dates
+
+
+def align_prices(histories, symbols):
+    """Aligned close matrix (dates x symbols) from {symbol: PriceSeries}.
+
+    Gaps are forward-filled and dates before every symbol has a price are
+    dropped, so each row is a full cross-section of the portfolio.
+    """
+    days = np.unique(np.concatenate([histories[symbol].dates for symbol in symbols]))
+    prices = np.full((len(days), len(symbols)), np.nan)
+    for column, symbol in enumerate(symbols):
+        series = histories[symbol]
+        prices[np.searchsorted(days, series.dates), column] = series.close
+
+    # Forward fill: index of the last observed row for every cell
+    observed = np.where(np.isnan(prices), 0, np.arange(len(days))[:, None])
+    np.maximum.accumulate(observed, axis=0, out=observed)
+    prices = prices[observed, np.arange(len(symbols))]
+
+    complete = ~np.isnan(prices).any(axis=1)
+    return to_iso_dates(days[complete]), prices[complete]
+
+
+def max_drawdown(values):
+    """Largest peak-to-trough decline as a (negative) fraction"""
+    if not len(values):
+        return 0.0
+    return float(np.min(values / np.maximum.accumulate(values) - 1.0))
+
+
+def compute_analytics(dates, symbols, prices, shares, benchmark, confidence=0.95):
+    """Risk and return analytics for holding `shares` over the aligned price matrix.
+
+    There is no transaction history, so returns are those of the current
+    holdings over the lookback window; with no cash flows the time-weighted
+    return is the chained product of the daily returns. `benchmark` is the
+    benchmark's close aligned to `dates` (or None).
+    """
+    shares = np.asarray(shares, dtype=np.float64)
+    values = prices @ shares
+    if len(values) < 2 or values[0] <= 0:
+        return None
+
+    returns = values[1:] / values[:-1] - 1.0
+    asset_returns = prices[1:] / prices[:-1] - 1.0
+    weights = prices[-1] * shares / values[-1]
+
+    beta = None
+    if benchmark is not None:
+        benchmark_returns = benchmark[1:] / benchmark[:-1] - 1.0
+        benchmark_variance = np.var(benchmark_returns, ddof=1) if len(returns) > 1 else 0.0
+        if benchmark_variance > 0:
+            beta = float(np.cov(returns, benchmark_returns)[0, 1] / benchmark_variance)
+
+    # Historical VaR: the loss not exceeded on `confidence` of observed days
+    var_fraction = max(-float(np.percentile(returns, (1 - confidence) * 100)), 0.0)
+    tail = returns[returns <= -var_fraction]
+    cvar_fraction = max(-float(tail.mean()), 0.0) if len(tail) else var_fraction
+
+    if len(symbols) > 1 and len(asset_returns) > 1:
+        correlation = np.nan_to_num(np.corrcoef(asset_returns, rowvar=False))
+    else:
+        correlation = np.ones((len(symbols), len(symbols)))
+
+    return {
+        'start_date': dates[0],
+        'end_date': dates[-1],
+        'days': len(dates),
+        'value': round(float(values[-1]), 2),
+        'time_weighted_return': round(float(np.prod(1.0 + returns) - 1.0), 6),
+        'volatility': round(float(np.std(returns, ddof=1) * np.sqrt(TRADING_DAYS)), 6) if len(returns) > 1 else 0.0,
+        'beta': round(beta, 4) if beta is not None else None,
+        'max_drawdown': round(max_drawdown(values), 6),
+        'var': {
+            'confidence': confidence,
+            'horizon_days': 1,
+            'fraction': round(var_fraction, 6),
+            'amount': round(var_fraction * float(values[-1]), 2),
+            'cvar_amount': round(cvar_fraction * float(values[-1]), 2)
+        },
+        'weights': {symbol: round(float(weight), 6) for symbol, weight in zip(symbols, weights)},
+        'correlation': {
+            'symbols': list(symbols),
+            'matrix': np.round(correlation, 4).tolist()
+        }
+    }
@@ -0,0 +1,68 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import Config
+
+
+class ProfileStore:
+    """Company profiles persisted in SQLite with a long TTL"""
+
+    def __init__(self, path, ttl=7 * 86400):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS profiles (
+                symbol TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )''')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def get(self, symbol):
+        """Return (profile, is_fresh), or (None, False) if the symbol was never stored"""
+        row = self._conn().execute('SELECT data, fetched_at FROM profiles WHERE symbol = ?', (symbol,)).fetchone()
+        if row is None:
+            return None, False
+        return json.loads(row[0]), time.time() - row[1] <= self.ttl
+
+    def put(self, symbol, profile):
+        with self._conn() as conn:
+            conn.execute('INSERT OR REPLACE INTO profiles VALUES (?, ?, ?)', (symbol, json.dumps(profile), time.time()))
+
+    def is_fresh(self, symbol):
+        return self.get(symbol)[1]
+
+    def stats(self):
+        total, fresh = self._conn().execute(
+            'SELECT COUNT(*), SUM(fetched_at >= ?) FROM profiles', (time.time() - self.ttl,)
+        ).fetchone()
+        return {
+            'profiles': total,
+            'fresh': fresh or 0,
+            'ttl': self.ttl
+        }
+
+
+def read_universe(path):
+    """Symbols from a universe file: one or more per line, comma or space separated, # comments"""
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            symbols += [symbol.strip().upper() for symbol in line.replace(',', ' ').split() if symbol.strip()]
+    return list(dict.fromkeys(symbols))
+
+
+profile_store = ProfileStore(Config.PROFILE_DB_PATH, ttl=Config.PROFILE_TTL)
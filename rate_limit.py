@@ -0,0 +1,209 @@
+import asyncio
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+
+from config import Config
+from http_client import LatencyHistogram
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_NORMAL: 'normal',
+    PRIORITY_BACKGROUND: 'background'
+}
+
+
+class RateLimited(Exception):
+    """Raised when an upstream call is refused by the rate limiter or the provider"""
+
+
+class TokenBucket:
+    """In-process token bucket refilled continuously at rate tokens/second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self):
+        """Take one token if available. Returns (taken, seconds until next token)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True, 0
+            return False, (1 - self._tokens) / self.rate
+
+    def drain(self):
+        with self._lock:
+            self._tokens = 0
+            self._updated = time.monotonic()
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state lives in a SQLite file so several processes share one quota"""
+
+    def __init__(self, rate, capacity, path, name='default'):
+        self.rate = rate
+        self.capacity = capacity
+        self.path = path
+        self.name = name
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+            conn.execute('INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)', (name, capacity, time.time()))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _update(self, take):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            tokens, updated = conn.execute('SELECT tokens, updated FROM buckets WHERE name = ?', (self.name,)).fetchone()
+            now = time.time()
+            tokens = min(self.capacity, tokens + max(now - updated, 0) * self.rate)
+            taken = take(tokens)
+            if taken:
+                tokens -= 1
+            elif taken is None:
+                tokens = 0
+            conn.execute('UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?', (tokens, now, self.name))
+            conn.execute('COMMIT')
+            return taken, tokens
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def try_take(self):
+        taken, tokens = self._update(lambda tokens: tokens >= 1)
+        return (True, 0) if taken else (False, (1 - tokens) / self.rate)
+
+    def drain(self):
+        self._update(lambda tokens: None)
+
+
+class PriorityRateLimiter:
+    """Hands out bucket tokens to waiting callers in priority order"""
+
+    ASYNC_POLL_INTERVAL = 0.05
+
+    def __init__(self, bucket, max_wait=10):
+        self.bucket = bucket
+        self.max_wait = max_wait
+        self._waiters = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._wait_times = {name: LatencyHistogram() for name in PRIORITY_NAMES.values()}
+        self.granted = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    def acquire(self, priority=PRIORITY_NORMAL, timeout=None):
+        """Block until a token is granted or timeout (default max_wait) expires.
+
+        Returns False when no token could be obtained in time.
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        entry = (priority, next(self._counter))
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    retry_in = timeout
+                    if self._waiters[0] == entry:
+                        taken, retry_in = self.bucket.try_take()
+                        if taken:
+                            self.granted += 1
+                            return True
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._cond.wait(min(retry_in, remaining))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._wait_times[PRIORITY_NAMES.get(priority, 'normal')].observe(time.monotonic() - started)
+                self._cond.notify_all()
+
+    async def acquire_async(self, priority=PRIORITY_NORMAL, timeout=None):
+        """acquire() for asyncio callers: same priority queue, but waits with asyncio.sleep"""
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        entry = (priority, next(self._counter))
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                # Thread waiters are woken by the condition; async waiters poll
+                retry_in = self.ASYNC_POLL_INTERVAL
+                with self._cond:
+                    if self._waiters[0] == entry:
+                        taken, retry_in = self.bucket.try_take()
+                        if taken:
+                            self.granted += 1
+                            return True
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._cond:
+                        self.rejected += 1
+                    return False
+                await asyncio.sleep(min(retry_in, remaining, self.ASYNC_POLL_INTERVAL))
+        finally:
+            with self._cond:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._wait_times[PRIORITY_NAMES.get(priority, 'normal')].observe(time.monotonic() - started)
+                self._cond.notify_all()
+
+    def drain(self):
+        """Empty the bucket after the provider reports its quota is exhausted"""
+        self.bucket.drain()
+        with self._cond:
+            self.throttled += 1
+
+    def stats(self):
+        with self._cond:
+            depth = {}
+            for priority, _ in self._waiters:
+                name = PRIORITY_NAMES.get(priority, 'normal')
+                depth[name] = depth.get(name, 0) + 1
+            return {
+                'queue_depth': len(self._waiters),
+                'queue_depth_by_priority': depth,
+                'granted': self.granted,
+                'rejected': self.rejected,
+                'provider_throttled': self.throttled,
+                'wait_seconds': {name: histogram.snapshot() for name, histogram in self._wait_times.items()}
+            }
+
+
+def _alpha_vantage_bucket():
+    rate = Config.ALPHA_VANTAGE_CALLS_PER_MINUTE / 60.0
+    capacity = Config.ALPHA_VANTAGE_BURST
+    if Config.RATE_LIMIT_STATE_PATH:
+        return SQLiteTokenBucket(rate, capacity, Config.RATE_LIMIT_STATE_PATH, name='alphavantage')
+    return TokenBucket(rate, capacity)
+
+
+alpha_vantage_limiter = PriorityRateLimiter(_alpha_vantage_bucket(), max_wait=Config.RATE_LIMIT_MAX_WAIT)
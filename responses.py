@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import time
+from functools import wraps
+
+from flask import g, make_response
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'text/javascript', 'application/javascript'}
+ENCODINGS = ('br', 'gzip')
+
+
+def payload_etag(body):
+    """Strong ETag for a response body"""
+    return hashlib.sha1(body).hexdigest()
+
+
+def choose_encoding(accept_encodings):
+    """Best Content-Encoding the client accepts, or None"""
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.GZIP_LEVEL)
+
+
+def _not_modified(if_none_match, etag):
+    """Whether If-None-Match names any encoding of the payload with this ETag"""
+    if if_none_match.star_tag:
+        return True
+    return any(if_none_match.contains(tag) for tag in [etag] + [f'{etag}-{encoding}' for encoding in ENCODINGS])
+
+
+def finalize(response, body, request):
+    """Strong ETag, If-None-Match handling and compression for a buffered 200 response.
+
+    The ETag is the payload hash (or one the route already set, e.g. a
+    snapshot's) suffixed with the content encoding, so each representation
+    has its own strong validator. Works on Flask and Quart responses.
+    """
+    if response.status_code != 200 or response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+
+    if request.path.startswith('/api/') and 'Cache-Control' not in response.headers:
+        # User-specific data: browsers may keep it but must revalidate
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+
+    encoding = response.content_encoding
+    if encoding is None and len(body) >= Config.COMPRESS_MIN_BYTES:
+        encoding = choose_encoding(request.accept_encodings)
+
+    etag = response.get_etag()[0] or payload_etag(body)
+    response.set_etag(f'{etag}-{encoding}' if encoding else etag)
+
+    if request.method in ('GET', 'HEAD') and _not_modified(request.if_none_match, etag):
+        response.status_code = 304
+        response.set_data(b'')
+        response.headers.pop('Content-Encoding', None)
+        response.headers.pop('Content-Type', None)
+        return response
+
+    if response.content_encoding is None and encoding is not None:
+        response.set_data(compress(body, encoding))
+        response.content_encoding = encoding
+    return response
+
+
+def cache_for(max_age, public=True):
+    """Route decorator: Cache-Control max-age for successful responses.
+
+    max_age is seconds or a callable returning them, e.g. the time until the
+    data behind the route is next refreshed. A response to a request that
+    touched per-user state (app.current_uid sets g.uid, and may set the
+    session cookie) is never public, so shared caches can't hand one
+    visitor's cookie or data to another.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                seconds = max(int(max_age() if callable(max_age) else max_age), 0)
+                shared = public and 'uid' not in g
+                response.cache_control.max_age = seconds
+                response.cache_control.public = shared
+                response.cache_control.private = not shared
+            return response
+        return wrapper
+    return decorator
+
+
+def seconds_until_refresh(refreshed_at, interval):
+    """Seconds until data refreshed at `refreshed_at` every `interval` seconds is rebuilt"""
+    if refreshed_at is None:
+        return 0
+    return refreshed_at + interval - time.time()
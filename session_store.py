@@ -0,0 +1,384 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+# New users start with the same state the cookie session used to seed
+DEFAULT_WATCHLIST = ['AAPL', 'MSFT', 'NVDA', 'TSLA', 'GOOGL', 'AMZN', 'META', 'JPM', 'JNJ', 'V']
+DEFAULT_PORTFOLIO = {
+    'AAPL': {'shares': 10, 'avg_price': 150.25},
+    'MSFT': {'shares': 5, 'avg_price': 280.50},
+    'NVDA': {'shares': 8, 'avg_price': 420.75},
+    'V': {'shares': 15, 'avg_price': 210.30}
+}
+
+# Users already known to exist are remembered to skip the INSERT; the set is reset when full
+KNOWN_USERS_MAX = 10000
+
+ALERT_FIELDS = ('symbol', 'target_price', 'alert_type', 'created_at', 'triggered', 'triggered_at', 'triggered_price', 'notified')
+
+
+class SessionStore(ABC):
+    """Per-user watchlist, portfolio, alerts and preferences kept server-side"""
+
+    @abstractmethod
+    def ensure_user(self, uid):
+        """Create the user with default state if they don't exist yet"""
+
+    @abstractmethod
+    def get_watchlist(self, uid):
+        ...
+
+    @abstractmethod
+    def add_to_watchlist(self, uid, symbol, limit):
+        ...
+
+    @abstractmethod
+    def remove_from_watchlist(self, uid, symbol):
+        ...
+
+    @abstractmethod
+    def get_portfolio(self, uid):
+        ...
+
+    @abstractmethod
+    def set_holding(self, uid, symbol, shares, avg_price):
+        ...
+
+    @abstractmethod
+    def remove_holding(self, uid, symbol):
+        ...
+
+    @abstractmethod
+    def get_alerts(self, uid):
+        ...
+
+    @abstractmethod
+    def add_alert(self, uid, alert):
+        """Store a new alert and return it with its id"""
+
+    @abstractmethod
+    def update_alert(self, uid, alert_id, **fields):
+        ...
+
+    @abstractmethod
+    def get_active_alerts(self, after_id=0):
+        """Return (uid, alert) for every untriggered alert with id > after_id, across all users"""
+
+    @abstractmethod
+    def trigger_alert(self, uid, alert_id, triggered_at, triggered_price):
+        """Mark an alert triggered; returns False if it already was"""
+
+    @abstractmethod
+    def acknowledge_alerts(self, uid, alert_ids):
+        """Mark triggered alerts as reported to the user"""
+
+    @abstractmethod
+    def get_pref(self, uid, key, default=None):
+        ...
+
+    @abstractmethod
+    def set_pref(self, uid, key, value):
+        ...
+
+    @abstractmethod
+    def import_session(self, uid, watchlist=None, portfolio=None, alerts=None):
+        """Migrate state from a legacy cookie session, replacing the defaults"""
+
+
+class MemorySessionStore(SessionStore):
+    """Dict-backed store for tests and single-process development"""
+
+    def __init__(self):
+        self._users = {}
+        self._next_alert_id = 1
+        self._lock = threading.Lock()
+
+    def _user(self, uid):
+        user = self._users.get(uid)
+        if user is None:
+            user = self._users[uid] = {
+                'watchlist': list(DEFAULT_WATCHLIST),
+                'portfolio': {symbol: dict(holding) for symbol, holding in DEFAULT_PORTFOLIO.items()},
+                'alerts': [],
+                'prefs': {}
+            }
+        return user
+
+    def ensure_user(self, uid):
+        with self._lock:
+            self._user(uid)
+
+    def get_watchlist(self, uid):
+        with self._lock:
+            return list(self._user(uid)['watchlist'])
+
+    def add_to_watchlist(self, uid, symbol, limit):
+        with self._lock:
+            watchlist = self._user(uid)['watchlist']
+            if symbol in watchlist or len(watchlist) >= limit:
+                return False
+            watchlist.append(symbol)
+            return True
+
+    def remove_from_watchlist(self, uid, symbol):
+        with self._lock:
+            watchlist = self._user(uid)['watchlist']
+            if symbol in watchlist:
+                watchlist.remove(symbol)
+
+    def get_portfolio(self, uid):
+        with self._lock:
+            return {symbol: dict(holding) for symbol, holding in self._user(uid)['portfolio'].items()}
+
+    def set_holding(self, uid, symbol, shares, avg_price):
+        with self._lock:
+            self._user(uid)['portfolio'][symbol] = {'shares': shares, 'avg_price': avg_price}
+
+    def remove_holding(self, uid, symbol):
+        with self._lock:
+            self._user(uid)['portfolio'].pop(symbol, None)
+
+    def get_alerts(self, uid):
+        with self._lock:
+            return [dict(alert) for alert in self._user(uid)['alerts']]
+
+    def add_alert(self, uid, alert):
+        with self._lock:
+            alert = dict({field: alert.get(field) for field in ALERT_FIELDS}, id=self._next_alert_id,
+                         triggered=bool(alert.get('triggered')), notified=bool(alert.get('notified')))
+            self._next_alert_id += 1
+            self._user(uid)['alerts'].append(alert)
+            return dict(alert)
+
+    def update_alert(self, uid, alert_id, **fields):
+        with self._lock:
+            for alert in self._user(uid)['alerts']:
+                if alert['id'] == alert_id:
+                    alert.update(fields)
+
+    def get_active_alerts(self, after_id=0):
+        with self._lock:
+            return [
+                (uid, dict(alert))
+                for uid, user in self._users.items()
+                for alert in user['alerts']
+                if not alert['triggered'] and alert['id'] > after_id
+            ]
+
+    def trigger_alert(self, uid, alert_id, triggered_at, triggered_price):
+        with self._lock:
+            for alert in self._user(uid)['alerts']:
+                if alert['id'] == alert_id and not alert['triggered']:
+                    alert.update(triggered=True, triggered_at=triggered_at, triggered_price=triggered_price)
+                    return True
+            return False
+
+    def acknowledge_alerts(self, uid, alert_ids):
+        with self._lock:
+            for alert in self._user(uid)['alerts']:
+                if alert['id'] in alert_ids:
+                    alert['notified'] = True
+
+    def get_pref(self, uid, key, default=None):
+        with self._lock:
+            return self._user(uid)['prefs'].get(key, default)
+
+    def set_pref(self, uid, key, value):
+        with self._lock:
+            self._user(uid)['prefs'][key] = value
+
+    def import_session(self, uid, watchlist=None, portfolio=None, alerts=None):
+        with self._lock:
+            user = self._user(uid)
+            if watchlist is not None:
+                user['watchlist'] = list(watchlist)
+            if portfolio is not None:
+                user['portfolio'] = {symbol: dict(holding) for symbol, holding in portfolio.items()}
+        for alert in alerts or []:
+            self.add_alert(uid, alert)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store; every mutation touches only the affected rows"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._known_users = set()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS users (uid TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    uid TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    UNIQUE (uid, symbol)
+                );
+                CREATE TABLE IF NOT EXISTS holdings (
+                    uid TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    shares REAL NOT NULL,
+                    avg_price REAL NOT NULL,
+                    UNIQUE (uid, symbol)
+                );
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    uid TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    target_price REAL NOT NULL,
+                    alert_type TEXT,
+                    created_at TEXT,
+                    triggered INTEGER NOT NULL DEFAULT 0,
+                    triggered_at TEXT,
+                    triggered_price REAL,
+                    notified INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS alerts_uid ON alerts (uid);
+                CREATE INDEX IF NOT EXISTS alerts_active ON alerts (triggered, id);
+                CREATE TABLE IF NOT EXISTS prefs (
+                    uid TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (uid, key)
+                );
+            ''')
+            # Stores created before alerts were evaluated in the background lack this column
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(alerts)')]
+            if 'notified' not in columns:
+                conn.execute('ALTER TABLE alerts ADD COLUMN notified INTEGER NOT NULL DEFAULT 0')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def ensure_user(self, uid):
+        if uid in self._known_users:
+            return
+        if len(self._known_users) >= KNOWN_USERS_MAX:
+            self._known_users.clear()
+        with self._conn() as conn:
+            created = conn.execute('INSERT OR IGNORE INTO users VALUES (?)', (uid,)).rowcount
+            if created:
+                conn.executemany('INSERT OR IGNORE INTO watchlist VALUES (?, ?)', [(uid, symbol) for symbol in DEFAULT_WATCHLIST])
+                conn.executemany('INSERT OR IGNORE INTO holdings VALUES (?, ?, ?, ?)',
+                                 [(uid, symbol, h['shares'], h['avg_price']) for symbol, h in DEFAULT_PORTFOLIO.items()])
+        self._known_users.add(uid)
+
+    def get_watchlist(self, uid):
+        rows = self._conn().execute('SELECT symbol FROM watchlist WHERE uid = ? ORDER BY rowid', (uid,)).fetchall()
+        return [symbol for symbol, in rows]
+
+    def add_to_watchlist(self, uid, symbol, limit):
+        with self._conn() as conn:
+            count, = conn.execute('SELECT COUNT(*) FROM watchlist WHERE uid = ?', (uid,)).fetchone()
+            if count >= limit:
+                return False
+            return conn.execute('INSERT OR IGNORE INTO watchlist VALUES (?, ?)', (uid, symbol)).rowcount > 0
+
+    def remove_from_watchlist(self, uid, symbol):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM watchlist WHERE uid = ? AND symbol = ?', (uid, symbol))
+
+    def get_portfolio(self, uid):
+        rows = self._conn().execute('SELECT symbol, shares, avg_price FROM holdings WHERE uid = ? ORDER BY rowid', (uid,)).fetchall()
+        return {symbol: {'shares': _number(shares), 'avg_price': avg_price} for symbol, shares, avg_price in rows}
+
+    def set_holding(self, uid, symbol, shares, avg_price):
+        with self._conn() as conn:
+            conn.execute('''INSERT INTO holdings VALUES (?, ?, ?, ?)
+                            ON CONFLICT (uid, symbol) DO UPDATE SET shares = excluded.shares, avg_price = excluded.avg_price''',
+                         (uid, symbol, shares, avg_price))
+
+    def remove_holding(self, uid, symbol):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM holdings WHERE uid = ? AND symbol = ?', (uid, symbol))
+
+    def get_alerts(self, uid):
+        rows = self._conn().execute(
+            f'SELECT id, {", ".join(ALERT_FIELDS)} FROM alerts WHERE uid = ? ORDER BY id', (uid,)
+        ).fetchall()
+        return [_alert_from_row(row) for row in rows]
+
+    def add_alert(self, uid, alert):
+        values = [alert.get(field) for field in ALERT_FIELDS]
+        values[ALERT_FIELDS.index('triggered')] = int(bool(alert.get('triggered')))
+        values[ALERT_FIELDS.index('notified')] = int(bool(alert.get('notified')))
+        with self._conn() as conn:
+            cursor = conn.execute(
+                f'INSERT INTO alerts (uid, {", ".join(ALERT_FIELDS)}) VALUES (?, {", ".join("?" * len(ALERT_FIELDS))})',
+                [uid] + values
+            )
+        return dict({field: alert.get(field) for field in ALERT_FIELDS}, id=cursor.lastrowid,
+                    triggered=bool(alert.get('triggered')), notified=bool(alert.get('notified')))
+
+    def update_alert(self, uid, alert_id, **fields):
+        fields = {field: value for field, value in fields.items() if field in ALERT_FIELDS}
+        if not fields:
+            return
+        assignments = ', '.join(f'{field} = ?' for field in fields)
+        with self._conn() as conn:
+            conn.execute(f'UPDATE alerts SET {assignments} WHERE uid = ? AND id = ?', list(fields.values()) + [uid, alert_id])
+
+    def get_active_alerts(self, after_id=0):
+        rows = self._conn().execute(
+            f'SELECT uid, id, {", ".join(ALERT_FIELDS)} FROM alerts WHERE triggered = 0 AND id > ? ORDER BY id', (after_id,)
+        ).fetchall()
+        return [(row[0], _alert_from_row(row[1:])) for row in rows]
+
+    def trigger_alert(self, uid, alert_id, triggered_at, triggered_price):
+        with self._conn() as conn:
+            return conn.execute(
+                'UPDATE alerts SET triggered = 1, triggered_at = ?, triggered_price = ? WHERE uid = ? AND id = ? AND triggered = 0',
+                (triggered_at, triggered_price, uid, alert_id)
+            ).rowcount > 0
+
+    def acknowledge_alerts(self, uid, alert_ids):
+        with self._conn() as conn:
+            conn.executemany('UPDATE alerts SET notified = 1 WHERE uid = ? AND id = ?', [(uid, alert_id) for alert_id in alert_ids])
+
+    def get_pref(self, uid, key, default=None):
+        row = self._conn().execute('SELECT value FROM prefs WHERE uid = ? AND key = ?', (uid, key)).fetchone()
+        return row[0] if row else default
+
+    def set_pref(self, uid, key, value):
+        with self._conn() as conn:
+            conn.execute('INSERT OR REPLACE INTO prefs VALUES (?, ?, ?)', (uid, key, value))
+
+    def import_session(self, uid, watchlist=None, portfolio=None, alerts=None):
+        self.ensure_user(uid)
+        with self._conn() as conn:
+            if watchlist is not None:
+                conn.execute('DELETE FROM watchlist WHERE uid = ?', (uid,))
+                conn.executemany('INSERT OR IGNORE INTO watchlist VALUES (?, ?)', [(uid, symbol) for symbol in watchlist])
+            if portfolio is not None:
+                conn.execute('DELETE FROM holdings WHERE uid = ?', (uid,))
+                conn.executemany('INSERT OR IGNORE INTO holdings VALUES (?, ?, ?, ?)',
+                                 [(uid, symbol, h['shares'], h['avg_price']) for symbol, h in portfolio.items()])
+        for alert in alerts or []:
+            self.add_alert(uid, alert)
+
+
+def _number(value):
+    return int(value) if float(value).is_integer() else value
+
+
+def _alert_from_row(row):
+    alert = dict(zip(('id',) + ALERT_FIELDS, row))
+    alert['triggered'] = bool(alert['triggered'])
+    alert['notified'] = bool(alert['notified'])
+    return alert
+
+
+def create_session_store(kind, path):
+    """Build the store named by SESSION_TYPE ('sqlite' or 'memory')"""
+    if kind == 'memory':
+        return MemorySessionStore()
+    if kind == 'sqlite':
+        return SQLiteSessionStore(path)
+    raise ValueError(f'Unsupported SESSION_TYPE: {kind}')
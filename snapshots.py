@@ -0,0 +1,88 @@
+import hashlib
+import json
+import threading
+import time
+
+from responses import compress
+
+
+class Snapshot:
+    """A pre-serialized JSON payload with its ETag"""
+
+    __slots__ = ('data', 'body', 'etag', 'built_at', '_encoded')
+
+    def __init__(self, data):
+        self.data = data
+        self.body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.built_at = time.time()
+        self._encoded = {}
+
+    def encoded(self, encoding):
+        """The body compressed with encoding (None for identity), compressed once per snapshot"""
+        if encoding is None:
+            return self.body
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+
+class SnapshotRefresher:
+    """Rebuilds a snapshot on a background thread so readers never wait on upstream I/O"""
+
+    def __init__(self, name, build, interval=60, on_refresh=None):
+        self.name = name
+        self.build = build
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.current = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'snapshot-{self.name}', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self):
+        """Build a new snapshot now, keeping the previous one if the build fails"""
+        try:
+            snapshot = Snapshot(self.build())
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            return None
+        self.current = snapshot
+        self.refreshes += 1
+        if self.on_refresh is not None:
+            try:
+                self.on_refresh(snapshot.data)
+            except Exception:
+                pass
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stats(self):
+        current = self.current
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'etag': current.etag if current else None,
+            'age': round(time.time() - current.built_at, 3) if current else None
+        }
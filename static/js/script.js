@@ -1,8 +1,10 @@
 // API Configuration
 const API_ENDPOINTS = {
     stock: '/api/stock/',
+    quotes: '/api/quotes',
     crypto: '/api/crypto/',
     analyze: '/api/analyze',
+    analyzeBatch: '/api/analyze/batch',
     news: '/api/news',
     earnings: '/api/earnings',
     watchlist: '/api/watchlist',
@@ -12,8 +14,10 @@ const API_ENDPOINTS = {
     portfolioAdd: '/api/portfolio/add',
     portfolioRemove: '/api/portfolio/remove/',
     marketOverview: '/api/market/overview',
+    marketSentiment: '/api/market/sentiment',
     chat: '/api/chat',
-    alerts: '/api/alerts'
+    alerts: '/api/alerts',
+    stream: '/api/stream'
 };
 
 // Global variables
@@ -24,6 +28,8 @@ let technicalChart = null;
 let marketData = {};
 let watchlistData = [];
 let portfolioData = [];
+let priceStream = null;
+let priceStreamSymbols = null;
 
 // Initialize application
 document.addEventListener('DOMContentLoaded', function() {
@@ -106,14 +112,24 @@ function setupEventListeners() {
 
 // Real-time updates
 function startRealTimeUpdates() {
-    // Update market data every 30 seconds
+    const streaming = !!window.EventSource;
+    
+    // Update market data every 30 seconds; watchlist and portfolio prices
+    // arrive over the price stream when the browser supports it
     setInterval(() => {
-        updatePortfolioMetrics();
         loadMarketOverview();
         loadCryptoOverview();
-        loadWatchlist();
-        loadPortfolio();
+        if (!streaming) {
+            updatePortfolioMetrics();
+            loadWatchlist();
+            loadPortfolio();
+        }
     }, 30000);
+    
+    if (streaming) {
+        // Watchlist AI badges still refresh periodically
+        setInterval(loadWatchlist, 300000);
+    }
 
     // Update news every 5 minutes
     setInterval(() => {
@@ -124,16 +140,103 @@ function startRealTimeUpdates() {
     }, 300000);
 }
 
+// Subscribe to pushed quotes for every watchlist and portfolio symbol
+function refreshPriceStream() {
+    if (!window.EventSource) return;
+    
+    const symbols = Array.from(new Set(watchlistData.concat(portfolioData.map(holding => holding.symbol)))).sort().join(',');
+    if (symbols === priceStreamSymbols) return;
+    
+    if (priceStream) {
+        priceStream.close();
+        priceStream = null;
+    }
+    priceStreamSymbols = symbols;
+    
+    // Connect even without symbols so broadcast events like market sentiment still arrive
+    priceStream = new EventSource(API_ENDPOINTS.stream + '?symbols=' + encodeURIComponent(symbols));
+    priceStream.addEventListener('quote', event => applyQuoteUpdate(JSON.parse(event.data)));
+    priceStream.addEventListener('sentiment', event => renderMarketSentiment(JSON.parse(event.data)));
+}
+
+function applyQuoteUpdate(quote) {
+    // Watchlist row
+    const row = document.querySelector('#watchlistTable tr[data-symbol="' + quote.symbol + '"]');
+    if (row) {
+        const changeClass = quote.change >= 0 ? 'stock-change-positive' : 'stock-change-negative';
+        row.querySelector('.quote-price').textContent = '$' + quote.price.toFixed(2);
+        const changeCell = row.querySelector('.quote-change');
+        changeCell.className = 'quote-change ' + changeClass;
+        changeCell.textContent = (quote.change >= 0 ? '+' : '') + quote.change.toFixed(2) + ' (' + (quote.change_percent >= 0 ? '+' : '') + quote.change_percent.toFixed(2) + '%)';
+    }
+    
+    // Portfolio holdings and totals
+    const holding = portfolioData.find(item => item.symbol === quote.symbol);
+    if (holding) {
+        const cost = holding.avg_price * holding.shares;
+        holding.current_price = quote.price;
+        holding.value = quote.price * holding.shares;
+        holding.gain_loss = holding.value - cost;
+        holding.gain_loss_percent = cost > 0 ? (holding.gain_loss / cost) * 100 : 0;
+        
+        const totalValue = portfolioData.reduce((sum, item) => sum + item.value, 0);
+        const totalCost = portfolioData.reduce((sum, item) => sum + item.avg_price * item.shares, 0);
+        const summary = {
+            portfolio: portfolioData,
+            total_value: totalValue,
+            total_gain_loss: totalValue - totalCost,
+            total_gain_loss_percent: totalCost > 0 ? ((totalValue - totalCost) / totalCost) * 100 : 0
+        };
+        renderPortfolioTable(summary);
+        renderPortfolioMetrics(summary);
+    }
+}
+
+// Last ETag and payload per polled resource, so unchanged data comes back as an empty 304.
+// The default cache mode lets the browser answer from its own cache while max-age is fresh.
+const conditionalCache = new Map();
+
+async function fetchConditional(url, key = url) {
+    const cached = conditionalCache.get(key);
+    const response = await fetch(url, {
+        headers: cached ? {'If-None-Match': cached.etag} : {}
+    });
+    
+    if (response.status === 304 && cached) {
+        return {status: 200, data: cached.data, changed: false};
+    }
+    
+    const etag = response.headers.get('ETag');
+    if (response.ok && cached && etag === cached.etag) {
+        return {status: 200, data: cached.data, changed: false};
+    }
+    
+    const data = await response.json();
+    if (response.ok && etag) {
+        conditionalCache.set(key, {etag: etag, data: data});
+    }
+    return {status: response.status, data: data, changed: true};
+}
+
 async function updatePortfolioMetrics() {
     try {
-        const response = await fetch(API_ENDPOINTS.portfolio);
-        const data = await response.json();
+        const {data, changed} = await fetchConditional(API_ENDPOINTS.portfolio, 'portfolio-metrics');
         
         if (data.error) {
             console.error('Error fetching portfolio:', data.error);
             return;
         }
         
+        if (changed) {
+            renderPortfolioMetrics(data);
+        }
+    } catch (error) {
+        console.error('Error updating portfolio metrics:', error);
+    }
+}
+
+function renderPortfolioMetrics(data) {
+    try {
         document.getElementById('totalValue').textContent = '$' + data.total_value.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2});
         
         // Calculate daily change (simulated)
@@ -159,13 +262,17 @@ async function loadMarketOverview() {
     if (!container) return;
 
     try {
-        const response = await fetch(API_ENDPOINTS.marketOverview);
-        const marketData = await response.json();
+        const {status, data: marketData, changed} = await fetchConditional(API_ENDPOINTS.marketOverview);
         
         if (marketData.error) {
             container.innerHTML = '<div class="text-center py-4 text-muted">Market data temporarily unavailable</div>';
+            // The server is still building its first snapshot
+            if (status === 503) {
+                setTimeout(loadMarketOverview, 5000);
+            }
             return;
         }
+        if (!changed) return;
         
         let html = '<div class="row">';
         
@@ -284,35 +391,38 @@ async function loadWatchlist() {
         
         let html = '';
         
+        // Fetch quotes and signals for the whole watchlist in a single batch request
+        let signals = {};
+        if (watchlist.length > 0) {
+            const signalsResponse = await fetch(API_ENDPOINTS.analyzeBatch, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    symbols: watchlist,
+                    analysis_type: 'quick'
+                })
+            });
+            const signalsData = await signalsResponse.json();
+            signals = signalsData.signals || {};
+        }
+        
         for (const symbol of watchlist) {
             try {
-                const stockResponse = await fetch(API_ENDPOINTS.stock + symbol);
-                const stockData = await stockResponse.json();
+                const analysis = signals[symbol];
                 
-                if (stockData.error) {
+                if (!analysis) {
                     continue;
                 }
                 
-                // Get AI analysis for the stock
-                const analysisResponse = await fetch(API_ENDPOINTS.analyze, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        symbol: symbol,
-                        analysis_type: 'quick'
-                    })
-                });
-                
-                const analysis = await analysisResponse.json();
-                
+                const stockData = analysis.stock;
                 const changeClass = stockData.change >= 0 ? 'stock-change-positive' : 'stock-change-negative';
                 
-                html += '<tr>' +
+                html += '<tr data-symbol="' + symbol + '">' +
                     '<td><strong>' + symbol + '</strong></td>' +
-                    '<td>$' + stockData.price.toFixed(2) + '</td>' +
-                    '<td class="' + changeClass + '">' + (stockData.change >= 0 ? '+' : '') + stockData.change.toFixed(2) + ' (' + (stockData.change_percent >= 0 ? '+' : '') + stockData.change_percent.toFixed(2) + '%)</td>' +
+                    '<td class="quote-price">$' + stockData.price.toFixed(2) + '</td>' +
+                    '<td class="quote-change ' + changeClass + '">' + (stockData.change >= 0 ? '+' : '') + stockData.change.toFixed(2) + ' (' + (stockData.change_percent >= 0 ? '+' : '') + stockData.change_percent.toFixed(2) + '%)</td>' +
                     '<td><span class="badge" style="background: var(--ai-glow); color: #000;">' + analysis.analysis.confidence + '/100</span></td>' +
                     '<td><span class="badge ' + (analysis.analysis.decision === 'BUY' ? 'bg-success' : analysis.analysis.decision === 'SELL' ? 'bg-danger' : 'bg-warning') + '">' + analysis.analysis.decision + '</span></td>' +
                     '<td><span class="badge ' + (analysis.analysis.confidence > 80 ? 'bg-success' : analysis.analysis.confidence > 60 ? 'bg-warning' : 'bg-danger') + '">' + (analysis.analysis.confidence > 80 ? 'Low' : analysis.analysis.confidence > 60 ? 'Medium' : 'High') + '</span></td>' +
@@ -335,6 +445,8 @@ async function loadWatchlist() {
         }
         
         table.innerHTML = html;
+        watchlistData = watchlist;
+        refreshPriceStream();
     } catch (error) {
         console.error('Error loading watchlist:', error);
         table.innerHTML = '<tr><td colspan="7" class="text-center py-4 text-muted">Error loading watchlist</td></tr>';
@@ -346,53 +458,62 @@ async function loadPortfolio() {
     if (!table) return;
 
     try {
-        const response = await fetch(API_ENDPOINTS.portfolio);
-        const data = await response.json();
+        const {data, changed} = await fetchConditional(API_ENDPOINTS.portfolio, 'portfolio-table');
         
         if (data.error) {
             table.innerHTML = '<tr><td colspan="7" class="text-center py-4 text-muted">Error loading portfolio</td></tr>';
             return;
         }
+        if (!changed) return;
         
-        let html = '';
-        
-        for (const holding of data.portfolio) {
-            const changeClass = holding.gain_loss >= 0 ? 'stock-change-positive' : 'stock-change-negative';
-            
-            html += '<tr>' +
-                '<td><strong>' + holding.symbol + '</strong></td>' +
-                '<td>' + holding.shares + '</td>' +
-                '<td>$' + holding.avg_price.toFixed(2) + '</td>' +
-                '<td>$' + holding.current_price.toFixed(2) + '</td>' +
-                '<td>$' + holding.value.toFixed(2) + '</td>' +
-                '<td class="' + changeClass + '">' +
-                    (holding.gain_loss >= 0 ? '+' : '') + '$' + holding.gain_loss.toFixed(2) + ' (' + (holding.gain_loss_percent >= 0 ? '+' : '') + holding.gain_loss_percent.toFixed(2) + '%)' +
-                '</td>' +
-                '<td>' +
-                    '<button class="btn btn-outline-danger btn-sm" onclick="removeFromPortfolio(\'' + holding.symbol + '\')">' +
-                        '<i class="fas fa-trash"></i>' +
-                    '</button>' +
-                '</td>' +
-            '</tr>';
-        }
-        
-        // Add summary row
-        html += '<tr class="table-active">' +
-            '<td colspan="4"><strong>Total</strong></td>' +
-            '<td><strong>$' + data.total_value.toFixed(2) + '</strong></td>' +
-            '<td class="' + (data.total_gain_loss >= 0 ? 'stock-change-positive' : 'stock-change-negative') + '">' +
-                '<strong>' + (data.total_gain_loss >= 0 ? '+' : '') + '$' + data.total_gain_loss.toFixed(2) + ' (' + (data.total_gain_loss_percent >= 0 ? '+' : '') + data.total_gain_loss_percent.toFixed(2) + '%)</strong>' +
-            '</td>' +
-            '<td></td>' +
-        '</tr>';
-        
-        table.innerHTML = html;
+        portfolioData = data.portfolio;
+        renderPortfolioTable(data);
+        refreshPriceStream();
     } catch (error) {
         console.error('Error loading portfolio:', error);
         table.innerHTML = '<tr><td colspan="7" class="text-center py-4 text-muted">Error loading portfolio</td></tr>';
     }
 }
 
+function renderPortfolioTable(data) {
+    const table = document.getElementById('portfolioTable');
+    if (!table) return;
+    
+    let html = '';
+    
+    for (const holding of data.portfolio) {
+        const changeClass = holding.gain_loss >= 0 ? 'stock-change-positive' : 'stock-change-negative';
+        
+        html += '<tr>' +
+            '<td><strong>' + holding.symbol + '</strong></td>' +
+            '<td>' + holding.shares + '</td>' +
+            '<td>$' + holding.avg_price.toFixed(2) + '</td>' +
+            '<td>$' + holding.current_price.toFixed(2) + '</td>' +
+            '<td>$' + holding.value.toFixed(2) + '</td>' +
+            '<td class="' + changeClass + '">' +
+                (holding.gain_loss >= 0 ? '+' : '') + '$' + holding.gain_loss.toFixed(2) + ' (' + (holding.gain_loss_percent >= 0 ? '+' : '') + holding.gain_loss_percent.toFixed(2) + '%)' +
+            '</td>' +
+            '<td>' +
+                '<button class="btn btn-outline-danger btn-sm" onclick="removeFromPortfolio(\'' + holding.symbol + '\')">' +
+                    '<i class="fas fa-trash"></i>' +
+                '</button>' +
+            '</td>' +
+        '</tr>';
+    }
+    
+    // Add summary row
+    html += '<tr class="table-active">' +
+        '<td colspan="4"><strong>Total</strong></td>' +
+        '<td><strong>$' + data.total_value.toFixed(2) + '</strong></td>' +
+        '<td class="' + (data.total_gain_loss >= 0 ? 'stock-change-positive' : 'stock-change-negative') + '">' +
+            '<strong>' + (data.total_gain_loss >= 0 ? '+' : '') + '$' + data.total_gain_loss.toFixed(2) + ' (' + (data.total_gain_loss_percent >= 0 ? '+' : '') + data.total_gain_loss_percent.toFixed(2) + '%)</strong>' +
+        '</td>' +
+        '<td></td>' +
+    '</tr>';
+    
+    table.innerHTML = html;
+}
+
 async function addToWatchlist() {
     const input = document.getElementById('addStockInput');
     const symbol = input.value.trim().toUpperCase();
@@ -511,13 +632,13 @@ async function loadNewsFeed() {
     if (!container) return;
 
     try {
-        const response = await fetch(API_ENDPOINTS.news);
-        const newsItems = await response.json();
+        const {data: newsItems, changed} = await fetchConditional(API_ENDPOINTS.news, 'news-feed');
         
         if (newsItems.error) {
             //container.innerHTML = '<div class="text-center py-4 text-muted'>News temporarily unavailable</div>';
             return;
         }
+        if (!changed) return;
         
         let html = '';
         
@@ -758,7 +879,8 @@ async function performAIAnalysis() {
             },
             body: JSON.stringify({
                 symbol: ticker,
-                analysis_type: depth
+                analysis_type: depth,
+                history_format: 'columnar'
             })
         });
         
@@ -769,6 +891,15 @@ async function performAIAnalysis() {
             return;
         }
         
+        if (!data.stock || !data.analysis) {
+            showToast('Analysis temporarily unavailable', 'error');
+            return;
+        }
+        
+        if (data.partial) {
+            showToast('Some analysis data is temporarily unavailable', 'info');
+        }
+        
         // Update UI with analysis results
         document.getElementById('aiDecision').textContent = data.analysis.decision;
         document.getElementById('aiDecision').className = 'badge fs-6 ' + (data.analysis.decision === 'BUY' ? 'bg-success' : data.analysis.decision === 'SELL' ? 'bg-danger' : 'bg-warning');
@@ -783,13 +914,18 @@ async function performAIAnalysis() {
         document.getElementById('rsiValue').className = 'indicator-value ' + (data.analysis.rsi > 70 ? 'indicator-bad' : data.analysis.rsi < 30 ? 'indicator-good' : 'indicator-neutral');
         document.getElementById('macdValue').textContent = data.analysis.macd;
         document.getElementById('macdValue').className = 'indicator-value ' + (data.analysis.macd === 'Bullish' ? 'indicator-good' : data.analysis.macd === 'Bearish' ? 'indicator-bad' : 'indicator-neutral');
-        document.getElementById('movingAvgValue').textContent = data.analysis.moving_avg;
-        document.getElementById('movingAvgValue').className = 'indicator-value ' + (data.analysis.moving_avg === 'Bullish' ? 'indicator-good' : data.analysis.moving_avg === 'Bearish' ? 'indicator-bad' : 'indicator-neutral');
+        const movingAvgValue = document.getElementById('movingAvgValue');
+        if (movingAvgValue) {
+            movingAvgValue.textContent = data.analysis.moving_avg;
+            movingAvgValue.className = 'indicator-value ' + (data.analysis.moving_avg === 'Bullish' ? 'indicator-good' : data.analysis.moving_avg === 'Bearish' ? 'indicator-bad' : 'indicator-neutral');
+        }
         
         // Create charts
-        createStockChart(ticker, data.historical_data, chartType);
-        createVolumeChart(ticker, data.historical_data);
-        createTechnicalIndicatorsChart(ticker, data.historical_data);
+        if (data.historical_data) {
+            createStockChart(ticker, data.historical_data, chartType);
+            createVolumeChart(ticker, data.historical_data);
+            createTechnicalIndicatorsChart(ticker, data.historical_data, data.indicators);
+        }
         
         // Load related news
         loadRelatedNews(ticker);
@@ -815,8 +951,9 @@ function createStockChart(symbol, data, chartType) {
         stockChart.destroy();
     }
 
-    const labels = data.map(item => item.date);
-    const prices = data.map(item => item.price);
+    // History arrives columnar: {dates, close, volume}
+    const labels = data.dates;
+    const prices = data.close;
     
     const chartConfig = {
         type: chartType === 'area' ? 'line' : chartType,
@@ -891,8 +1028,8 @@ function createVolumeChart(symbol, data) {
         volumeChart.destroy();
     }
 
-    const labels = data.map(item => item.date);
-    const volumes = data.map(item => item.volume);
+    const labels = data.dates;
+    const volumes = data.volume;
     
     const chartConfig = {
         type: 'bar',
@@ -943,7 +1080,7 @@ function createVolumeChart(symbol, data) {
     volumeChart = new Chart(ctx, chartConfig);
 }
 
-function createTechnicalIndicatorsChart(symbol, data) {
+function createTechnicalIndicatorsChart(symbol, data, indicators) {
     const ctx = document.getElementById('technicalChart');
     if (!ctx) return;
 
@@ -951,10 +1088,10 @@ function createTechnicalIndicatorsChart(symbol, data) {
         technicalChart.destroy();
     }
 
-    // Simulate technical indicators
-    const labels = data.map(item => item.date);
-    const rsi = Array.from({length: data.length}, () => Math.random() * 100);
-    const macd = Array.from({length: data.length}, () => (Math.random() - 0.5) * 10);
+    // Indicator series computed server-side, aligned with the price history
+    const labels = data.dates;
+    const rsi = indicators ? indicators.rsi : [];
+    const macd = indicators ? indicators.macd : [];
     
     const chartConfig = {
         type: 'line',
@@ -1081,8 +1218,8 @@ async function loadRelatedNews(symbol) {
     // In a real implementation, this would fetch news specific to the symbol
     // For demo, we'll use the general news endpoint
     try {
-        const response = await fetch(API_ENDPOINTS.news);
-        const newsItems = await response.json();
+        // Always rendered, since the container was just replaced by the spinner
+        const {data: newsItems} = await fetchConditional(API_ENDPOINTS.news, 'related-news');
         
         if (newsItems.error) {
             container.innerHTML = '<p class="text-center">News temporarily unavailable</p>';
@@ -1201,27 +1338,75 @@ async function sendAIMessage() {
     
     addTypingIndicator();
     
+    // The reply is streamed as server-sent events and rendered as tokens arrive
+    let messageDiv = null;
+    let text = '';
+    
     try {
         const response = await fetch(API_ENDPOINTS.chat, {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
-            body: JSON.stringify({ message: message })
+            body: JSON.stringify({ message: message, stream: true })
         });
         
-        const data = await response.json();
-        
-        if (data.error) {
-            throw new Error(data.error);
+        if (!response.ok || !response.body) {
+            const data = await response.json();
+            throw new Error(data.error || 'Chat request failed');
         }
         
-        removeTypingIndicator();
-        addChatMessage(data.response, false);
+        await readEventStream(response, function(event, data) {
+            if (event === 'delta') {
+                if (!messageDiv) {
+                    removeTypingIndicator();
+                    messageDiv = addChatMessage('', false);
+                }
+                text += data.text;
+                updateChatMessage(messageDiv, text.trimStart());
+            } else if (event === 'done' || event === 'error') {
+                removeTypingIndicator();
+                if (!messageDiv) messageDiv = addChatMessage('', false);
+                updateChatMessage(messageDiv, data.response);
+            }
+        });
     } catch (error) {
         console.error('Chat error:', error);
         removeTypingIndicator();
-        addChatMessage("I'm experiencing technical difficulties. Please try again.", false);
+        const fallback = "I'm experiencing technical difficulties. Please try again.";
+        if (messageDiv) {
+            updateChatMessage(messageDiv, fallback);
+        } else {
+            addChatMessage(fallback, false);
+        }
+    }
+}
+
+async function readEventStream(response, onEvent) {
+    // Minimal SSE parser for fetch responses (EventSource only supports GET)
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(function(line) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
     }
 }
 
@@ -1232,6 +1417,13 @@ function addChatMessage(message, isUser) {
     messageDiv.textContent = message;
     chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return messageDiv;
+}
+
+function updateChatMessage(messageDiv, message) {
+    const chatMessages = document.getElementById('chatMessages');
+    messageDiv.textContent = message;
+    chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
 function addTypingIndicator() {
@@ -1379,33 +1571,37 @@ function initAnimations() {
     });
 }
 
-// Update market sentiment periodically
-setInterval(async () => {
+// Market sentiment is computed server-side once per interval and pushed over the price stream
+function renderMarketSentiment(data) {
+    document.getElementById('sentimentBar').style.width = data.score + '%';
+    document.getElementById('marketSentiment').innerHTML = 'AI detects <strong>' + data.label + '</strong> market sentiment (' + data.score + '/100)';
+}
+
+async function loadMarketSentiment() {
     try {
-        const response = await fetch(API_ENDPOINTS.chat, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({ message: 'Rate current market sentiment from 0-100 (bearish to bullish). Return only the number.' })
-        });
+        const {status, data, changed} = await fetchConditional(API_ENDPOINTS.marketSentiment);
         
-        const data = await response.json();
+        if (status === 503) {
+            setTimeout(loadMarketSentiment, 5000);
+            return;
+        }
         
         if (data.error) {
             throw new Error(data.error);
         }
         
-        const sentimentValue = parseInt(data.response) || 65;
-        
-        document.getElementById('sentimentBar').style.width = sentimentValue + '%';
-        
-        const sentimentText = sentimentValue > 70 ? 'Bullish' : sentimentValue > 40 ? 'Neutral' : 'Bearish';
-        document.getElementById('marketSentiment').innerHTML = 'AI detects <strong>' + sentimentText + '</strong> market sentiment (' + sentimentValue + '/100)';
+        if (changed) {
+            renderMarketSentiment(data);
+        }
     } catch (error) {
         console.error('Error updating sentiment:', error);
     }
-}, 60000); // Update every minute
+}
+
+loadMarketSentiment();
+if (!window.EventSource) {
+    setInterval(loadMarketSentiment, 60000); // Update every minute
+}
 
 // Initialize everything when DOM is ready
 initAnimations();
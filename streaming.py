@@ -0,0 +1,109 @@
+import queue
+import threading
+
+
+class Subscription:
+    """Event queue for one connected client"""
+
+    def __init__(self, symbols, maxsize=100):
+        self.symbols = set(symbols)
+        self.events = queue.Queue(maxsize=maxsize)
+
+    def push(self, event, data):
+        try:
+            self.events.put_nowait((event, data))
+        except queue.Full:
+            # Slow client: drop the update, the next change will supersede it
+            pass
+
+    def get(self, timeout=None):
+        return self.events.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self.events.get_nowait()
+
+
+class QuoteHub:
+    """Fans quotes out to subscribers with one poller thread per unique symbol.
+
+    Pollers only push when a quote changes, and stop once the last
+    subscriber for their symbol goes away.
+    """
+
+    def __init__(self, fetch, interval=15):
+        self.fetch = fetch
+        self.interval = interval
+        self._subscribers = {}  # symbol -> set of Subscription
+        self._subscriptions = set()
+        self._latest = {}
+        self._broadcasts = {}  # event -> last broadcast data, replayed to new clients
+        self._pollers = {}
+        self._lock = threading.Lock()
+        self.polls = 0
+
+    def subscribe(self, symbols):
+        subscription = Subscription(symbols)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            for event, data in self._broadcasts.items():
+                subscription.push(event, data)
+            for symbol in subscription.symbols:
+                self._subscribers.setdefault(symbol, set()).add(subscription)
+                if symbol in self._latest:
+                    subscription.push('quote', self._latest[symbol])
+                if symbol not in self._pollers:
+                    stop = threading.Event()
+                    thread = threading.Thread(target=self._poll, args=(symbol, stop), name=f'quote-poller-{symbol}', daemon=True)
+                    self._pollers[symbol] = stop
+                    thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for symbol in subscription.symbols:
+                subscribers = self._subscribers.get(symbol)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[symbol]
+                    self._pollers.pop(symbol).set()
+                    self._latest.pop(symbol, None)
+
+    def broadcast(self, event, data):
+        """Push an event to every connected client"""
+        with self._lock:
+            self._broadcasts[event] = data
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.push(event, data)
+
+    def publish(self, symbol, quote):
+        """Deliver a quote to the symbol's subscribers if it changed"""
+        with self._lock:
+            previous = self._latest.get(symbol)
+            if symbol not in self._subscribers or previous == quote:
+                return
+            self._latest[symbol] = quote
+            subscriptions = list(self._subscribers[symbol])
+        for subscription in subscriptions:
+            subscription.push('quote', quote)
+
+    def _poll(self, symbol, stop):
+        while not stop.is_set():
+            try:
+                quote = self.fetch(symbol)
+                self.polls += 1
+                self.publish(symbol, quote)
+            except Exception:
+                pass
+            stop.wait(self.interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'symbols': len(self._pollers),
+                'subscriptions': len(self._subscriptions),
+                'polls': self.polls
+            }
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Configuration is read at import time: point every store at a scratch
+# directory and keep the app in demo mode before any module is imported
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='stocksense-tests-'))
+os.environ.setdefault('ALPHA_VANTAGE_KEY', 'demo')
+os.environ.setdefault('NEWS_API_KEY', 'news_demo_key')
+os.environ.setdefault('OPENAI_KEY', '')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,70 @@
+from alerts import AlertEngine, AlertIndex
+from session_store import MemorySessionStore
+
+
+def alert(alert_id, alert_type, target_price, symbol='AAPL'):
+    return {'id': alert_id, 'symbol': symbol, 'alert_type': alert_type, 'target_price': target_price}
+
+
+def test_crossed_returns_every_alert_on_the_right_side():
+    index = AlertIndex()
+    for alert_id, (alert_type, target) in enumerate([('price_above', 100), ('price_above', 110), ('price_above', 120),
+                                                       ('price_below', 90), ('price_below', 80)], 1):
+        index.add('u', alert(alert_id, alert_type, target))
+
+    assert sorted(index.crossed('AAPL', 110)) == [(1, 'u'), (2, 'u')]
+    assert index.crossed('AAPL', 110) == []
+    assert sorted(index.crossed('AAPL', 85)) == [(4, 'u')]
+    assert len(index) == 2
+
+
+def test_target_equal_to_price_fires_both_ways():
+    index = AlertIndex()
+    index.add('u', alert(1, 'price_above', 100))
+    index.add('u', alert(2, 'price_below', 100))
+    assert sorted(index.crossed('AAPL', 100)) == [(1, 'u'), (2, 'u')]
+
+
+def test_index_skips_triggered_and_unknown_alerts_and_keeps_symbols_apart():
+    index = AlertIndex()
+    index.add('u', dict(alert(1, 'price_above', 100), triggered=True))
+    index.add('u', alert(2, 'price', 100))
+    index.add('u', alert(3, 'price_above', 100, symbol='MSFT'))
+    assert index.symbols() == ['MSFT']
+    assert index.crossed('AAPL', 500) == []
+    assert index.crossed('MSFT', 500) == [(3, 'u')]
+    assert index.symbols() == []
+
+
+def test_engine_triggers_on_stored_quotes_but_not_placeholder_ones():
+    store = MemorySessionStore()
+    engine = AlertEngine(store, fetch_quotes=lambda symbols: {})
+    created = engine.add_alert('u', {'symbol': 'AAPL', 'alert_type': 'price_above', 'target_price': 200})
+
+    engine.on_cache_update(('GLOBAL_QUOTE', 'AAPL'), {'price': 250, 'rate_limited': True})
+    engine.on_cache_update(('GLOBAL_QUOTE', 'AAPL'), {'price': 250, 'demo': True, 'stale': True})
+    engine.on_cache_update(('GLOBAL_QUOTE', 'AAPL'), {'price': 190})
+    assert not store.get_alerts('u')[0]['triggered']
+
+    engine.on_cache_update(('GLOBAL_QUOTE', 'AAPL'), {'price': 205})
+    triggered = store.get_alerts('u')[0]
+    assert triggered['id'] == created['id'] and triggered['triggered'] and triggered['triggered_price'] == 205
+    assert engine.stats()['triggered'] == 1
+
+
+def test_new_alert_already_crossed_fires_immediately():
+    store = MemorySessionStore()
+    engine = AlertEngine(store, fetch_quotes=lambda symbols: {}, cached_quote=lambda symbol: {'price': 150})
+    engine.add_alert('u', {'symbol': 'AAPL', 'alert_type': 'price_below', 'target_price': 160})
+    engine.add_alert('u', {'symbol': 'AAPL', 'alert_type': 'price_above', 'target_price': 160})
+    assert [a['triggered'] for a in store.get_alerts('u')] == [True, False]
+
+
+def test_background_pass_ignores_simulated_fallback_quotes():
+    store = MemorySessionStore()
+    engine = AlertEngine(store, fetch_quotes=lambda symbols: {'AAPL': {'symbol': 'AAPL', 'price': 289.7, 'demo': True, 'stale': True}})
+    engine.add_alert('u', {'symbol': 'AAPL', 'alert_type': 'price_below', 'target_price': 10000})
+    for symbol, quote in engine.fetch_quotes(engine.index.symbols()).items():
+        engine.on_quote(symbol, quote)
+    assert not store.get_alerts('u')[0]['triggered']
+    assert engine.index.symbols() == ['AAPL']
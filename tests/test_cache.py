@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from cache import TTLCache
+
+
+def test_get_or_load_caches_until_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    cache = TTLCache(ttl=10)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_load('k', loader) == 1
+    assert cache.get_or_load('k', loader) == 1
+    now[0] += 11
+    assert cache.get('k') is None
+    assert cache.entry('k') == (1, 1000.0)
+    assert cache.get_or_load('k', loader) == 2
+    assert {k: cache.stats()[k] for k in ('hits', 'misses', 'stale')} == {'hits': 1, 'misses': 1, 'stale': 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()['coalesced'] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['value'] * 5
+
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache()
+
+    def failing():
+        raise ValueError('upstream down')
+
+    with pytest.raises(ValueError):
+        cache.get_or_load('k', failing)
+    assert cache.entry('k') is None
+    assert cache.get_or_load('k', lambda: 'ok') == 'ok'
+
+
+def test_listeners_see_stored_values_and_cannot_break_stores():
+    cache = TTLCache()
+    seen = []
+    cache.add_listener(lambda key, value: seen.append((key, value)))
+    cache.add_listener(lambda key, value: 1 / 0)
+    cache.set('a', 1)
+    cache.get_or_load('b', lambda: 2)
+    cache.get_or_load('b', lambda: 3)
+    assert seen == [('a', 1), ('b', 2)]
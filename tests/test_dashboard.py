@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'js', 'script.js')
+
+
+@pytest.fixture
+def client():
+    import app as app_module
+    app_module._background_started = True
+    return app_module.app.test_client()
+
+
+def test_dashboard_loads_the_shared_script(client):
+    page = client.get('/dashboard').get_data(as_text=True)
+    assert '/static/js/script.js' in page
+    assert 'API_ENDPOINTS' not in page
+    assert client.get('/static/js/script.js').status_code == 200
+
+
+def test_market_sentiment_comes_from_the_snapshot_not_chat():
+    with open(SCRIPT) as f:
+        script = f.read()
+    assert 'Rate current market sentiment' not in script
+    assert "marketSentiment: '/api/market/sentiment'" in script
+    assert "addEventListener('sentiment'" in script
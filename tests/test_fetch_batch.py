@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+import Utils
+from config import Config
+from rate_limit import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+
+@pytest.fixture
+def saturated_background_pool():
+    """Occupy every background worker until the test ends"""
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def stuck(symbol, api_key, priority):
+        started.release()
+        release.wait(5)
+        return {'symbol': symbol}
+
+    symbols = [f'BG{index}' for index in range(Config.BACKGROUND_FETCH_WORKERS * 2)]
+    worker = threading.Thread(target=Utils._fetch_batch, args=(stuck, symbols, 'demo', PRIORITY_BACKGROUND))
+    worker.start()
+    for _ in range(Config.BACKGROUND_FETCH_WORKERS):
+        assert started.acquire(timeout=5)
+    yield
+    release.set()
+    worker.join()
+
+
+def test_interactive_batches_do_not_queue_behind_background_work(saturated_background_pool):
+    done = threading.Event()
+    result = {}
+
+    def run():
+        result.update(Utils._fetch_batch(lambda symbol, api_key, priority: {'symbol': symbol}, ['AAPL', 'MSFT'], 'demo', PRIORITY_INTERACTIVE))
+        done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    assert done.wait(2)
+    assert set(result['quotes']) == {'AAPL', 'MSFT'}
+
+
+def test_cached_symbols_are_answered_without_the_pool(monkeypatch):
+    def fail(*args):
+        raise AssertionError('submitted a cached symbol')
+
+    monkeypatch.setattr(Utils.fetch_executor, 'submit', fail)
+    batch = Utils._fetch_batch(fail, ['AAPL'], 'demo', PRIORITY_INTERACTIVE, cached=lambda symbol: {'symbol': symbol, 'price': 1.0})
+    assert batch == {'quotes': {'AAPL': {'symbol': 'AAPL', 'price': 1.0}}, 'errors': {}}
@@ -0,0 +1,54 @@
+import pytest
+
+import Utils
+from timeseries import PriceSeries
+
+
+@pytest.fixture
+def no_stored_history(monkeypatch):
+    def unavailable(symbol, api_key, priority=None):
+        raise ConnectionError('upstream down')
+
+    monkeypatch.setattr(Utils, '_refresh_history', unavailable)
+    monkeypatch.setattr(Utils.ohlcv_store, 'last_date', lambda symbol: None)
+    monkeypatch.setattr(Utils.ohlcv_store, 'read', lambda symbol, days: [])
+
+
+def test_demo_fallback_history_is_flagged(no_stored_history):
+    history = Utils.get_historical_data('AAPL', 'real-key', 60)
+    assert len(history) == 60 and history.demo
+    assert history[-10:].demo and history.downsample(5).demo
+    assert Utils.get_technical_indicators(history)['demo'] is True
+
+
+def test_stored_history_is_not_flagged(monkeypatch):
+    monkeypatch.setattr(Utils.ohlcv_store, 'last_date', lambda symbol: '2025-01-03')
+    monkeypatch.setattr(Utils.ohlcv_store, 'needs_refresh', lambda symbol: False)
+    monkeypatch.setattr(Utils.ohlcv_store, 'read', lambda symbol, days: [('2025-01-02', 10.0, 100), ('2025-01-03', 11.0, 120)])
+    history = Utils.get_historical_data('AAPL', 'real-key', 2)
+    assert not history.demo
+    assert Utils.get_technical_indicators(history)['demo'] is False
+
+
+def test_analysis_and_portfolio_surface_demo_markers(no_stored_history, monkeypatch):
+    import app as app_module
+    app_module._background_started = True
+
+    history = Utils.get_historical_data('AAPL', 'real-key', 60)
+    payload = app_module.analysis_response({'price': 1.0}, None, history, None, None, {})
+    assert payload['history_demo'] is True
+
+    analytics = Utils.get_portfolio_analytics({'AAPL': {'shares': 1, 'avg_price': 1.0}}, 'real-key', days=60)
+    assert 'AAPL' in analytics['demo_history']
+
+    quotes = {'AAPL': {'symbol': 'AAPL', 'price': 2.0, 'demo': True, 'stale': True}}
+    monkeypatch.setattr(app_module, 'get_stock_data_batch', lambda symbols, api_key: {'quotes': quotes, 'errors': {}})
+    client = app_module.app.test_client()
+    holdings = client.get('/api/portfolio').get_json()['portfolio']
+    aapl = next(holding for holding in holdings if holding['symbol'] == 'AAPL')
+    assert aapl['demo'] and aapl['stale']
+    assert 'demo' not in next(holding for holding in holdings if holding['symbol'] != 'AAPL')
+
+
+def test_price_series_defaults_to_provider_data():
+    assert PriceSeries.empty().demo is False
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from indicators import IndicatorState, compute_indicators, ema, rolling_std, rsi, sma, summarize
+
+
+def closes(count=400):
+    rng = np.random.default_rng(7)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+
+
+def naive_ema(values, alpha):
+    out = [values[0]]
+    for value in values[1:]:
+        out.append(out[-1] + alpha * (value - out[-1]))
+    return np.array(out)
+
+
+def test_sma_and_rolling_std_match_windows():
+    values = closes()
+    expected_mean = [values[i - 19:i + 1].mean() for i in range(19, len(values))]
+    expected_std = [values[i - 19:i + 1].std() for i in range(19, len(values))]
+    assert np.isnan(sma(values, 20)[:19]).all()
+    assert np.allclose(sma(values, 20)[19:], expected_mean)
+    assert np.allclose(rolling_std(values, 20)[19:], expected_std)
+
+
+def test_ema_matches_recurrence_across_blocks():
+    values = closes()
+    for span in (12, 26, 200):
+        assert np.allclose(ema(values, span), naive_ema(values, 2.0 / (span + 1)))
+
+
+def test_rsi_matches_wilder_recurrence():
+    values = closes()
+    deltas = np.diff(values)
+    gain = naive_ema(np.maximum(deltas, 0), 1 / 14)
+    loss = naive_ema(np.maximum(-deltas, 0), 1 / 14)
+    # The first loss is zero when the first move is up; that point is 100 either way
+    with np.errstate(divide='ignore'):
+        expected = 100 - 100 / (1 + gain / loss)
+    assert np.isnan(rsi(values)[0])
+    assert np.allclose(rsi(values)[1:], expected)
+
+
+def test_flat_prices_have_neutral_rsi():
+    assert rsi(np.full(30, 10.0))[-1] == 50.0
+
+
+def test_compute_indicators_aligns_every_series():
+    values = closes(60)
+    indicators = compute_indicators(values)
+    assert {'sma_20', 'sma_50', 'rsi', 'macd', 'bollinger_upper', 'volatility'} <= set(indicators)
+    assert all(len(series) == len(values) for series in indicators.values())
+    assert not np.isnan(indicators['sma_50'][-1])
+
+
+def latest(values):
+    return summarize(values, compute_indicators(values))['latest']
+
+
+def assert_matches(snapshot, expected):
+    assert snapshot.keys() == expected.keys()
+    for name, value in expected.items():
+        if value is None:
+            assert snapshot[name] is None, name
+        else:
+            assert snapshot[name] == pytest.approx(value, abs=2e-4), name
+
+
+@pytest.mark.parametrize('count', [1, 2, 15, 20, 21, 49, 50, 120])
+def test_incremental_updates_match_vectorized(count):
+    values = closes(count)
+    state = IndicatorState()
+    for value in values:
+        snapshot = state.update(value)
+    assert_matches(snapshot, latest(values))
+
+
+def test_seeded_state_keeps_matching_as_bars_arrive():
+    values = closes(300)
+    state = IndicatorState.from_closes(values[:200])
+    assert_matches(state.snapshot(), latest(values[:200]))
+    for value in values[200:]:
+        snapshot = state.update(value)
+    assert_matches(snapshot, latest(values))
+    assert snapshot['sma_50'] == pytest.approx(values[-50:].mean(), abs=1e-4)
+
+
+def test_latest_indicators_advance_only_new_bars(monkeypatch):
+    import Utils
+    from timeseries import PriceSeries
+
+    seeds = []
+    from_closes = IndicatorState.from_closes.__func__
+    monkeypatch.setattr(IndicatorState, 'from_closes', classmethod(lambda cls, values: seeds.append(len(values)) or from_closes(cls, values)))
+    values = closes(130)
+    history = lambda start, end, revised=1.0: PriceSeries(np.arange(start, end), values[start:end] * revised, np.zeros(end - start))
+
+    Utils.get_latest_indicators('TEST', history(0, 100))
+    summary = Utils.get_latest_indicators('TEST', history(30, 130))
+    assert seeds == [100]
+    assert_matches(summary['latest'], latest(values))
+
+    Utils.get_latest_indicators('TEST', history(30, 130, revised=1.01))
+    assert seeds == [100, 100]
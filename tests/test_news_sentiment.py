@@ -0,0 +1,80 @@
+from news_sentiment import NewsIngestor, article_key, extract_symbols, label, score_text
+
+
+def headline(n, title=None):
+    return {'title': title or f'Headline {n}', 'url': f'https://news.example/{n}', 'description': ''}
+
+
+def test_latest_keeps_newest_first_order():
+    ingestor = NewsIngestor(max_articles=200)
+    ingestor.ingest([headline(n) for n in range(100)])  # NewsAPI order: newest first
+
+    assert [article['title'] for article in ingestor.latest(3)] == ['Headline 0', 'Headline 1', 'Headline 2']
+
+
+def test_newer_batch_goes_in_front_of_older_one():
+    ingestor = NewsIngestor()
+    ingestor.ingest([headline(3), headline(4)])
+    ingestor.ingest([headline(1), headline(2), headline(3)])
+
+    assert [article['title'] for article in ingestor.latest(10)] == ['Headline 1', 'Headline 2', 'Headline 3', 'Headline 4']
+    assert ingestor.duplicates == 1
+
+
+def test_articles_are_deduplicated_by_url_or_title():
+    ingestor = NewsIngestor()
+    assert ingestor.ingest([headline(1), headline(1)]) == 1
+    assert ingestor.ingest([{'title': 'Same  Title', 'url': '#'}, {'title': 'same title', 'url': ''}]) == 1
+    assert article_key({'title': 'A', 'url': '#'}) == article_key({'title': 'a', 'url': ''})
+
+
+def test_symbol_sentiment_is_a_rolling_mean():
+    ingestor = NewsIngestor(window=2)
+    ingestor.ingest([headline(1, 'Apple stock soars'), headline(2, 'Apple shares plunge'), headline(3, 'Apple stock surges')])
+
+    sentiment = ingestor.sentiment('aapl')
+    assert sentiment['articles'] == 2
+    assert sentiment['score'] == round((((-0.8 + 0.7) / 2) + 1) / 2, 2)
+    assert ingestor.sentiment('MSFT') == {'sentiment': 'neutral', 'score': 0.5, 'articles': 0}
+
+
+def test_scoring_helpers():
+    assert score_text('Demand is not strong') < 0 < score_text('Demand is strong')
+    assert extract_symbols('Tesla and $NVDA rally (AMD)') == {'TSLA', 'NVDA', 'AMD'}
+    assert [label(0.7), label(0.5), label(0.3)] == ['positive', 'neutral', 'negative']
+
+
+def test_lookups_never_fetch():
+    def fetch():
+        raise AssertionError('lookups must not call the provider')
+
+    ingestor = NewsIngestor(fetch)
+    assert ingestor.latest() == []
+    assert ingestor.sentiment('AAPL')['articles'] == 0
+
+
+def test_failed_refresh_keeps_last_good_headlines():
+    batches = [[headline(1)], RuntimeError('NewsAPI down')]
+
+    def fetch():
+        batch = batches.pop(0)
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    ingestor = NewsIngestor(fetch)
+    assert ingestor.refresh() is True
+    assert ingestor.refresh() is False
+    assert [article['title'] for article in ingestor.latest()] == ['Headline 1']
+    assert ingestor.failures == 1 and ingestor.last_error == 'NewsAPI down'
+
+
+def test_start_uses_the_given_fetch():
+    ingestor = NewsIngestor(interval=3600)
+    ingestor.start(lambda: [headline(1)])
+    try:
+        ingestor._thread.join(timeout=0.2)
+        assert ingestor.refreshes == 1
+        assert ingestor.latest()[0]['title'] == 'Headline 1'
+    finally:
+        ingestor.stop()
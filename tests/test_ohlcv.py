@@ -0,0 +1,57 @@
+import pytest
+
+import Utils
+from circuit_breaker import BreakerRegistry
+from ohlcv_store import OHLCVStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = OHLCVStore(str(tmp_path / 'ohlcv.db'))
+    monkeypatch.setattr(Utils, 'ohlcv_store', store)
+    return store
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Alpha Vantage answering every call with an error message"""
+    calls = []
+
+    def get_json(provider, url):
+        calls.append(url)
+        return {'Error Message': 'Invalid API call.'}
+
+    monkeypatch.setattr(Utils.provider_client, 'get_json', get_json)
+    monkeypatch.setattr(Utils.alpha_vantage_limiter, 'acquire', lambda priority=None: True)
+    monkeypatch.setattr(Utils, 'breakers', BreakerRegistry(failure_threshold=5, cooldown=30))
+    return calls
+
+
+def test_failed_attempt_is_remembered(store):
+    assert store.needs_refresh('NOPE')
+    store.mark_fetched('NOPE')
+    assert not store.needs_refresh('NOPE')
+    store.refresh_seconds = -1
+    assert store.needs_refresh('NOPE')
+
+
+def test_unknown_symbol_is_asked_for_once(store, upstream):
+    for _ in range(3):
+        history = Utils.get_historical_data('NOPE', 'real-key', 30)
+        assert history.demo
+    assert len(upstream) == 1
+    assert store.read('NOPE', 30) == []
+
+
+def test_error_message_counts_as_a_breaker_failure(store, upstream):
+    with pytest.raises(Utils.EmptyResponse):
+        Utils._alpha_vantage_query('https://example.test/query?function=TIME_SERIES_DAILY&symbol=NOPE')
+    assert Utils.breakers.get('alphavantage', 'TIME_SERIES_DAILY').stats()['failures'] == 1
+
+
+def test_demo_mode_preloads_no_profiles(monkeypatch):
+    def unexpected(*args):
+        raise AssertionError('called the provider in demo mode')
+
+    monkeypatch.setattr(Utils, '_fetch_company_info', unexpected)
+    assert Utils.preload_profiles(['AAPL', 'MSFT'], 'demo') == {'loaded': 0, 'skipped': 2, 'failed': 0}
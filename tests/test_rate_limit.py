@@ -0,0 +1,70 @@
+import threading
+import time
+
+from rate_limit import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PriorityRateLimiter, SQLiteTokenBucket, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.try_take()[0] for _ in range(4)] == [True, True, True, False]
+    assert bucket.try_take() == (False, 0.5)
+    clock.now += 0.5
+    assert bucket.try_take() == (True, 0)
+    clock.now += 100
+    assert [bucket.try_take()[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_drained_bucket_waits_a_full_token(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    bucket = TokenBucket(rate=1, capacity=5)
+    bucket.drain()
+    assert bucket.try_take() == (False, 1)
+
+
+def test_sqlite_bucket_shares_tokens_between_instances(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    first = SQLiteTokenBucket(rate=0.001, capacity=2, path=path)
+    second = SQLiteTokenBucket(rate=0.001, capacity=2, path=path)
+    assert first.try_take()[0] and second.try_take()[0]
+    assert not first.try_take()[0]
+
+
+def test_limiter_rejects_after_timeout():
+    limiter = PriorityRateLimiter(TokenBucket(rate=0.001, capacity=1))
+    assert limiter.acquire(timeout=0.1)
+    assert not limiter.acquire(timeout=0.05)
+    assert (limiter.stats()['granted'], limiter.stats()['rejected']) == (1, 1)
+
+
+def test_limiter_serves_higher_priority_first():
+    limiter = PriorityRateLimiter(TokenBucket(rate=5, capacity=1))
+    limiter.bucket.drain()
+    order = []
+
+    def wait(name, priority):
+        if limiter.acquire(priority, timeout=5):
+            order.append(name)
+
+    background = threading.Thread(target=wait, args=('background', PRIORITY_BACKGROUND))
+    interactive = threading.Thread(target=wait, args=('interactive', PRIORITY_INTERACTIVE))
+    with limiter._cond:
+        # Both are queued before either can see a token
+        background.start()
+        interactive.start()
+        while len(limiter._waiters) < 2:
+            limiter._cond.wait(0.01)
+    background.join()
+    interactive.join()
+    assert order == ['interactive', 'background']
@@ -0,0 +1,148 @@
+import gzip
+
+import pytest
+from flask import Flask, g, jsonify, request, session
+
+import responses
+from config import Config
+from snapshots import Snapshot
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/large', methods=['GET', 'POST'])
+    def large():
+        return jsonify({'rows': list(range(Config.COMPRESS_MIN_BYTES))})
+
+    @app.after_request
+    def finalize(response):
+        return responses.finalize(response, response.get_data(), request)
+
+    return app.test_client()
+
+
+@pytest.fixture
+def stocksense():
+    import app as app_module
+    app_module._background_started = True
+    return app_module
+
+
+def test_small_response_is_not_compressed(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == {'ok': True}
+
+
+def test_large_response_is_gzipped_with_encoding_etag(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.get_etag()[0].endswith('-gzip')
+    assert b'"rows"' in gzip.decompress(response.data)
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_served_etag_revalidates_to_304(client):
+    for headers in ({}, {'Accept-Encoding': 'gzip'}):
+        etag = client.get('/large', headers=headers).headers['ETag']
+        response = client.get('/large', headers=dict(headers, **{'If-None-Match': etag}))
+        assert response.status_code == 304
+        assert response.data == b''
+        assert 'Content-Encoding' not in response.headers
+
+
+def test_stale_etag_gets_full_response(client):
+    response = client.get('/small', headers={'If-None-Match': '"not-the-etag"'})
+    assert response.status_code == 200
+    assert response.get_json() == {'ok': True}
+
+
+def test_post_is_never_304(client):
+    etag = client.post('/large').headers['ETag']
+    assert client.post('/large', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_api_routes_default_to_private_no_cache():
+    app = Flask(__name__)
+
+    @app.route('/api/thing')
+    def thing():
+        return jsonify({'ok': True})
+
+    @app.after_request
+    def finalize(response):
+        return responses.finalize(response, response.get_data(), request)
+
+    response = app.test_client().get('/api/thing')
+    assert response.cache_control.private
+    assert response.cache_control.no_cache
+
+
+def test_small_snapshot_route_revalidates_to_304(stocksense, monkeypatch):
+    monkeypatch.setattr(stocksense.market_sentiment_snapshot, 'current', Snapshot({'score': 55, 'label': 'Neutral'}))
+    client = stocksense.app.test_client()
+
+    for headers in ({}, {'Accept-Encoding': 'gzip'}):
+        response = client.get('/api/market/sentiment', headers=headers)
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json() == {'score': 55, 'label': 'Neutral'}
+
+        revalidated = client.get('/api/market/sentiment', headers=dict(headers, **{'If-None-Match': response.headers['ETag']}))
+        assert revalidated.status_code == 304
+
+
+def test_large_snapshot_route_is_compressed_once_and_revalidates(stocksense, monkeypatch):
+    snapshot = Snapshot({'stocks': [{'symbol': f'S{i}', 'price': i} for i in range(200)]})
+    monkeypatch.setattr(stocksense.market_overview_snapshot, 'current', snapshot)
+    client = stocksense.app.test_client()
+
+    response = client.get('/api/market/overview', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == snapshot.body
+    assert response.get_etag()[0] == f'{snapshot.etag}-gzip'
+    assert response.cache_control.public
+
+    revalidated = client.get('/api/market/overview', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_public_routes_set_no_cookie(stocksense):
+    client = stocksense.app.test_client(use_cookies=False)
+    for path in ('/api/news', '/api/market/overview', '/api/market/sentiment'):
+        response = client.get(path)
+        if response.status_code == 200:
+            assert response.cache_control.public
+        assert 'Set-Cookie' not in response.headers
+        assert 'Cookie' not in response.headers.get('Vary', '')
+
+
+def test_cache_for_is_private_for_per_user_requests():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+
+    @app.route('/shared')
+    @responses.cache_for(60)
+    def shared():
+        return jsonify({'ok': True})
+
+    @app.route('/personal')
+    @responses.cache_for(60)
+    def personal():
+        session['uid'] = g.uid = 'someone'
+        return jsonify({'ok': True})
+
+    client = app.test_client()
+    shared_response = client.get('/shared')
+    assert shared_response.cache_control.public and shared_response.cache_control.max_age == 60
+
+    personal_response = client.get('/personal')
+    assert 'Set-Cookie' in personal_response.headers
+    assert personal_response.cache_control.private and not personal_response.cache_control.public
@@ -0,0 +1,63 @@
+import pytest
+
+from session_store import DEFAULT_PORTFOLIO, DEFAULT_WATCHLIST, MemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture
+def stocksense():
+    import app as app_module
+    app_module._background_started = True
+    return app_module
+
+
+def user_count(stocksense):
+    return stocksense.session_store._conn().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+
+def test_cookieless_public_requests_create_no_users(stocksense):
+    client = stocksense.app.test_client(use_cookies=False)
+    before = user_count(stocksense)
+
+    for path in ('/metrics', '/api/news', '/api/cache/stats', '/'):
+        for _ in range(5):
+            response = client.get(path)
+            assert 'Set-Cookie' not in response.headers
+
+    assert user_count(stocksense) == before
+
+
+def test_user_is_created_on_first_per_user_request(stocksense):
+    client = stocksense.app.test_client()
+    before = user_count(stocksense)
+
+    first = client.get('/api/watchlist')
+    assert 'Set-Cookie' in first.headers
+    assert first.get_json() == DEFAULT_WATCHLIST
+
+    client.post('/api/watchlist/add', json={'symbol': 'ibm'})
+    assert client.get('/api/watchlist').get_json() == DEFAULT_WATCHLIST + ['IBM']
+    assert user_count(stocksense) == before + 1
+
+
+@pytest.mark.parametrize('make_store', [MemorySessionStore, lambda: SQLiteSessionStore(':memory:')])
+def test_store_seeds_defaults_and_keeps_users_apart(make_store):
+    store = make_store()
+    store.ensure_user('a')
+    store.ensure_user('b')
+    store.set_holding('a', 'IBM', 3, 100.0)
+    store.remove_from_watchlist('b', 'AAPL')
+
+    assert set(store.get_portfolio('a')) == set(DEFAULT_PORTFOLIO) | {'IBM'}
+    assert set(store.get_portfolio('b')) == set(DEFAULT_PORTFOLIO)
+    assert store.get_watchlist('a') == DEFAULT_WATCHLIST
+    assert 'AAPL' not in store.get_watchlist('b')
+    assert store.add_to_watchlist('a', 'IBM', limit=len(DEFAULT_WATCHLIST)) is False
+
+
+def test_incomplete_store_cannot_be_instantiated():
+    class WatchlistOnly(SessionStore):
+        def get_watchlist(self, uid):
+            return []
+
+    with pytest.raises(TypeError):
+        WatchlistOnly()
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+def to_epoch_days(dates):
+    """ISO date strings to int32 days since 1970-01-01"""
+    return np.array(dates, dtype='datetime64[D]').astype(np.int32)
+
+
+def to_iso_dates(days):
+    """int32 epoch days to ISO date strings"""
+    return np.asarray(days, dtype=np.int32).astype('datetime64[D]').astype(str).tolist()
+
+
+def lttb_indices(x, y, threshold):
+    """Indices kept by Largest-Triangle-Three-Buckets downsampling to `threshold` points.
+
+    The first and last points are always kept; each bucket in between keeps
+    the point forming the largest triangle with the previous kept point and
+    the average of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                      (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = keep[bucket + 1] = start + int(np.argmax(area))
+    return keep
+
+
+class PriceSeries:
+    """Daily price history in contiguous arrays.
+
+    Dates are int32 epoch days, closes float64 and volumes int64, so years of
+    history for many symbols stay small in memory and on the wire. demo marks
+    simulated history served in place of provider data.
+    """
+
+    __slots__ = ('dates', 'close', 'volume', 'demo')
+
+    def __init__(self, dates, close, volume, demo=False):
+        self.dates = np.ascontiguousarray(dates, dtype=np.int32)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.int64)
+        self.demo = demo
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (date, close, volume) tuples, as read from the OHLCV store"""
+        if not rows:
+            return cls.empty()
+        dates, close, volume = zip(*rows)
+        return cls(to_epoch_days(dates), close, volume)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from the legacy [{'date', 'price', 'volume'}] format"""
+        return cls.from_rows([(record['date'], record['price'], record['volume']) for record in records])
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty(0), np.empty(0))
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError('PriceSeries only supports slicing')
+        return PriceSeries(self.dates[index], self.close[index], self.volume[index], self.demo)
+
+    @property
+    def last_date(self):
+        return to_iso_dates(self.dates[-1:])[0] if len(self) else None
+
+    @property
+    def last_close(self):
+        return float(self.close[-1]) if len(self) else None
+
+    def date_strings(self):
+        return to_iso_dates(self.dates)
+
+    def downsample(self, max_points):
+        """LTTB-downsampled copy with at most max_points points, for charts"""
+        if not max_points or len(self) <= max_points:
+            return self
+        keep = lttb_indices(self.dates, self.close, max_points)
+        return PriceSeries(self.dates[keep], self.close[keep], self.volume[keep], self.demo)
+
+    def to_records(self):
+        """Legacy wire format: [{'date', 'price', 'volume'}]"""
+        return [{'date': date, 'price': price, 'volume': volume}
+                for date, price, volume in zip(self.date_strings(), self.close.tolist(), self.volume.tolist())]
+
+    def to_columnar(self):
+        """Columnar wire format: {'dates': [...], 'close': [...], 'volume': [...]}"""
+        return {
+            'dates': self.date_strings(),
+            'close': self.close.tolist(),
+            'volume': self.volume.tolist()
+        }
+
+    def to_json(self, format='records', max_points=None):
+        series = self.downsample(max_points)
+        return series.to_columnar() if format == 'columnar' else series.to_records()